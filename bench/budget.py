@@ -0,0 +1,50 @@
+import math
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+#
+# Predicts how long a benchmark takes for a size from its runs on smaller sizes, so that the runners can skip the
+# sizes that would take longer than their time budget instead of finding out after the run. The time is assumed to
+# grow with size ** exponent, where the exponent is estimated from the last two runs. A run isn't interrupted, so a run
+# can still take longer than the budget when a benchmark scales worse on the larger sizes than on the smaller ones.
+#
+
+# The largest exponent that is assumed. None of the loaders is worse than quadratic.
+MAXIMUM_EXPONENT = 2.0
+
+def predict_seconds(runs: Sequence[Tuple[int, float]], size: int, minimum_exponent: float = 1.0) -> float:
+    #
+    # Predict the time for the size from the sizes and times of the earlier runs, in increasing order of size. The
+    # exponent is at least the minimum exponent, because the times of small runs are dominated by a constant overhead.
+    #
+    last_size, last_seconds = runs[-1]
+    exponent = minimum_exponent
+    if len(runs) > 1:
+        previous_size, previous_seconds = runs[-2]
+        if previous_seconds > 0 and last_seconds > 0 and last_size > previous_size:
+            exponent = max(exponent, min(MAXIMUM_EXPONENT, math.log(last_seconds / previous_seconds) / math.log(last_size / previous_size)))
+
+    return last_seconds * (size / last_size) ** exponent
+
+class TimeBudget(object):
+    #
+    # The runs of each benchmark, identified by a key, and the time in seconds that a single run may take.
+    #
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._runs: Dict[Hashable, List[Tuple[int, float]]] = {}
+
+    def record(self, key: Hashable, size: int, seconds: float):
+        self._runs.setdefault(key, []).append((size, seconds))
+
+    def predict(self, key: Hashable, size: int, minimum_exponent: float = 1.0) -> Optional[float]:
+        # Returns None if the benchmark hasn't run yet
+        runs = self._runs.get(key)
+        return None if not runs else predict_seconds(runs, size, minimum_exponent)
+
+    def exceeded_by(self, key: Hashable, size: int, minimum_exponent: float = 1.0) -> Optional[float]:
+        #
+        # Return the predicted time if it is over the budget, or None if the benchmark can run the size.
+        #
+        predicted = self.predict(key, size, minimum_exponent)
+        return predicted if predicted is not None and predicted > self.seconds else None
@@ -0,0 +1,63 @@
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+#
+# Compares two benchmark result files written by bench/run.py, e.g. from the main branch and from a feature branch,
+# and reports the benchmarks that became slower or that started using more trolleys.
+#
+# Usage:
+#
+#   python -m bench.compare baseline.json current.json --threshold 0.1
+#
+# The exit code is 1 if there are any regressions, so the comparison can be used in a CI pipeline.
+#
+
+def _key(result: Dict[str, object]) -> Tuple[object, ...]:
+    return (result["benchmark"], result["name"], result["distribution"], result["size"])
+
+def compare_results(baseline: List[Dict[str, object]], current: List[Dict[str, object]], threshold: float = 0.1) -> List[str]:
+    #
+    # Return a description of every regression: a benchmark that is more than 'threshold' (as a fraction) slower than
+    # the baseline, or a loader that uses more trolleys than in the baseline.
+    #
+    baseline_by_key = {_key(result): result for result in baseline}
+
+    regressions = []
+    for result in current:
+        previous = baseline_by_key.get(_key(result))
+        if previous is None:
+            continue
+
+        name = "/".join(str(part) for part in _key(result))
+        if previous["seconds"] > 0 and result["seconds"] > previous["seconds"] * (1 + threshold):
+            regressions.append(f"{name}: {result['seconds']:.4f}s instead of {previous['seconds']:.4f}s ({result['seconds'] / previous['seconds'] - 1:+.1%})")
+
+        if result.get("trolleys") is not None and previous.get("trolleys") is not None and result["trolleys"] > previous["trolleys"]:
+            regressions.append(f"{name}: {result['trolleys']} trolleys instead of {previous['trolleys']}")
+
+    return regressions
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline", help="The results to compare against.")
+    parser.add_argument("current", help="The new results.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="The fraction by which a benchmark may be slower before it is reported.")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+
+    with open(args.current) as f:
+        current = json.load(f)["results"]
+
+    regressions = compare_results(baseline, current, args.threshold)
+    for regression in regressions:
+        print(regression)
+
+    print(f"Found {len(regressions)} {'regression' if len(regressions) == 1 else 'regressions'}")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
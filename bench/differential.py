@@ -0,0 +1,427 @@
+import argparse
+import json
+import sys
+import time
+from array import array
+from typing import Callable, Dict, List, Mapping, Optional, Sequence
+
+from bench.budget import MAXIMUM_EXPONENT, TimeBudget
+from bench.generators import DISTRIBUTIONS, generate_weights
+from cargo_loader.assignments import LoadAssignments
+from cargo_loader.cargo import Cargo
+from cargo_loader.loader import CargoLoader
+from cargo_loader.optimal import l1_lower_bound
+from cargo_loader.registry import create_loader, loader_names
+from cargo_loader.trolley import TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG
+
+#
+# Differential testing of the loaders. Every loader (engine) is checked against a few invariants: it uses at least as
+# many trolleys as the L1 lower bound, no trolley is loaded with more than its capacity and its assignments, batch
+# result and trolley count agree with each other. The engines that implement the same algorithm as one of the simple
+# reference implementations below also have to produce exactly the same trolley for every item.
+#
+# The reference implementations scan all the trolleys for every item, so they are only run for small instances. For
+# larger instances the assignments of the engines that implement the same algorithm are compared with each other
+# instead.
+#
+# The stress runner generates seeded instances of increasing size with the generators of the benchmarks. Before an
+# engine runs the next size its time is predicted from its runs on the smaller sizes (see bench/budget.py), and the
+# size is skipped for that engine if the prediction is over the time budget. The engines that scan all the
+# trolleys for every item (SCANNING_ENGINES) are quadratic, like the reference implementations, so they are only run
+# up to the scanning limit:
+#
+#   python -m bench.differential --sizes 1e3 1e4 1e5 1e6 --time-budget 60
+#
+
+# The reference implementations return the trolley of each item
+Reference = Callable[[Sequence[float], float], array]
+
+# The largest instance for which the reference implementations are run
+DEFAULT_REFERENCE_LIMIT = 20_000
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+# The engines that scan all the trolleys for every item, and the largest instance for which they are run
+SCANNING_ENGINES = {"first_fit_decreasing"}
+DEFAULT_SCANNING_LIMIT = 20_000
+
+# The loads may be added up in a different order than the loader did, so allow for rounding differences
+_LOAD_TOLERANCE = 1e-6
+
+def reference_next_fit(weights: Sequence[float], capacity: float) -> array:
+    trolley_of_item = array("I")
+    load = 0.0
+    trolley = 0
+    for weight in weights:
+        if load + weight > capacity and load > 0:
+            trolley += 1
+            load = 0.0
+        load += weight
+        trolley_of_item.append(trolley)
+
+    return trolley_of_item
+
+def reference_first_fit(weights: Sequence[float], capacity: float) -> array:
+    trolley_of_item = array("I")
+    loads: List[float] = []
+    for weight in weights:
+        for trolley, load in enumerate(loads):
+            if load + weight <= capacity:
+                break
+        else:
+            trolley = len(loads)
+            loads.append(0.0)
+
+        loads[trolley] += weight
+        trolley_of_item.append(trolley)
+
+    return trolley_of_item
+
+def reference_best_fit(weights: Sequence[float], capacity: float) -> array:
+    trolley_of_item = array("I")
+    loads: List[float] = []
+    for weight in weights:
+        # The fullest trolley that fits, the first one if there are multiple
+        best = len(loads)
+        for trolley, load in enumerate(loads):
+            if load + weight <= capacity and (best == len(loads) or load > loads[best]):
+                best = trolley
+
+        if best == len(loads):
+            loads.append(0.0)
+
+        loads[best] += weight
+        trolley_of_item.append(best)
+
+    return trolley_of_item
+
+def reference_worst_fit(weights: Sequence[float], capacity: float) -> array:
+    trolley_of_item = array("I")
+    loads: List[float] = []
+    for weight in weights:
+        # The emptiest trolley, the first one if there are multiple, if it fits
+        trolley = min(range(len(loads)), key=loads.__getitem__, default=None)
+        if trolley is None or loads[trolley] + weight > capacity:
+            trolley = len(loads)
+            loads.append(0.0)
+
+        loads[trolley] += weight
+        trolley_of_item.append(trolley)
+
+    return trolley_of_item
+
+def reference_almost_worst_fit(weights: Sequence[float], capacity: float) -> array:
+    trolley_of_item = array("I")
+    loads: List[float] = []
+    for weight in weights:
+        # The second emptiest trolley if it fits, otherwise the emptiest trolley if it fits
+        emptiest = sorted(range(len(loads)), key=loads.__getitem__)[:2]
+        fitting = [trolley for trolley in emptiest if loads[trolley] + weight <= capacity]
+        if fitting:
+            trolley = fitting[-1]
+        else:
+            trolley = len(loads)
+            loads.append(0.0)
+
+        loads[trolley] += weight
+        trolley_of_item.append(trolley)
+
+    return trolley_of_item
+
+def decreasing(reference: Reference) -> Reference:
+    #
+    # Return the reference for the variant of the algorithm that loads the items from heaviest to lightest. The sort
+    # is stable, like the sorts of the loaders.
+    #
+    def reference_decreasing(weights: Sequence[float], capacity: float) -> array:
+        order = sorted(range(len(weights)), key=weights.__getitem__, reverse=True)
+        trolley_of_sorted_item = reference([weights[position] for position in order], capacity)
+        trolley_of_item = array("I", bytes(array("I").itemsize * len(weights)))
+        for position, trolley in zip(order, trolley_of_sorted_item):
+            trolley_of_item[position] = trolley
+
+        return trolley_of_item
+
+    return reference_decreasing
+
+reference_first_fit_decreasing = decreasing(reference_first_fit)
+reference_best_fit_decreasing = decreasing(reference_best_fit)
+
+# The reference implementation of each engine that implements the same algorithm as one of the references. Engines
+# with the same reference have to produce exactly the same assignments.
+REFERENCES: Dict[str, Reference] = {
+    "first_fit": reference_next_fit,
+    "indexed_first_fit": reference_first_fit,
+    "first_fit_decreasing": reference_first_fit_decreasing,
+    "indexed_first_fit_decreasing": reference_first_fit_decreasing,
+    "histogram": reference_first_fit_decreasing,
+    "best_fit": reference_best_fit,
+    "best_fit_decreasing": reference_best_fit_decreasing,
+    "worst_fit": reference_worst_fit,
+    "almost_worst_fit": reference_almost_worst_fit,
+}
+
+# The engines that calculate the loads exactly instead of with floating point sums, so they only match their reference
+# when the sums of the weights don't have to be rounded
+EXACT_ENGINES = {"histogram"}
+
+def has_exact_sums(weights: Sequence[float]) -> bool:
+    #
+    # Whether every sum of the weights is exact, which is the case for multiples of 1/1024 kg up to far more than the
+    # capacity of a trolley.
+    #
+    return all(float(weight * 1024).is_integer() for weight in weights)
+
+def create_cargo(weights: Sequence[float]) -> List[Cargo]:
+    #
+    # Create the cargo items for the weights. The items share their name and dimensions, which keeps instances with
+    # millions of items small enough to fit in memory.
+    #
+    create = Cargo._create_unchecked
+    return [create("Item", weight, 0.1, 1.0, 1.0) for weight in weights]
+
+def check_assignments(weights: Sequence[float], trolley_count: int, assignments: LoadAssignments, capacity: float) -> List[str]:
+    #
+    # Check the invariants of the assignments of a single engine and return a message for each invariant that failed.
+    #
+    failures = []
+    if len(assignments) != len(weights):
+        return [f"Assigned {len(assignments)} of {len(weights)} items."]
+
+    if assignments.trolley_count != trolley_count:
+        failures.append(f"The assignments use {assignments.trolley_count} trolleys, but the loader reported {trolley_count} trolleys.")
+
+    lower_bound = l1_lower_bound(list(weights), capacity)
+    if trolley_count < lower_bound:
+        failures.append(f"Used {trolley_count} trolleys, which is less than the lower bound of {lower_bound} trolleys.")
+
+    loads = [0.0] * assignments.trolley_count
+    for weight, trolley in zip(weights, assignments.trolley_of_item):
+        if trolley >= len(loads):
+            return failures + [f"An item was assigned to trolley {trolley}, but there are only {len(loads)} trolleys."]
+
+        loads[trolley] += weight
+
+    for trolley, (load, reported_load) in enumerate(zip(loads, assignments.trolley_loads)):
+        if load > capacity + _LOAD_TOLERANCE:
+            failures.append(f"Trolley {trolley} is loaded with {load}kg, which exceeds the capacity of {capacity}kg.")
+            break
+
+        if abs(load - reported_load) > _LOAD_TOLERANCE:
+            failures.append(f"Trolley {trolley} is loaded with {load}kg, but the reported load is {reported_load}kg.")
+            break
+
+    return failures
+
+def _compare_assignments(trolley_of_item: array, expected: array, expected_name: str) -> List[str]:
+    if trolley_of_item == expected:
+        return []
+
+    position = next((position for position, (trolley, expected_trolley) in enumerate(zip(trolley_of_item, expected)) if trolley != expected_trolley), len(expected))
+    return [f"Item {position} was assigned to a different trolley than by {expected_name}."]
+
+def check_batch(loader: CargoLoader, weights: Sequence[float], trolley_count: int) -> List[str]:
+    #
+    # Check that a vectorized load_batch gives the same number of trolleys as load. Skipped without NumPy.
+    #
+    if type(loader).load_batch is CargoLoader.load_batch:
+        return []
+
+    try:
+        import numpy as np
+    except ImportError:
+        return []
+
+    from cargo_loader.batch import CargoBatch
+
+    count = len(weights)
+    ones = np.ones(count)
+    batch_count = loader.load_batch(CargoBatch(np.full(count, "Item", dtype=object), np.asarray(weights, dtype=np.float64), ones * 0.1, ones, ones))
+    if batch_count != trolley_count:
+        return [f"load_batch used {batch_count} trolleys, but load used {trolley_count} trolleys."]
+
+    return []
+
+class EngineResult(object):
+    #
+    # The result of checking a single engine on an instance: the number of trolleys, the time it took to load the
+    # items (both with 'load' and with 'load_assignments') and the invariants that failed.
+    #
+
+    def __init__(self, engine: str, trolley_count: int, seconds: float, failures: List[str], trolley_of_item: Optional[array] = None):
+        self.engine = engine
+        self.trolley_count = trolley_count
+        self.seconds = seconds
+        self.failures = failures
+        self.trolley_of_item = trolley_of_item
+
+def check_engine(engine: str, weights: Sequence[float], options: Optional[Mapping[str, object]] = None, capacity: float = TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG, cargo_items: Optional[List[Cargo]] = None) -> EngineResult:
+    #
+    # Load the weights with the engine and check the invariants. The assignments are kept, so they can be compared
+    # with the assignments of other engines. The result of a loader that isn't deterministic, e.g. because it stops
+    # at a time limit, can differ between 'load' and 'load_assignments', so only its assignments are checked.
+    #
+    loader = create_loader(engine, options or {})
+    if cargo_items is None:
+        cargo_items = create_cargo(weights)
+
+    start = time.perf_counter()
+    trolley_count = loader.load(list(cargo_items))
+    assignments = loader.load_assignments(cargo_items)
+    seconds = time.perf_counter() - start
+
+    if not loader.is_deterministic:
+        trolley_count = assignments.trolley_count
+
+    failures = check_assignments(weights, trolley_count, assignments, capacity)
+    if loader.is_deterministic:
+        failures.extend(check_batch(loader, weights, trolley_count))
+    return EngineResult(engine, trolley_count, seconds, failures, assignments.trolley_of_item)
+
+def check_instance(
+        weights: Sequence[float],
+        engines: Optional[Sequence[str]] = None,
+        options: Optional[Mapping[str, object]] = None,
+        capacity: float = TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG,
+        reference_limit: int = DEFAULT_REFERENCE_LIMIT) -> List[str]:
+    #
+    # Check the engines (defaults to all registered loaders) on a single instance and return the failures, each
+    # prefixed with the name of the engine.
+    #
+    failures = []
+    results = _check_engines(weights, engines or loader_names(), options, capacity, reference_limit)
+    for result in results:
+        failures.extend(f"{result.engine}: {failure}" for failure in result.failures)
+
+    return failures
+
+def _check_engines(
+        weights: Sequence[float],
+        engines: Sequence[str],
+        options: Optional[Mapping[str, object]],
+        capacity: float,
+        reference_limit: int,
+        cargo_items: Optional[List[Cargo]] = None) -> List[EngineResult]:
+    cargo_items = create_cargo(weights) if cargo_items is None else cargo_items
+    exact = has_exact_sums(weights)
+
+    # The assignments that each reference should produce, with the name of the engine or reference they came from
+    expected: Dict[Reference, tuple] = {}
+    results = []
+    for engine in engines:
+        result = check_engine(engine, weights, options, capacity, cargo_items)
+        results.append(result)
+
+        reference = REFERENCES.get(engine)
+        if reference is None or (engine in EXACT_ENGINES and not exact):
+            continue
+
+        if reference not in expected:
+            if len(weights) <= reference_limit:
+                expected[reference] = (reference(weights, capacity), reference.__name__)
+            else:
+                # Without a reference the first engine of the algorithm is the reference for the others
+                expected[reference] = (result.trolley_of_item, engine)
+                continue
+
+        trolley_of_item, expected_name = expected[reference]
+        result.failures.extend(_compare_assignments(result.trolley_of_item, trolley_of_item, expected_name))
+
+    for result in results:
+        result.trolley_of_item = None
+
+    return results
+
+def run_stress(
+        sizes: Sequence[int],
+        distributions: Sequence[str],
+        engines: Optional[Sequence[str]] = None,
+        seed: int = 0,
+        time_budget_in_seconds: float = 60.0,
+        reference_limit: int = DEFAULT_REFERENCE_LIMIT,
+        options: Optional[Mapping[str, object]] = None,
+        log: Callable[[str], None] = lambda message: None,
+        scanning_limit: int = DEFAULT_SCANNING_LIMIT) -> List[Dict[str, object]]:
+    #
+    # Check the engines on seeded instances of each distribution and size and return one result per engine,
+    # distribution and size that was run. A size is skipped for an engine when the time predicted from its earlier
+    # runs is over the time budget, and for the scanning engines when it is larger than the scanning limit.
+    #
+    engines = list(engines or loader_names())
+    budget = TimeBudget(time_budget_in_seconds)
+    results = []
+    for distribution in distributions:
+        for size in sorted(sizes):
+            active = []
+            for engine in engines:
+                if engine in SCANNING_ENGINES and size > scanning_limit:
+                    log(f"{engine} {distribution} {size}: skipped, the engine is only run up to {scanning_limit} items")
+                    continue
+
+                predicted = budget.exceeded_by((engine, distribution), size, MAXIMUM_EXPONENT if engine in SCANNING_ENGINES else 1.0)
+                if predicted is not None:
+                    log(f"{engine} {distribution} {size}: skipped, predicted {predicted:.1f}s is over the time budget")
+                    continue
+
+                active.append(engine)
+
+            if not active:
+                continue
+
+            weights = generate_weights(distribution, size, seed)
+            lower_bound = l1_lower_bound(weights, TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG)
+            for result in _check_engines(weights, active, options, TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG, reference_limit):
+                results.append({
+                    "engine": result.engine,
+                    "distribution": distribution,
+                    "size": size,
+                    "seconds": result.seconds,
+                    "trolleys": result.trolley_count,
+                    "lower_bound": lower_bound,
+                    "failures": result.failures,
+                })
+                log(f"{result.engine} {distribution} {size}: {result.seconds:.3f}s, {result.trolley_count} trolleys (lower bound {lower_bound})")
+                for failure in result.failures:
+                    log(f"  FAILED: {failure}")
+
+                budget.record((result.engine, distribution), size, result.seconds)
+
+    return results
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Check the cargo loaders against reference implementations and invariants on seeded instances.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=[str(size) for size in DEFAULT_SIZES], help="The numbers of cargo items, e.g. 1e3 1e5 1e7.")
+    parser.add_argument("--distributions", nargs="+", choices=list(DISTRIBUTIONS), default=list(DISTRIBUTIONS), help="The weight distributions of the cargo.")
+    parser.add_argument("--engines", nargs="+", choices=loader_names(), default=None, help="The names of the algorithms to check. Defaults to all algorithms.")
+    parser.add_argument("--seed", type=int, default=0, help="The seed for the cargo generators.")
+    parser.add_argument("--time-budget", type=float, default=60.0, help="Skip the sizes for which the time of an engine, predicted from the smaller sizes, is longer than this number of seconds.")
+    parser.add_argument("--reference-limit", type=float, default=DEFAULT_REFERENCE_LIMIT, help="The largest number of cargo items for which the reference implementations are run.")
+    parser.add_argument("--scanning-limit", type=float, default=DEFAULT_SCANNING_LIMIT, help=f"The largest number of cargo items for which the engines that scan all the trolleys ({', '.join(sorted(SCANNING_ENGINES))}) are run.")
+    parser.add_argument("--optimal-time-limit", type=float, default=1.0, help="The time limit in seconds for the 'optimal' algorithm.")
+    parser.add_argument("--output", default=None, help="The file the JSON results are written to.")
+    args = parser.parse_args(argv)
+
+    results = run_stress(
+        [int(float(size)) for size in args.sizes],
+        args.distributions,
+        engines=args.engines,
+        seed=args.seed,
+        time_budget_in_seconds=args.time_budget,
+        reference_limit=int(args.reference_limit),
+        options={"time_limit": args.optimal_time_limit},
+        log=lambda message: print(message, file=sys.stderr),
+        scanning_limit=int(args.scanning_limit))
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failed = [result for result in results if result["failures"]]
+    print(f"Checked {len(results)} runs, {len(failed)} failed")
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import math
+import random
+from typing import Callable, Dict, List
+
+from cargo_loader.cargo import Cargo
+from cargo_loader.trolley import TROLLEY_MAXIMUM_CARGO_VOLUME_IN_M3, TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG
+
+#
+# Seeded generators for synthetic cargo. The same distribution, count and seed always produce exactly the same cargo
+# so that benchmark results can be compared between runs and commits.
+#
+
+# The weights are rounded to this number of decimals, like the weights in real manifests
+WEIGHT_DECIMALS = 1
+
+_MINIMUM_WEIGHT_IN_KG = 0.1
+
+def _clip(weight: float) -> float:
+    return min(Cargo.CARGO_MAX_WEIGHT_IN_KG, max(_MINIMUM_WEIGHT_IN_KG, round(weight, WEIGHT_DECIMALS)))
+
+def uniform_weights(count: int, generator: random.Random) -> List[float]:
+    #
+    # Weights spread evenly over the allowed range.
+    #
+    return [_clip(generator.uniform(_MINIMUM_WEIGHT_IN_KG, Cargo.CARGO_MAX_WEIGHT_IN_KG)) for _ in range(count)]
+
+def bimodal_weights(count: int, generator: random.Random) -> List[float]:
+    #
+    # A mix of light parcels (around 20kg) and heavy crates (around 180kg).
+    #
+    return [
+        _clip(generator.gauss(20, 5) if generator.random() < 0.5 else generator.gauss(180, 10))
+        for _ in range(count)
+    ]
+
+def heavy_tail_weights(count: int, generator: random.Random) -> List[float]:
+    #
+    # Mostly light items with a long (Pareto) tail of heavy items.
+    #
+    return [_clip(5 * generator.paretovariate(1.2)) for _ in range(count)]
+
+def adversarial_weights(count: int, generator: random.Random) -> List[float]:
+    #
+    # Weights that waste as much trolley space as possible. Items that are just heavier than 1/11th of the capacity
+    # only fit ten to a trolley and leave a gap that is just too small for the next heavy item. They are interleaved
+    # with medium items that are just heavier than half of that gap, so only one of them fits in each gap.
+    #
+    heavy = math.floor(TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG / 11 * 10 + 1) / 10
+    gap = TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG - 10 * heavy
+    medium = round(gap / 2 + 0.1, WEIGHT_DECIMALS)
+
+    weights = []
+    for index in range(count):
+        if index % 4 == 3:
+            weights.append(_clip(medium + generator.choice((0.0, 0.1))))
+        else:
+            weights.append(_clip(heavy + generator.choice((0.0, 0.1))))
+
+    return weights
+
+DISTRIBUTIONS: Dict[str, Callable[[int, random.Random], List[float]]] = {
+    "uniform": uniform_weights,
+    "bimodal": bimodal_weights,
+    "heavy_tail": heavy_tail_weights,
+    "adversarial": adversarial_weights,
+}
+
+def generate_weights(distribution: str, count: int, seed: int = 0) -> List[float]:
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution {distribution}. The available distributions are: {', '.join(DISTRIBUTIONS)}.")
+
+    return DISTRIBUTIONS[distribution](count, random.Random(f"{distribution}-{count}-{seed}"))
+
+def generate_cargo(distribution: str, count: int, seed: int = 0) -> List[Cargo]:
+    weights = generate_weights(distribution, count, seed)
+    return Cargo.from_columns([str(index) for index in range(count)], weights, [0.5] * count, [1.0] * count, [2.0] * count)
+
+def generate_vector_cargo(distribution: str, count: int, seed: int = 0) -> List[Cargo]:
+    #
+    # Cargo whose volumes are independent of the weights, but take up the same share of a trolley on average, so that
+    # both the weight and the volume limit the trolleys of the vector loaders. The items of generate_cargo all have
+    # the same volume, which makes loading them by volume easy.
+    #
+    weights = generate_weights(distribution, count, seed)
+    if count == 0:
+        return []
+
+    average_volume = sum(weights) / count / TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG * TROLLEY_MAXIMUM_CARGO_VOLUME_IN_M3
+    generator = random.Random(f"volume-{distribution}-{count}-{seed}")
+    volumes = [min(Cargo.CARGO_MAX_VOLUME_IN_M3, max(0.01, round(generator.uniform(0, 2 * average_volume), 2))) for _ in range(count)]
+    return Cargo.from_columns([str(index) for index in range(count)], weights, [0.5] * count, [1.0] * count, [2 * volume for volume in volumes])
+
+def write_yaml_file(path: str, cargo_items: List[Cargo]):
+    #
+    # Write the cargo items in the same YAML layout as the sample manifests.
+    #
+    with open(path, "w") as f:
+        for cargo in cargo_items:
+            f.write(f"{cargo.name}:\n  mass: {cargo.weight_in_kg}\n  volume: [{cargo.length_in_m}, {cargo.width_in_m}, {cargo.height_in_m}]\n")
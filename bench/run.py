@@ -0,0 +1,287 @@
+import argparse
+import datetime
+import gc
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from bench.budget import MAXIMUM_EXPONENT, TimeBudget
+from bench.generators import DISTRIBUTIONS, generate_cargo, generate_vector_cargo, write_yaml_file
+from cargo_loader.cargo import Cargo
+from cargo_loader.loader import CargoLoader
+from cargo_loader.optimal import OptimalLoader, l1_lower_bound
+from cargo_loader.registry import loader_names, loader_registration
+
+#
+# Runs the benchmarks for all the loaders and for reading cargo files, and writes the results to a JSON file that can
+# be compared with the results of another commit using bench/compare.py.
+#
+# Usage:
+#
+#   python -m bench.run --sizes 1e3 1e4 1e5 --output bench_results.json
+#
+
+# The modules that contain the registered loaders. All the (non-abstract) CargoLoader subclasses in these modules are
+# benchmarked.
+LOADER_MODULES = list(dict.fromkeys(loader_registration(name).module for name in loader_names()))
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+# The loaders that scan all the trolleys for every item in 'load', whose time grows quadratically with the number of
+# items
+SCANNING_LOADERS = {"FirstFitDecreasingLoader"}
+
+# The loaders that also limit the volume of the trolleys. They are benchmarked once more with cargo whose weight and
+# volume both limit the trolleys.
+VECTOR_LOADERS = {"VectorFirstFitLoader", "VectorFirstFitDecreasingLoader", "VectorDotProductLoader"}
+
+def discover_loaders() -> Dict[str, type]:
+    for module in LOADER_MODULES:
+        importlib.import_module(module)
+
+    loaders = {}
+    pending = list(CargoLoader.__subclasses__())
+    while pending:
+        loader_type = pending.pop(0)
+        pending.extend(loader_type.__subclasses__())
+        if not getattr(loader_type, "__abstractmethods__", None):
+            loaders[loader_type.__name__] = loader_type
+
+    return loaders
+
+def _measure(function: Callable[[], object], measure_memory: bool) -> Dict[str, object]:
+    #
+    # Run the function once for the timing and, if requested, once more with tracemalloc to find the peak memory use.
+    # Tracemalloc slows down the function a lot so the two measurements can't be combined.
+    #
+    gc.collect()
+    start = time.perf_counter()
+    value = function()
+    seconds = time.perf_counter() - start
+
+    peak_memory = None
+    if measure_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            function()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {"value": value, "seconds": seconds, "peak_memory_bytes": peak_memory}
+
+def _result(benchmark: str, name: str, distribution: str, size: int, measurement: Dict[str, object]) -> Dict[str, object]:
+    seconds = measurement["seconds"]
+    return {
+        "benchmark": benchmark,
+        "name": name,
+        "distribution": distribution,
+        "size": size,
+        "seconds": seconds,
+        "items_per_second": size / seconds if seconds > 0 else None,
+        "peak_memory_bytes": measurement["peak_memory_bytes"],
+    }
+
+def run_benchmarks(
+        sizes: Sequence[int],
+        distributions: Sequence[str],
+        loader_names: Optional[Sequence[str]] = None,
+        seed: int = 0,
+        time_budget_in_seconds: float = 10.0,
+        optimal_time_limit_in_seconds: float = 1.0,
+        measure_memory: bool = True,
+        maximum_file_size: int = 100_000,
+        log: Callable[[str], None] = lambda message: None) -> List[Dict[str, object]]:
+    #
+    # Run all the benchmarks and return one result per benchmark, loader, distribution and size that was run. A size
+    # is skipped for a benchmark when the time predicted from its runs on the smaller sizes is over the time budget
+    # (see bench/budget.py).
+    #
+    loaders = discover_loaders()
+    if loader_names is not None:
+        loaders = {name: loaders[name] for name in loader_names}
+
+    results = []
+    budget = TimeBudget(time_budget_in_seconds)
+    for distribution in distributions:
+        for size in sorted(sizes):
+            cargo_items = generate_cargo(distribution, size, seed)
+            lower_bound = l1_lower_bound([cargo.weight_in_kg for cargo in cargo_items], OptimalLoader().capacity)
+
+            for name, loader_type in loaders.items():
+                key = ("load", name, distribution)
+                if _over_budget(budget, key, size, log):
+                    continue
+
+                loader = loader_type()
+                if isinstance(loader, OptimalLoader):
+                    loader.time_limit_in_seconds = optimal_time_limit_in_seconds
+
+                # Some loaders sort the list in place, so give each run its own copy
+                measurement = _measure(lambda: loader.load(list(cargo_items)), measure_memory)
+                result = _result("load", name, distribution, size, measurement)
+                result["trolleys"] = measurement["value"]
+                result["lower_bound"] = lower_bound
+                result["trolleys_over_lower_bound"] = measurement["value"] / lower_bound if lower_bound > 0 else None
+                results.append(result)
+                log(f"load {name} {distribution} {size}: {result['seconds']:.3f}s, {result['trolleys']} trolleys (lower bound {lower_bound})")
+
+                budget.record(key, size, measurement["seconds"])
+
+            results.extend(_run_batch_benchmarks(loaders, cargo_items, distribution, size, measure_memory, optimal_time_limit_in_seconds, budget, log))
+            results.extend(_run_vector_benchmarks(loaders, distribution, size, seed, measure_memory, budget, log))
+
+            if size <= maximum_file_size:
+                results.extend(_run_file_benchmarks(cargo_items, distribution, size, measure_memory, log))
+
+    return results
+
+def _over_budget(budget: TimeBudget, key: Tuple[str, str, str], size: int, log: Callable[[str], None]) -> bool:
+    benchmark, name, distribution = key
+    predicted = budget.exceeded_by(key, size, MAXIMUM_EXPONENT if benchmark == "load" and name in SCANNING_LOADERS else 1.0)
+    if predicted is None:
+        return False
+
+    log(f"{benchmark} {name} {distribution} {size}: skipped, predicted {predicted:.1f}s is over the time budget")
+    return True
+
+def _run_batch_benchmarks(
+        loaders: Dict[str, type],
+        cargo_items: List[Cargo],
+        distribution: str,
+        size: int,
+        measure_memory: bool,
+        optimal_time_limit_in_seconds: float,
+        budget: TimeBudget,
+        log: Callable[[str], None]) -> List[Dict[str, object]]:
+    #
+    # Benchmark the columnar (NumPy) loading path. These benchmarks are skipped if NumPy is not installed.
+    #
+    try:
+        from cargo_loader.batch import CargoBatch
+    except ImportError:
+        return []
+
+    batch = CargoBatch.from_cargo(cargo_items)
+
+    results = []
+    for name, loader_type in loaders.items():
+        key = ("load_batch", name, distribution)
+        if _over_budget(budget, key, size, log):
+            continue
+
+        loader = loader_type()
+        if isinstance(loader, OptimalLoader):
+            loader.time_limit_in_seconds = optimal_time_limit_in_seconds
+
+        measurement = _measure(lambda: loader.load_batch(batch), measure_memory)
+        result = _result("load_batch", name, distribution, size, measurement)
+        result["trolleys"] = measurement["value"]
+        results.append(result)
+        log(f"load_batch {name} {distribution} {size}: {result['seconds']:.3f}s, {result['trolleys']} trolleys")
+
+        budget.record(key, size, measurement["seconds"])
+
+    return results
+
+def _run_vector_benchmarks(
+        loaders: Dict[str, type],
+        distribution: str,
+        size: int,
+        seed: int,
+        measure_memory: bool,
+        budget: TimeBudget,
+        log: Callable[[str], None]) -> List[Dict[str, object]]:
+    #
+    # Benchmark the vector loaders with cargo whose weight and volume both limit the trolleys, which is when their
+    # indexes have to do the most work.
+    #
+    names = [name for name in loaders if name in VECTOR_LOADERS]
+    if not names:
+        return []
+
+    cargo_items = generate_vector_cargo(distribution, size, seed)
+    results = []
+    for name in names:
+        key = ("load_vector", name, distribution)
+        if _over_budget(budget, key, size, log):
+            continue
+
+        loader = loaders[name]()
+        measurement = _measure(lambda: loader.load(list(cargo_items)), measure_memory)
+        result = _result("load_vector", name, distribution, size, measurement)
+        result["trolleys"] = measurement["value"]
+        results.append(result)
+        log(f"load_vector {name} {distribution} {size}: {result['seconds']:.3f}s, {result['trolleys']} trolleys")
+
+        budget.record(key, size, measurement["seconds"])
+
+    return results
+
+def _run_file_benchmarks(cargo_items: List[Cargo], distribution: str, size: int, measure_memory: bool, log: Callable[[str], None]) -> List[Dict[str, object]]:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cargo.yaml")
+        write_yaml_file(path, cargo_items)
+
+        results = []
+        for name, function in (("from_file", lambda: len(Cargo.from_file(path))), ("iter_file", lambda: sum(1 for _ in Cargo.iter_file(path)))):
+            result = _result("read", name, distribution, size, _measure(function, measure_memory))
+            results.append(result)
+            log(f"read {name} {distribution} {size}: {result['seconds']:.3f}s")
+
+        return results
+
+def _metadata() -> Dict[str, object]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the cargo loaders and the cargo file readers.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=[str(size) for size in DEFAULT_SIZES], help="The numbers of cargo items, e.g. 1e3 1e4 1e7.")
+    parser.add_argument("--distributions", nargs="+", choices=list(DISTRIBUTIONS), default=list(DISTRIBUTIONS), help="The weight distributions of the cargo.")
+    parser.add_argument("--loaders", nargs="+", default=None, help="The names of the loader classes to benchmark. Defaults to all loaders.")
+    parser.add_argument("--seed", type=int, default=0, help="The seed for the cargo generators.")
+    parser.add_argument("--time-budget", type=float, default=10.0, help="Skip the sizes for which the time of a loader, predicted from the smaller sizes, is longer than this number of seconds.")
+    parser.add_argument("--optimal-time-limit", type=float, default=1.0, help="The time limit in seconds for the OptimalLoader.")
+    parser.add_argument("--max-file-size", type=float, default=1e5, help="The largest number of cargo items for the file reading benchmarks.")
+    parser.add_argument("--no-memory", action="store_true", help="Don't measure the peak memory, which halves the run time.")
+    parser.add_argument("--output", default="bench_results.json", help="The file the JSON results are written to.")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        [int(float(size)) for size in args.sizes],
+        args.distributions,
+        loader_names=args.loaders,
+        seed=args.seed,
+        time_budget_in_seconds=args.time_budget,
+        optimal_time_limit_in_seconds=args.optimal_time_limit,
+        measure_memory=not args.no_memory,
+        maximum_file_size=int(args.max_file_size),
+        log=lambda message: print(message, file=sys.stderr))
+
+    with open(args.output, "w") as f:
+        json.dump({"metadata": _metadata(), "results": results}, f, indent=2)
+
+    print(f"Wrote {len(results)} results to {args.output}")
+
+if __name__ == '__main__':
+    main()
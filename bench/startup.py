@@ -0,0 +1,111 @@
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+#
+# Measures how long the command line takes to import its modules, using 'python -X importtime', for a run that loads
+# a few cargo items given with --cargo. The command line is often started many times in a row, e.g. from cron jobs,
+# so the time spent importing modules is a large part of the time each run takes.
+#
+# Usage:
+#
+#   python -m bench.startup --repeat 5
+#
+# The exit code is 1 if the import time is over the budget, or if one of the modules that should only be imported
+# when they are needed (see LAZY_MODULES) was imported, so the check can be used in a CI pipeline.
+#
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The arguments of the run that is measured
+DEFAULT_ARGUMENTS = ["--cargo", "Item1,100,1,1,1", "--cargo", "Item2,50,1,1,1"]
+
+# The maximum total import time of the measured run. The time measured with -X importtime includes the overhead of
+# measuring it, so this is larger than the time the imports take in a normal run.
+STARTUP_BUDGET_IN_MS = 150.0
+
+# The modules that the measured run should not import, because they are only needed for reading files in a specific
+# format, for some of the algorithms, for the cache, or for the other commands
+LAZY_MODULES = [
+    "yaml",
+    "csv",
+    "json",
+    "numpy",
+    "concurrent.futures",
+    "http.server",
+    "cargo_loader.cache",
+    "cargo_loader.optimal",
+    "cargo_loader.vector",
+    "cargo_loader.server",
+    "cargo_loader.batch",
+]
+
+def measure_imports(arguments: Sequence[str] = DEFAULT_ARGUMENTS, environment: Optional[Mapping[str, str]] = None) -> Dict[str, int]:
+    #
+    # Run main.py with the arguments and return the time in microseconds it took to import each module, excluding the
+    # time taken by the modules it imported itself.
+    #
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.join(REPOSITORY_DIRECTORY, "main.py"), *arguments],
+        cwd=REPOSITORY_DIRECTORY,
+        env=None if environment is None else {**os.environ, **environment},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True)
+
+    imports = {}
+    for line in completed.stderr.splitlines():
+        # The lines look like 'import time:       123 |        456 |   package.module'
+        if not line.startswith("import time:"):
+            continue
+
+        self_time, _, name = line[len("import time:"):].split("|")
+        if self_time.strip().isdigit():
+            imports[name.strip()] = int(self_time)
+
+    return imports
+
+def measure_startup(
+        arguments: Sequence[str] = DEFAULT_ARGUMENTS,
+        repeat: int = 3,
+        environment: Optional[Mapping[str, str]] = None) -> Tuple[float, Dict[str, int]]:
+    #
+    # Return the total import time in milliseconds of the fastest of 'repeat' runs, together with the import time of
+    # each module in that run.
+    #
+    if repeat < 1:
+        raise ValueError(f"The number of runs should be at least 1, but it is {repeat}.")
+
+    runs = [measure_imports(arguments, environment) for _ in range(repeat)]
+    fastest = min(runs, key=lambda imports: sum(imports.values()))
+    return sum(fastest.values()) / 1000, fastest
+
+def imported_lazy_modules(imports: Mapping[str, int]) -> List[str]:
+    return [name for name in LAZY_MODULES if name in imports]
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure the time the command line spends importing modules.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="The number of runs. The fastest run is reported.")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_IN_MS, help="The maximum total import time in milliseconds.")
+    parser.add_argument("--top", type=int, default=10, help="The number of slowest modules to list.")
+    args = parser.parse_args(argv)
+
+    total_in_ms, imports = measure_startup(repeat=args.repeat)
+    for name, self_time in sorted(imports.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{self_time / 1000:8.2f}ms {name}")
+
+    print(f"Imported {len(imports)} modules in {total_in_ms:.2f}ms (budget {args.budget:.2f}ms)")
+
+    lazy_modules = imported_lazy_modules(imports)
+    if lazy_modules:
+        print(f"Imported modules that should only be imported when they are needed: {', '.join(lazy_modules)}")
+
+    return 1 if lazy_modules or total_in_ms > args.budget else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+from array import array
+from typing import IO, TYPE_CHECKING, Iterable, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# The formats in which the assignments can be written
+OUTPUT_FORMATS = ("json", "csv", "npy")
+
+class LoadAssignments(object):
+    #
+    # Stores which trolley each cargo item was loaded into, together with the total load of each trolley.
+    #
+    # The trolley of the item at position i of the input is stored at position i of 'trolley_of_item'. Both
+    # columns are compact arrays instead of lists of Python objects, so they take 4 and 8 bytes per item or trolley
+    # and can be shared with NumPy without copying them.
+    #
+
+    def __init__(self, trolley_of_item: array, trolley_loads: array):
+        if trolley_of_item.typecode != "I" or trolley_loads.typecode != "d":
+            raise ValueError("The trolley of each item should be an array('I') and the trolley loads an array('d').")
+
+        self.trolley_of_item = trolley_of_item
+        self.trolley_loads = trolley_loads
+
+    def __len__(self) -> int:
+        return len(self.trolley_of_item)
+
+    @property
+    def trolley_count(self) -> int:
+        return len(self.trolley_loads)
+
+    def to_numpy(self) -> Tuple['np.ndarray', 'np.ndarray']:
+        #
+        # Return the trolley of each item and the trolley loads as NumPy arrays that share the memory of the arrays.
+        #
+        import numpy as np
+        return (
+            np.frombuffer(self.trolley_of_item, dtype=np.dtype(f"=u{self.trolley_of_item.itemsize}")),
+            np.frombuffer(self.trolley_loads, dtype=np.float64),
+        )
+
+def assignments_from_order(order: Sequence[int], trolley_of_sorted_item: Iterable[int], trolley_loads: Iterable[float]) -> LoadAssignments:
+    #
+    # Create the assignments for a loader that loaded the items in a different order than they were provided in, e.g.
+    # sorted by weight. 'order' contains the position in the input of each loaded item.
+    #
+    trolley_of_item = array("I", bytes(array("I").itemsize * len(order)))
+    for position, trolley in zip(order, trolley_of_sorted_item):
+        trolley_of_item[position] = trolley
+
+    return LoadAssignments(trolley_of_item, array("d", trolley_loads))
+
+def write_assignments(assignments: LoadAssignments, names: Sequence[str], output_format: str, stream: IO):
+    #
+    # Write the assignments to a stream, which has to be a binary stream for the 'npy' format and a text stream for
+    # the other formats:
+    #
+    # - 'json': '{"trolley_count": 2, "trolley_loads": [...], "items": [{"name": "Item1", "trolley": 0}, ...]}'
+    # - 'csv': A header row followed by a 'name,trolley' row per item.
+    # - 'npy': The trolley of each item as a NumPy array of unsigned integers. Requires NumPy.
+    #
+    # The items are written one at a time, so no copy of the output is built in memory.
+    #
+    import csv
+    import json
+
+    if output_format == "json":
+        stream.write(f'{{"trolley_count": {assignments.trolley_count}, "trolley_loads": {json.dumps(assignments.trolley_loads.tolist())}, "items": [')
+        for index, (name, trolley) in enumerate(zip(names, assignments.trolley_of_item)):
+            stream.write(f'{", " if index > 0 else ""}{{"name": {json.dumps(name)}, "trolley": {trolley}}}')
+        stream.write("]}\n")
+    elif output_format == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(("name", "trolley"))
+        writer.writerows(zip(names, assignments.trolley_of_item))
+    elif output_format == "npy":
+        import numpy as np
+        np.save(stream, assignments.to_numpy()[0])
+    else:
+        raise ValueError(f"Unknown output format {output_format}. The available formats are: {', '.join(OUTPUT_FORMATS)}.")
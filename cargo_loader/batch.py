@@ -0,0 +1,332 @@
+from bisect import bisect_left
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+from cargo_loader.capacity_index import BestFitIndex, FirstFitIndex
+from cargo_loader.cargo import Cargo
+from cargo_loader.manifest import ManifestNames
+
+# Runs of identical weights that are shorter than this are placed one item at a time because the overhead of calling
+# into numpy is larger than the time it takes to place a few items.
+_MINIMUM_VECTORIZED_RUN_LENGTH = 8
+
+# The largest number of values in the arrays that next_fit_count uses to check the ends of a group of trolleys at once
+_MAXIMUM_CHECK_SIZE = 1 << 20
+
+class CargoBatch(object):
+    #
+    # Stores a collection of cargo items in columnar form. Each of the properties of the cargo items (name, weight and
+    # the three dimensions) is stored in a separate NumPy array. This allows the loaders to process large amounts of
+    # cargo without having to access the attributes of each Cargo object one at a time.
+    #
+
+    def __init__(
+            self,
+            names: Union[Sequence[str], np.ndarray],
+            weights_in_kg: Union[Sequence[float], np.ndarray],
+            lengths_in_m: Union[Sequence[float], np.ndarray],
+            widths_in_m: Union[Sequence[float], np.ndarray],
+            heights_in_m: Union[Sequence[float], np.ndarray]):
+        # The names of a memory mapped manifest are kept as they are, so that they are only decoded when needed
+        self.names = names if isinstance(names, ManifestNames) else np.asarray(names, dtype=object)
+        self.weights_in_kg = np.asarray(weights_in_kg, dtype=np.float64)
+        self.lengths_in_m = np.asarray(lengths_in_m, dtype=np.float64)
+        self.widths_in_m = np.asarray(widths_in_m, dtype=np.float64)
+        self.heights_in_m = np.asarray(heights_in_m, dtype=np.float64)
+
+        count = len(self.names)
+        for column in (self.weights_in_kg, self.lengths_in_m, self.widths_in_m, self.heights_in_m):
+            if column.ndim != 1 or len(column) != count:
+                raise ValueError(f"All columns of a cargo batch must be one dimensional and have the same length. Expected {count} values but got an array with shape {column.shape}.")
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @staticmethod
+    def from_cargo(cargo_items: Sequence[Cargo]) -> 'CargoBatch':
+        return CargoBatch(
+            [cargo.name for cargo in cargo_items],
+            [cargo.weight_in_kg for cargo in cargo_items],
+            [cargo.length_in_m for cargo in cargo_items],
+            [cargo.width_in_m for cargo in cargo_items],
+            [cargo.height_in_m for cargo in cargo_items])
+
+    def validation_errors(self) -> List[str]:
+        #
+        # Validate all the items in the batch at once and return the error messages for the invalid items, in the same
+        # format as Cargo.validate_many. Returns an empty list if all the items are valid.
+        #
+        weights_in_kg = self.weights_in_kg
+        volumes_in_m3 = self.lengths_in_m * self.widths_in_m * self.heights_in_m
+        invalid = (
+            (weights_in_kg <= 0) | (weights_in_kg > Cargo.CARGO_MAX_WEIGHT_IN_KG)
+            | (self.lengths_in_m <= 0) | (self.widths_in_m <= 0) | (self.heights_in_m <= 0)
+            | (volumes_in_m3 > Cargo.CARGO_MAX_VOLUME_IN_M3))
+
+        invalid_rows = set(np.flatnonzero(invalid).tolist())
+        if isinstance(self.names, ManifestNames):
+            invalid_rows.update(self.names.invalid_rows())
+        else:
+            invalid_rows.update(row for row, name in enumerate(self.names.tolist()) if name is None or name == "" or name.isspace())
+
+        return [
+            f"Row {row}: {Cargo.validation_error(self.names[row], float(weights_in_kg[row]), float(self.lengths_in_m[row]), float(self.widths_in_m[row]), float(self.heights_in_m[row]))}"
+            for row in sorted(invalid_rows)
+        ]
+
+    def to_cargo(self) -> List[Cargo]:
+        return Cargo.from_columns(
+            self.names.tolist(),
+            self.weights_in_kg.tolist(),
+            self.lengths_in_m.tolist(),
+            self.widths_in_m.tolist(),
+            self.heights_in_m.tolist())
+
+def _runs(weights_in_kg: np.ndarray) -> Tuple[List[float], List[int]]:
+    #
+    # Split the weights into runs of consecutive identical weights and return the weight and length of each run.
+    #
+    count = len(weights_in_kg)
+    if count == 0:
+        return [], []
+
+    starts = np.flatnonzero(np.concatenate(([True], weights_in_kg[1:] != weights_in_kg[:-1])))
+    lengths = np.diff(np.append(starts, count))
+    return weights_in_kg[starts].tolist(), lengths.tolist()
+
+def _fill(load: float, weight: float, count: int, capacity: float) -> Tuple[int, float]:
+    #
+    # Add up to 'count' items of the given weight to a trolley with the given load, one item at a time, until the next
+    # item doesn't fit anymore. Returns the number of items that were added and the new load of the trolley.
+    #
+    # The items are added with a sequential (not a pairwise) sum so that the new load is exactly the same value as
+    # the loaders that add the items one by one would calculate.
+    #
+    placed = 0
+    while placed < count:
+        step = min(count - placed, int((capacity - load) // weight) + 2)
+        sums = np.add.accumulate(np.concatenate(([load], np.full(step, weight))))
+        fitted = int(np.searchsorted(sums[1:], capacity, side='right'))
+        placed += fitted
+        load = float(sums[fitted])
+        if fitted < step:
+            break
+
+    return placed, load
+
+def _place_decreasing_items(index: FirstFitIndex, weights: Sequence[float]):
+    #
+    # Place the items, which are sorted from heaviest to lightest and follow the items already in the index, into the
+    # left most trolley that fits them.
+    #
+    # Every item fits into the last trolley unless the trolley is full, so most of the items don't need a search of
+    # the index. An item goes into one of the other trolleys only if it fits the one with the smallest load, which
+    # only changes when an item is placed into one of them or when a new trolley is opened. Both checks are the same
+    # 'load + weight <= capacity' comparison that the index makes, so the trolleys are exactly the same.
+    #
+    capacity = index.capacity
+    last = index.count - 1
+    last_load = index.load_of(last) if last >= 0 else capacity
+    smallest_other_load = index.minimum_load(last) if last > 0 else float("inf")
+    for weight in weights:
+        if smallest_other_load + weight <= capacity:
+            index.set_load(last, last_load)
+            index.place(weight)
+            smallest_other_load = index.minimum_load(last)
+        elif last_load + weight <= capacity:
+            last_load += weight
+        else:
+            if last >= 0:
+                index.set_load(last, last_load)
+                if last_load < smallest_other_load:
+                    smallest_other_load = last_load
+
+            if weight > capacity:
+                raise ValueError(f"Weight {weight}kg exceeds the capacity of a single trolley, which is {capacity}kg.")
+
+            last += 1
+            last_load = weight
+
+    if last >= 0:
+        index.set_load(last, last_load)
+
+def _place_runs(index, weights_in_kg: np.ndarray, decreasing: bool = False) -> int:
+    #
+    # Place the items in the given order into the trolleys of the index and return the number of trolleys used.
+    #
+    # For both first-fit and best-fit consecutive items with the same weight go into the same trolley until that
+    # trolley is full, and then into the next trolley that the index selects. That means that each run of identical
+    # items can be placed one trolley at a time instead of one item at a time. The items of the shorter runs are placed
+    # one at a time, which for first-fit-decreasing (see _place_decreasing_items) rarely needs a search of the index.
+    #
+    capacity = index.capacity
+    weights, counts = _runs(weights_in_kg)
+    start = 0
+    while start < len(weights):
+        stop = start
+        while stop < len(weights) and counts[stop] < _MINIMUM_VECTORIZED_RUN_LENGTH:
+            stop += 1
+
+        if stop > start:
+            short_runs = [weight for weight, count in zip(weights[start:stop], counts[start:stop]) for _ in range(count)]
+            if decreasing:
+                _place_decreasing_items(index, short_runs)
+            else:
+                for weight in short_runs:
+                    index.place(weight)
+
+            start = stop
+            continue
+
+        weight = weights[start]
+        count = counts[start]
+        start += 1
+        empty_trolley_count = 0
+        empty_trolley_load = 0.0
+        while count > 0:
+            trolley = index.find(weight)
+            if trolley < 0:
+                raise ValueError(f"Weight {weight}kg exceeds the capacity of a single trolley, which is {capacity}kg.")
+
+            if trolley < index.count:
+                placed, load = _fill(index.load_of(trolley), weight, count, capacity)
+                index.set_load(trolley, load)
+                count -= placed
+                continue
+
+            # All new trolleys are filled in exactly the same way, so only calculate the fill once
+            if empty_trolley_count == 0:
+                empty_trolley_count, empty_trolley_load = _fill(0.0, weight, count, capacity)
+
+            if count >= empty_trolley_count:
+                index.set_load(trolley, empty_trolley_load)
+                count -= empty_trolley_count
+            else:
+                index.set_load(trolley, _fill(0.0, weight, count, capacity)[1])
+                count = 0
+
+    return index.count
+
+def next_fit_count(weights_in_kg: np.ndarray, capacity: float) -> int:
+    #
+    # Load the items in the given order, only ever looking at the last trolley, and return the number of trolleys
+    # that were loaded. This gives the same result as the FirstFitLoader.
+    #
+    # The cumulative sum of the weights is used to estimate where a trolley that starts at each item ends, which gives
+    # the start of every trolley after the first one. The cumulative sums are rounded differently from the sums the
+    # FirstFitLoader calculates, so the ends of all the trolleys are then checked at once with a sequential sum over
+    # the items of each trolley (see _check_next_fit_ends). Only the trolleys whose estimated end turned out to be
+    # wrong, which needs a sum that is within rounding distance of the capacity, are loaded one at a time.
+    #
+    count = len(weights_in_kg)
+
+    # The FirstFitLoader always counts the first trolley, even if there is no cargo
+    if count == 0:
+        return 1
+
+    prefix = np.cumsum(weights_in_kg)
+    ends = np.searchsorted(prefix, np.concatenate(([0.0], prefix[:-1])) + capacity, side='right')
+    ends = np.maximum(ends, np.arange(1, count + 1))
+
+    # Only the ends of the trolleys are needed, which are a small part of the items, so they are read one at a time
+    end_of = ends.item
+    starts = []
+    start = 0
+    while start < count:
+        starts.append(start)
+        start = end_of(start)
+
+    stops = starts[1:] + [count]
+    wrong = np.flatnonzero(~_check_next_fit_ends(weights_in_kg, np.array(starts), np.array(stops), capacity)).tolist()
+
+    trolley_count = 0
+    start = 0
+    while start < count:
+        trolley = bisect_left(starts, start)
+        if trolley < len(starts) and starts[trolley] == start:
+            # All the estimated trolleys up to the next wrong one are correct once the start of one of them is
+            wrong_position = bisect_left(wrong, trolley)
+            next_wrong = wrong[wrong_position] if wrong_position < len(wrong) else len(starts)
+            if next_wrong > trolley:
+                trolley_count += next_wrong - trolley
+                start = starts[next_wrong] if next_wrong < len(starts) else count
+                continue
+
+        trolley_count += 1
+        start = _next_fit_end(weights_in_kg, prefix, start, capacity)
+
+    return trolley_count
+
+def _next_fit_end(weights_in_kg: np.ndarray, prefix: np.ndarray, start: int, capacity: float) -> int:
+    #
+    # Return the index of the first item that doesn't fit into a trolley that starts with the item at 'start'. The
+    # cumulative sums only give an estimate, so the trolley is filled with a sequential sum over a window of items
+    # that is doubled until it contains the first item that doesn't fit.
+    #
+    count = len(weights_in_kg)
+    base = prefix[start - 1] if start > 0 else 0.0
+    window = max(int(np.searchsorted(prefix, base + capacity, side='right')) - start + 16, 16)
+    while True:
+        stop = min(start + window, count)
+        sums = np.add.accumulate(weights_in_kg[start:stop])
+
+        # The weights are positive so the last sum is the largest one
+        if sums[-1] > capacity:
+            return start + max(int(np.argmax(sums > capacity)), 1)
+
+        if stop == count:
+            return count
+
+        window *= 2
+
+def _check_next_fit_ends(weights_in_kg: np.ndarray, starts: np.ndarray, stops: np.ndarray, capacity: float) -> np.ndarray:
+    #
+    # Check for each trolley, which holds the items from its start up to its stop, whether the FirstFitLoader would
+    # end the trolley there: the sum of its items fits and adding the next item wouldn't. The trolleys are grouped by
+    # their number of items, rounded up to a power of two, and the items of each group are summed at once in the rows
+    # of a two dimensional array. Summing along the rows is sequential, so the sums are exactly the loads the
+    # FirstFitLoader calculates.
+    #
+    count = len(weights_in_kg)
+    lengths = stops - starts
+    widths = np.left_shift(1, np.ceil(np.log2(lengths + 1)).astype(np.int64))
+    correct = np.empty(len(starts), dtype=bool)
+    for width in np.unique(widths).tolist():
+        trolleys = np.flatnonzero(widths == width)
+        columns = np.arange(width)
+        for group in range(0, len(trolleys), max(_MAXIMUM_CHECK_SIZE // width, 1)):
+            rows = trolleys[group:group + max(_MAXIMUM_CHECK_SIZE // width, 1)]
+            row_starts = starts[rows]
+            row_lengths = lengths[rows]
+            positions = row_starts[:, None] + columns
+            values = np.where(columns <= row_lengths[:, None], weights_in_kg[np.minimum(positions, count - 1)], 0.0)
+            sums = np.add.accumulate(values, axis=1)
+
+            row_indices = np.arange(len(rows))
+            fits = (row_lengths == 1) | (sums[row_indices, row_lengths - 1] <= capacity)
+            full = (stops[rows] == count) | (sums[row_indices, np.minimum(row_lengths, width - 1)] > capacity)
+            correct[rows] = fits & full
+
+    return correct
+
+def first_fit_decreasing_count(weights_in_kg: np.ndarray, capacity: float) -> int:
+    #
+    # Load the items from heaviest to lightest, putting each item into the first trolley that can fit it, and return
+    # the number of trolleys that were loaded. This gives the same result as the FirstFitDecreasingLoader.
+    #
+    return _place_runs(FirstFitIndex(capacity), np.sort(weights_in_kg)[::-1], decreasing=True)
+
+def best_fit_count(weights_in_kg: np.ndarray, capacity: float) -> int:
+    #
+    # Load the items in the given order, putting each item into the fullest trolley that can fit it, and return the
+    # number of trolleys that were loaded. This gives the same result as the BestFitLoader.
+    #
+    return _place_runs(BestFitIndex(capacity), weights_in_kg)
+
+def best_fit_decreasing_count(weights_in_kg: np.ndarray, capacity: float) -> int:
+    #
+    # Load the items from heaviest to lightest, putting each item into the fullest trolley that can fit it, and return
+    # the number of trolleys that were loaded. This gives the same result as the BestFitDecreasingLoader.
+    #
+    return _place_runs(BestFitIndex(capacity), np.sort(weights_in_kg)[::-1])
@@ -0,0 +1,268 @@
+import hashlib
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence
+
+from cargo_loader.cargo import Cargo
+from cargo_loader.loader import CargoLoader
+from cargo_loader.parallel import deserialize_cargo, serialize_cargo
+from cargo_loader.trolley import TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG
+
+#
+# Caches the number of trolleys used for a set of cargo items, and the cargo items read from files, so that manifests
+# that are loaded again don't have to be read and loaded again.
+#
+# The results are keyed by a hash of the weights and dimensions of the cargo items together with the name and the
+# settings of the loader and the trolley capacity. Loaders with a different capacity than the default trolley
+# capacity include their capacity in their settings. The names of the items are not part of the key because they don't
+# change the number of trolleys. For loaders whose result doesn't depend on the order of the items the items are
+# sorted first, so the same items in a different order use the same cache entry.
+#
+# Each cache has an in-memory LRU tier and an optional directory tier that is shared between runs. The directory tier
+# removes the least recently used files once the total size of the files is larger than the maximum size.
+#
+
+DEFAULT_MAXIMUM_MEMORY_ENTRIES = 1024
+DEFAULT_MAXIMUM_DIRECTORY_SIZE_IN_BYTES = 512 * 1024 * 1024
+
+# The number of entries of the in-memory tier of the file cache. Parsed files can be large so this is much smaller.
+_MAXIMUM_MEMORY_FILES = 16
+
+def cargo_key(cargo_items: Sequence[Cargo], loader: CargoLoader) -> str:
+    #
+    # Create the canonical hash of the cargo items for the loader.
+    #
+    rows = [(cargo.weight_in_kg, cargo.length_in_m, cargo.width_in_m, cargo.height_in_m) for cargo in cargo_items]
+    if loader.is_order_independent:
+        rows.sort()
+
+    settings = sorted(loader.settings().items())
+
+    digest = hashlib.sha256()
+    digest.update(f"{loader.__class__.__name__}:{settings!r}:{TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG!r}:{len(rows)}:".encode("utf-8"))
+    digest.update(array("d", [value for row in rows for value in row]).tobytes())
+    return digest.hexdigest()
+
+def file_key(cargo_file: str) -> str:
+    #
+    # Create a hash of the absolute path, the modification time and the size of a file, so that the key changes when
+    # the file changes.
+    #
+    path = Path(cargo_file).absolute()
+    stat = path.stat()
+    return hashlib.sha256(f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8")).hexdigest()
+
+class LRUCache(object):
+    #
+    # A thread-safe in-memory cache that keeps the most recently used entries.
+    #
+
+    def __init__(self, maximum_entries: int = DEFAULT_MAXIMUM_MEMORY_ENTRIES):
+        if maximum_entries < 0:
+            raise ValueError(f"The maximum number of entries should not be negative, but it is {maximum_entries}.")
+
+        self.maximum_entries = maximum_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[object]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+
+            return value
+
+    def put(self, key: str, value: object):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maximum_entries:
+                self._entries.popitem(last=False)
+
+class DirectoryCache(object):
+    #
+    # A cache that stores each entry as a file in a directory, so that the entries are shared between processes and
+    # runs. Files are written to a temporary file first and then renamed, so a reader never sees a partial file.
+    #
+    # Reading an entry updates the modification time of its file. Once the total size of the files is larger than the
+    # maximum size the files with the oldest modification time are removed until the size is below the maximum again.
+    #
+
+    def __init__(self, directory: str, maximum_size_in_bytes: int = DEFAULT_MAXIMUM_DIRECTORY_SIZE_IN_BYTES):
+        if maximum_size_in_bytes < 0:
+            raise ValueError(f"The maximum size should not be negative, but it is {maximum_size_in_bytes}.")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.maximum_size_in_bytes = maximum_size_in_bytes
+        self._size = sum(path.stat().st_size for path in self._files())
+        self._lock = threading.Lock()
+
+    @property
+    def size_in_bytes(self) -> int:
+        return self._size
+
+    def _files(self) -> Iterable[Path]:
+        return (path for path in self.directory.iterdir() if path.is_file() and not path.name.startswith("."))
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.directory / key
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            # Not cached, or removed by another process in the meantime
+            return None
+
+        return data
+
+    def put(self, key: str, data: bytes):
+        import tempfile
+
+        path = self.directory / key
+        handle, temporary_path = tempfile.mkstemp(dir=self.directory, prefix=".")
+        try:
+            with os.fdopen(handle, "wb") as f:
+                f.write(data)
+
+            # An entry that is written again replaces the old file, so its size no longer counts
+            try:
+                old_size = path.stat().st_size
+            except FileNotFoundError:
+                old_size = 0
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+        with self._lock:
+            self._size += len(data) - old_size
+            if self._size > self.maximum_size_in_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Other processes may have added or removed files as well, so the files are counted again
+        files = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+
+        files.sort(key=lambda file: file[0])
+        self._size = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if self._size <= self.maximum_size_in_bytes:
+                break
+
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+class CargoCache(object):
+    #
+    # Caches the number of trolleys used by the loaders and the cargo items read from files. If no directory is given
+    # only the in-memory tier is used.
+    #
+
+    def __init__(
+            self,
+            directory: Optional[str] = None,
+            maximum_memory_entries: int = DEFAULT_MAXIMUM_MEMORY_ENTRIES,
+            maximum_directory_size_in_bytes: int = DEFAULT_MAXIMUM_DIRECTORY_SIZE_IN_BYTES):
+        self._results = LRUCache(maximum_memory_entries)
+        self._files = LRUCache(min(maximum_memory_entries, _MAXIMUM_MEMORY_FILES))
+        self._result_directory = None
+        self._file_directory = None
+        if directory is not None:
+            # The parsed files are much larger than the results, so they get most of the space
+            self._result_directory = DirectoryCache(os.path.join(directory, "results"), maximum_directory_size_in_bytes // 16)
+            self._file_directory = DirectoryCache(os.path.join(directory, "files"), maximum_directory_size_in_bytes - maximum_directory_size_in_bytes // 16)
+
+    def load(self, loader: CargoLoader, cargo_items: Sequence[Cargo]) -> int:
+        #
+        # Return the number of trolleys the loader uses for the cargo items, loading them only if the result isn't
+        # cached yet. The cargo items are passed to the loader as a new list, because some loaders sort the list.
+        #
+        if not loader.is_deterministic:
+            return loader.load(list(cargo_items))
+
+        key = cargo_key(cargo_items, loader)
+        count = self._results.get(key)
+        if count is not None:
+            return count
+
+        if self._result_directory is not None:
+            data = self._result_directory.get(key)
+            try:
+                count = None if data is None else int(data)
+            except ValueError:
+                # A damaged entry is loaded again and replaced
+                count = None
+
+            if count is not None:
+                self._results.put(key, count)
+                return count
+
+        count = loader.load(list(cargo_items))
+        self._results.put(key, count)
+        if self._result_directory is not None:
+            self._result_directory.put(key, str(count).encode("ascii"))
+
+        return count
+
+    def read_file(self, cargo_file: str, parse_file: Callable[[str], List[Cargo]] = Cargo.from_file) -> List[Cargo]:
+        #
+        # Read the cargo items from a file, see Cargo.iter_file. Returns the cached items if the file hasn't changed
+        # since it was read before, otherwise the file is parsed with 'parse_file'. The returned list is shared with
+        # the cache, so it should not be changed.
+        #
+        if not Path(cargo_file).exists():
+            # Raise the same error as Cargo.from_file
+            return Cargo.from_file(cargo_file)
+
+        # Binary manifests are read faster from the file itself than from a copy in the cache
+        from cargo_loader.manifest import is_manifest_file
+        if is_manifest_file(cargo_file):
+            return Cargo.from_file(cargo_file)
+
+        key = file_key(cargo_file)
+        cargo_items = self._files.get(key)
+        if cargo_items is not None:
+            return cargo_items
+
+        if self._file_directory is not None:
+            data = self._file_directory.get(key)
+            try:
+                cargo_items = None if data is None else deserialize_cargo(data)
+            except ValueError:
+                # A damaged entry is parsed again and replaced
+                cargo_items = None
+
+            if cargo_items is not None:
+                self._files.put(key, cargo_items)
+                return cargo_items
+
+        cargo_items = parse_file(cargo_file)
+        self._files.put(key, cargo_items)
+        if self._file_directory is not None:
+            self._file_directory.put(key, serialize_cargo(cargo_items))
+
+        return cargo_items
+
+    def read_files(self, cargo_files: Iterable[str], parse_file: Callable[[str], List[Cargo]] = Cargo.from_file) -> List[Cargo]:
+        cargo_items = []
+        for cargo_file in cargo_files:
+            cargo_items.extend(self.read_file(cargo_file, parse_file))
+
+        return cargo_items
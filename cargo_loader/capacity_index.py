@@ -0,0 +1,598 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Tuple
+
+class FirstFitIndex(object):
+    #
+    # An index over the trolleys that allows finding the left most trolley that can still take a given
+    # weight in O(log n) time instead of scanning all trolleys one by one.
+    #
+    # The index is a segment tree where every leaf is a trolley and every internal node stores the smallest
+    # load of the trolleys below it. A subtree can only contain a trolley that fits an item if its smallest
+    # load fits the item, so the search only has to descend into one child per level. Storing the smallest
+    # load (instead of the largest remaining capacity) means that the 'fits' check is exactly the same
+    # 'load + weight <= capacity' comparison the linear loaders use, which keeps the floating point
+    # behaviour, and thus the trolley assignments, identical.
+    #
+    # Leaves past the last opened trolley have a load of zero, so when none of the opened trolleys fit an
+    # item the search naturally ends on the first unopened trolley, exactly like opening a new trolley.
+    #
+
+    def __init__(self, capacity: float, initial_size: int = 64):
+        size = 1
+        while size < initial_size:
+            size *= 2
+
+        self.capacity = capacity
+        self._size = size
+        self._tree: List[float] = [0] * (2 * size)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def count(self) -> int:
+        #
+        # The number of trolleys that have been opened so far.
+        #
+        return self._count
+
+    def load_of(self, index: int) -> float:
+        return self._tree[self._size + index]
+
+    def loads(self) -> List[float]:
+        return self._tree[self._size:self._size + self._count]
+
+    def minimum_load(self, stop: int) -> float:
+        #
+        # Return the smallest load of the trolleys before the given index, or infinity if there are none.
+        #
+        tree = self._tree
+        smallest = float("inf")
+        low = self._size
+        high = self._size + stop
+        while low < high:
+            if low & 1:
+                if tree[low] < smallest:
+                    smallest = tree[low]
+                low += 1
+            if high & 1:
+                high -= 1
+                if tree[high] < smallest:
+                    smallest = tree[high]
+            low //= 2
+            high //= 2
+
+        return smallest
+
+    def find(self, weight: float) -> int:
+        #
+        # Return the index of the left most trolley that can fit the given weight. This may be the index of
+        # the next, not yet opened, trolley. Returns -1 if the weight doesn't fit into an empty trolley.
+        #
+        tree = self._tree
+        capacity = self.capacity
+        if tree[1] + weight > capacity:
+            return -1
+
+        size = self._size
+        node = 1
+        while node < size:
+            node *= 2
+            if tree[node] + weight > capacity:
+                node += 1
+
+        return node - size
+
+    def place(self, weight: float) -> int:
+        #
+        # Place the weight in the left most trolley that can fit it and return the index of that trolley.
+        #
+        index = self.find(weight)
+        if index < 0:
+            raise ValueError(f"Weight {weight}kg exceeds the capacity of a single trolley, which is {self.capacity}kg.")
+
+        self.set_load(index, self._tree[self._size + index] + weight)
+        return index
+
+    def set_load(self, index: int, load: float):
+        if index >= self._count:
+            self._count = index + 1
+            if self._count >= self._size:
+                self._grow()
+
+        tree = self._tree
+        node = self._size + index
+        tree[node] = load
+        node //= 2
+        while node >= 1:
+            left = tree[2 * node]
+            right = tree[2 * node + 1]
+            tree[node] = left if left <= right else right
+            node //= 2
+
+    def _grow(self):
+        #
+        # Double the number of leaves so that there is always at least one unopened trolley in the tree.
+        #
+        old_size = self._size
+        size = old_size * 2
+        tree: List[float] = [0] * (2 * size)
+        tree[size:size + old_size] = self._tree[old_size:2 * old_size]
+        for node in range(size - 1, 0, -1):
+            left = tree[2 * node]
+            right = tree[2 * node + 1]
+            tree[node] = left if left <= right else right
+
+        self._size = size
+        self._tree = tree
+
+class SortedEntries(object):
+    #
+    # A sorted collection of entries that supports inserts and deletes in (close to) O(log n) time.
+    #
+    # A single sorted python list needs to move all the entries after the insert or delete position, which makes
+    # those operations O(n). Instead the entries are split over a list of smaller sorted buckets, together with the
+    # largest entry of each bucket, so that only a single small bucket is changed for each insert or delete.
+    #
+
+    # The number of entries at which a bucket is split in two
+    _BUCKET_SIZE = 1024
+
+    def __init__(self):
+        self._buckets: List[list] = []
+        self._maxes: list = []
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        for bucket in self._buckets:
+            yield from bucket
+
+    def first(self):
+        return self._buckets[0][0] if self._buckets else None
+
+    def last(self):
+        return self._buckets[-1][-1] if self._buckets else None
+
+    def add(self, entry):
+        buckets = self._buckets
+        maxes = self._maxes
+        self._count += 1
+        if not buckets:
+            buckets.append([entry])
+            maxes.append(entry)
+            return
+
+        position = bisect_left(maxes, entry)
+        if position == len(maxes):
+            position -= 1
+            buckets[position].append(entry)
+            maxes[position] = entry
+        else:
+            insort(buckets[position], entry)
+
+        bucket = buckets[position]
+        if len(bucket) > SortedEntries._BUCKET_SIZE:
+            half = bucket[len(bucket) // 2:]
+            del bucket[len(bucket) // 2:]
+            maxes[position] = bucket[-1]
+            buckets.insert(position + 1, half)
+            maxes.insert(position + 1, half[-1])
+
+    def remove(self, entry):
+        maxes = self._maxes
+        position = bisect_left(maxes, entry)
+        bucket = self._buckets[position] if position < len(maxes) else []
+        index = bisect_left(bucket, entry)
+        if index == len(bucket) or bucket[index] != entry:
+            raise ValueError(f"The entry {entry} is not stored in the collection.")
+
+        del bucket[index]
+        self._count -= 1
+        if bucket:
+            maxes[position] = bucket[-1]
+        else:
+            del self._buckets[position]
+            del maxes[position]
+
+    def first_greater(self, entry):
+        #
+        # Return the smallest entry that is larger than the given entry, or None if there is no such entry.
+        #
+        position = bisect_right(self._maxes, entry)
+        if position == len(self._maxes):
+            return None
+
+        bucket = self._buckets[position]
+        return bucket[bisect_right(bucket, entry)]
+
+    def last_at_most(self, entry):
+        #
+        # Return the largest entry that is equal to or smaller than the given entry, or None if there is no such entry.
+        #
+        buckets = self._buckets
+        position = bisect_right(self._maxes, entry)
+        if position < len(buckets):
+            bucket = buckets[position]
+            index = bisect_right(bucket, entry)
+            if index > 0:
+                return bucket[index - 1]
+
+        return buckets[position - 1][-1] if position > 0 else None
+
+    def last_less(self, entry):
+        #
+        # Return the largest entry that is smaller than the given entry, or None if there is no such entry.
+        #
+        buckets = self._buckets
+        position = bisect_left(self._maxes, entry)
+        if position < len(buckets):
+            bucket = buckets[position]
+            index = bisect_left(bucket, entry)
+            if index > 0:
+                return bucket[index - 1]
+
+        return buckets[position - 1][-1] if position > 0 else None
+
+class BestFitIndex(object):
+    #
+    # An index over the trolleys that allows finding the trolley with the smallest remaining capacity that
+    # can still take a given weight.
+    #
+    # The distinct trolley loads are kept in a SortedEntries collection, together with a map from each load to the
+    # (sorted) indices of the trolleys with that load. Because adding a weight to a load is monotonic the loads that
+    # can fit an item form a prefix of the sorted loads, so the best trolley can be found with a binary search. If
+    # multiple trolleys have the same load the trolley that was opened first is used.
+    #
+
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self._sorted_loads = SortedEntries()
+        self._trolleys_by_load: Dict[float, List[int]] = {}
+        self._loads: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self._loads)
+
+    @property
+    def count(self) -> int:
+        #
+        # The number of trolleys that have been opened so far.
+        #
+        return len(self._loads)
+
+    def load_of(self, index: int) -> float:
+        return self._loads[index] if index < len(self._loads) else 0
+
+    def loads(self) -> List[float]:
+        return list(self._loads)
+
+    def find(self, weight: float) -> int:
+        #
+        # Return the index of the fullest trolley that can fit the given weight. This may be the index of the
+        # next, not yet opened, trolley. Returns -1 if the weight doesn't fit into an empty trolley.
+        #
+        capacity = self.capacity
+        if weight > capacity:
+            return -1
+
+        # Find the highest load that is at most 'capacity - weight'. Because of rounding that is not always exactly
+        # the same as 'load + weight <= capacity', which is the check the other loaders use, so correct the selected
+        # load by looking at the neighbouring loads.
+        sorted_loads = self._sorted_loads
+        load = sorted_loads.last_at_most(capacity - weight)
+        candidate = sorted_loads.first() if load is None else sorted_loads.first_greater(load)
+        while candidate is not None and candidate + weight <= capacity:
+            load = candidate
+            candidate = sorted_loads.first_greater(load)
+
+        while load is not None and load + weight > capacity:
+            load = sorted_loads.last_less(load)
+
+        if load is None:
+            return len(self._loads)
+
+        # Out of all the trolleys with the highest fitting load pick the one that was opened first
+        return self._trolleys_by_load[load][0]
+
+    def place(self, weight: float) -> int:
+        #
+        # Place the weight in the fullest trolley that can fit it and return the index of that trolley.
+        #
+        index = self.find(weight)
+        if index < 0:
+            raise ValueError(f"Weight {weight}kg exceeds the capacity of a single trolley, which is {self.capacity}kg.")
+
+        self.set_load(index, self.load_of(index) + weight)
+        return index
+
+    def set_load(self, index: int, load: float):
+        trolleys_by_load = self._trolleys_by_load
+        if index < len(self._loads):
+            old_load = self._loads[index]
+            trolleys = trolleys_by_load[old_load]
+            if len(trolleys) == 1:
+                del trolleys_by_load[old_load]
+                self._sorted_loads.remove(old_load)
+            else:
+                del trolleys[bisect_left(trolleys, index)]
+
+            self._loads[index] = load
+        else:
+            self._loads.append(load)
+
+        trolleys = trolleys_by_load.get(load)
+        if trolleys is None:
+            trolleys_by_load[load] = [index]
+            self._sorted_loads.add(load)
+        else:
+            insort(trolleys, index)
+
+# The largest number of steps that VectorFirstFitIndex keeps for each node
+_MAXIMUM_STEPS = 16
+
+def _lower_steps(left: Tuple[Tuple[float, ...], Tuple[float, ...]], right: Tuple[Tuple[float, ...], Tuple[float, ...]]) -> Tuple[Tuple[float, ...], Tuple[float, ...]]:
+    #
+    # Combine the steps of two nodes of a VectorFirstFitIndex. The steps are the loads for which no other load is
+    # smaller in both dimensions, sorted by increasing weight and thus decreasing volume. If there are more than
+    # _MAXIMUM_STEPS of them, consecutive steps are merged into a single step with the weight of the first and the
+    # volume of the last, which is smaller than both.
+    #
+    left_weights, left_volumes = left
+    right_weights, right_volumes = right
+    if len(left_weights) == 1 and len(right_weights) == 1:
+        # Most nodes near the leaves have a single step, e.g. when one of the trolleys is still empty
+        if left_weights[0] <= right_weights[0] and left_volumes[0] <= right_volumes[0]:
+            return left
+        if right_weights[0] <= left_weights[0] and right_volumes[0] <= left_volumes[0]:
+            return right
+
+    weights: List[float] = []
+    volumes: List[float] = []
+    smallest_volume = float("inf")
+    for weight, volume in sorted(zip(left_weights + right_weights, left_volumes + right_volumes)):
+        if volume < smallest_volume:
+            weights.append(weight)
+            volumes.append(volume)
+            smallest_volume = volume
+
+    count = len(weights)
+    if count > _MAXIMUM_STEPS:
+        groups = [(group * count // _MAXIMUM_STEPS, (group + 1) * count // _MAXIMUM_STEPS) for group in range(_MAXIMUM_STEPS)]
+        weights = [weights[start] for start, _ in groups]
+        volumes = [volumes[stop - 1] for _, stop in groups]
+
+    return tuple(weights), tuple(volumes)
+
+class VectorFirstFitIndex(object):
+    #
+    # The two dimensional version of the FirstFitIndex, for trolleys that have both a weight and a volume capacity.
+    #
+    # The smallest weight and the smallest volume of the trolleys below a node may belong to different trolleys, so
+    # unlike the one dimensional index a node can't store a single load that tells whether one of its trolleys fits
+    # an item. Instead every internal node stores the loads of its trolleys for which no other load is smaller in both
+    # dimensions, its 'steps'. A trolley below the node fits an item if and only if the step with the largest
+    # weight that still fits the item also fits its volume, which is found with a binary search.
+    #
+    # The steps of a node are limited to _MAXIMUM_STEPS by merging neighbouring steps into a load that is smaller
+    # than each of them, so a node that passes the check doesn't always contain a trolley that fits and the search may
+    # have to backtrack. Subtrees are searched from left to right, so the result is still the left most trolley that
+    # fits the item. Placing an item takes O(s log n) time to update the steps, with s = _MAXIMUM_STEPS. When the loads
+    # of the trolleys have more steps than that a search can visit many nodes that don't fit, in the worst case all
+    # of them, but when both the weight and the volume limit the trolleys most searches still only visit about
+    # 2 log n nodes.
+    #
+
+    def __init__(self, weight_capacity: float, volume_capacity: float, initial_size: int = 64):
+        size = 1
+        while size < initial_size:
+            size *= 2
+
+        self.weight_capacity = weight_capacity
+        self.volume_capacity = volume_capacity
+        self._size = size
+        self._weights: List[float] = [0] * size
+        self._volumes: List[float] = [0] * size
+        self._steps = [((0,), (0,))] * size
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def load_of(self, index: int) -> Tuple[float, float]:
+        return self._weights[index], self._volumes[index]
+
+    def loads(self) -> List[Tuple[float, float]]:
+        return list(zip(self._weights[:self._count], self._volumes[:self._count]))
+
+    def find(self, weight: float, volume: float) -> int:
+        #
+        # Return the index of the left most trolley that can fit the given weight and volume. This may be the index of
+        # the next, not yet opened, trolley. Returns -1 if the item doesn't fit into an empty trolley.
+        #
+        weights = self._weights
+        volumes = self._volumes
+        steps = self._steps
+        weight_capacity = self.weight_capacity
+        volume_capacity = self.volume_capacity
+        if weight > weight_capacity or volume > volume_capacity:
+            return -1
+
+        # Visit the nodes from left to right, going down into a node when it may contain a trolley that fits and
+        # otherwise moving on to the next node to the right, which is the right sibling of the node or of its parents
+        size = self._size
+        node = 1
+        while node > 0:
+            if node >= size:
+                index = node - size
+                if weights[index] + weight <= weight_capacity and volumes[index] + volume <= volume_capacity:
+                    return index
+
+                fits = False
+            else:
+                # The first step has the smallest weight and the last step the smallest volume, which rules out most
+                # nodes. Otherwise find the last step that fits the weight. The binary search uses 'capacity - weight',
+                # which is rounded differently from 'load + weight <= capacity', so the step is corrected with its
+                # neighbours.
+                step_weights, step_volumes = steps[node]
+                fits = step_weights[0] + weight <= weight_capacity and step_volumes[-1] + volume <= volume_capacity
+                last = len(step_weights) - 1
+                if fits and last > 0:
+                    step = bisect_right(step_weights, weight_capacity - weight) - 1
+                    while step < last and step_weights[step + 1] + weight <= weight_capacity:
+                        step += 1
+                    while step_weights[step] + weight > weight_capacity:
+                        step -= 1
+
+                    fits = step_volumes[step] + volume <= volume_capacity
+
+            if fits:
+                node *= 2
+                continue
+
+            while node & 1:
+                node //= 2
+            if node > 0:
+                node += 1
+
+        # Unreachable, the first unopened trolley is empty and always fits the item
+        return -1
+
+    def place(self, weight: float, volume: float) -> int:
+        index = self.find(weight, volume)
+        if index < 0:
+            raise ValueError(f"An item of {weight}kg and {volume}m3 exceeds the capacity of a single trolley, which is {self.weight_capacity}kg and {self.volume_capacity}m3.")
+
+        self.set_load(index, self._weights[index] + weight, self._volumes[index] + volume)
+        return index
+
+    def set_load(self, index: int, weight: float, volume: float):
+        if index >= self._count:
+            self._count = index + 1
+            if self._count >= self._size:
+                self._grow()
+
+        self._weights[index] = weight
+        self._volumes[index] = volume
+        node = (self._size + index) // 2
+        while node >= 1:
+            steps = _lower_steps(self._node_steps(2 * node), self._node_steps(2 * node + 1))
+            if steps == self._steps[node]:
+                # The nodes above only depend on the steps of this node
+                break
+
+            self._steps[node] = steps
+            node //= 2
+
+    def _node_steps(self, node: int) -> Tuple[Tuple[float, ...], Tuple[float, ...]]:
+        if node >= self._size:
+            return (self._weights[node - self._size],), (self._volumes[node - self._size],)
+
+        return self._steps[node]
+
+    def _grow(self):
+        old_size = self._size
+        size = old_size * 2
+        self._size = size
+        self._weights = self._weights + [0] * old_size
+        self._volumes = self._volumes + [0] * old_size
+        self._steps = [((0,), (0,))] * size
+        for node in range(size - 1, 0, -1):
+            self._steps[node] = _lower_steps(self._node_steps(2 * node), self._node_steps(2 * node + 1))
+
+class WorstFitIndex(object):
+    #
+    # An index over the trolleys that allows finding the emptiest trolley, which is the only trolley the worst-fit
+    # algorithm has to look at: if the item doesn't fit into the emptiest trolley it doesn't fit into any trolley.
+    #
+    # The trolleys are kept in a SortedEntries collection of (load, index) pairs, so the emptiest trolley is the first
+    # entry and, if multiple trolleys have the same load, the trolley that was opened first is used. Moving a trolley
+    # after an item is placed in it takes (close to) O(log n) time.
+    #
+
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self._sorted_trolleys = SortedEntries()
+        self._loads: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self._loads)
+
+    @property
+    def count(self) -> int:
+        #
+        # The number of trolleys that have been opened so far.
+        #
+        return len(self._loads)
+
+    def load_of(self, index: int) -> float:
+        return self._loads[index] if index < len(self._loads) else 0
+
+    def loads(self) -> List[float]:
+        return list(self._loads)
+
+    def find(self, weight: float) -> int:
+        #
+        # Return the index of the emptiest trolley if it can fit the given weight, otherwise the index of the next, not
+        # yet opened, trolley. Returns -1 if the weight doesn't fit into an empty trolley.
+        #
+        capacity = self.capacity
+        if weight > capacity:
+            return -1
+
+        emptiest = self._sorted_trolleys.first()
+        if emptiest is not None and emptiest[0] + weight <= capacity:
+            return emptiest[1]
+
+        return len(self._loads)
+
+    def place(self, weight: float) -> int:
+        #
+        # Place the weight in the trolley returned by 'find' and return the index of that trolley.
+        #
+        index = self.find(weight)
+        if index < 0:
+            raise ValueError(f"Weight {weight}kg exceeds the capacity of a single trolley, which is {self.capacity}kg.")
+
+        self.set_load(index, self.load_of(index) + weight)
+        return index
+
+    def set_load(self, index: int, load: float):
+        if index < len(self._loads):
+            self._sorted_trolleys.remove((self._loads[index], index))
+            self._loads[index] = load
+        else:
+            self._loads.append(load)
+
+        self._sorted_trolleys.add((load, index))
+
+class AlmostWorstFitIndex(WorstFitIndex):
+    #
+    # The index for the almost-worst-fit algorithm, which uses the second emptiest trolley that can fit an item. If
+    # the item only fits into the emptiest trolley that trolley is used instead.
+    #
+
+    def find(self, weight: float) -> int:
+        capacity = self.capacity
+        if weight > capacity:
+            return -1
+
+        # The two emptiest trolleys are at the start of the first one or two buckets
+        emptiest = None
+        for entry in self._sorted_trolleys:
+            if entry[0] + weight > capacity:
+                break
+
+            if emptiest is not None:
+                return entry[1]
+
+            emptiest = entry
+
+        return len(self._loads) if emptiest is None else emptiest[1]
@@ -1,40 +1,190 @@
-from typing import List
+import gc
+from operator import mul
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
 
 from pathlib import Path
-import yaml
-from yaml.loader import SafeLoader
+
+if TYPE_CHECKING:
+    from yaml.nodes import Node
+
+#
+# The parsers for the file formats (csv, json and yaml) are only imported when a file in that format is read. The
+# command line is often started just to load a few items given with --cargo, and importing PyYAML alone takes longer
+# than loading those items.
+#
+
+class CargoValidationError(ValueError):
+    #
+    # Raised when one or more cargo items in a batch are invalid. The error contains the error messages for all
+    # the invalid items, not just the first one.
+    #
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__(f"Found {len(errors)} invalid cargo {'item' if len(errors) == 1 else 'items'}:\n" + "\n".join(errors))
 
 class Cargo(object):
     #
     # Stores information about a single cargo item. The cargo item has a name, a weight in kg, and dimensions in meters.
     #
+    # The attributes are stored in slots instead of a per instance dictionary, which significantly reduces the memory
+    # used by each cargo item when loading millions of items.
+    #
+
+    __slots__ = ("name", "weight_in_kg", "length_in_m", "width_in_m", "height_in_m")
 
     # Define the limits for the cargo items
     CARGO_MAX_WEIGHT_IN_KG = 200
     CARGO_MAX_VOLUME_IN_M3 = 2.0
 
     def __init__(self, name: str, weight_in_kg: float, length_in_m: float, width_in_m: float, height_in_m: float):
+        # Check all the limits at once and only work out what exactly is wrong if one of the checks fails.
+        if (name is None or name == "" or name.isspace()
+                or weight_in_kg <= 0 or weight_in_kg > Cargo.CARGO_MAX_WEIGHT_IN_KG
+                or length_in_m <= 0 or width_in_m <= 0 or height_in_m <= 0
+                or length_in_m * width_in_m * height_in_m > Cargo.CARGO_MAX_VOLUME_IN_M3):
+            raise ValueError(Cargo.validation_error(name, weight_in_kg, length_in_m, width_in_m, height_in_m))
+
+        self.name = name
+        self.weight_in_kg = weight_in_kg
+        self.length_in_m = length_in_m
+        self.width_in_m = width_in_m
+        self.height_in_m = height_in_m
+
+    @staticmethod
+    def validation_error(name: str, weight_in_kg: float, length_in_m: float, width_in_m: float, height_in_m: float) -> Optional[str]:
+        #
+        # Return the reason why a cargo item with the given values would be invalid, or None if the values are valid.
+        #
         if name is None or name == "" or name.isspace():
-            raise ValueError("Name of cargo item cannot be empty.")
+            return "Name of cargo item cannot be empty."
 
         if weight_in_kg <= 0:
-            raise ValueError(f"Weight of cargo item {name} must be greater than 0. The specified weight is {weight_in_kg}kg.")
+            return f"Weight of cargo item {name} must be greater than 0. The specified weight is {weight_in_kg}kg."
 
         if weight_in_kg > Cargo.CARGO_MAX_WEIGHT_IN_KG:
-            raise ValueError(f"Weight of cargo item {name} exceeds the maximum weight of {Cargo.CARGO_MAX_WEIGHT_IN_KG}kg. The specified weight is {weight_in_kg}kg.")
+            return f"Weight of cargo item {name} exceeds the maximum weight of {Cargo.CARGO_MAX_WEIGHT_IN_KG}kg. The specified weight is {weight_in_kg}kg."
 
         if length_in_m <= 0 or width_in_m <= 0 or height_in_m <= 0:
-            raise ValueError(f"Dimensions of cargo item {name} must be greater than 0. The specified dimensions are {length_in_m}m x {width_in_m}m x {height_in_m}m.")
+            return f"Dimensions of cargo item {name} must be greater than 0. The specified dimensions are {length_in_m}m x {width_in_m}m x {height_in_m}m."
 
         cargo_volume_in_m3 = length_in_m * width_in_m * height_in_m
         if cargo_volume_in_m3 > Cargo.CARGO_MAX_VOLUME_IN_M3:
-            raise ValueError(f"Volume of cargo item {name} exceeds the maximum volume of {Cargo.CARGO_MAX_VOLUME_IN_M3}m3. The specified volume is {cargo_volume_in_m3}m3.")
+            return f"Volume of cargo item {name} exceeds the maximum volume of {Cargo.CARGO_MAX_VOLUME_IN_M3}m3. The specified volume is {cargo_volume_in_m3}m3."
 
-        self.name = name
-        self.weight_in_kg = weight_in_kg
-        self.length_in_m = length_in_m
-        self.width_in_m = width_in_m
-        self.height_in_m = height_in_m
+        return None
+
+    @staticmethod
+    def validate_many(
+            names: Sequence[str],
+            weights_in_kg: Sequence[float],
+            lengths_in_m: Sequence[float],
+            widths_in_m: Sequence[float],
+            heights_in_m: Sequence[float]) -> List[str]:
+        #
+        # Validate a batch of cargo items, given as columns of values, and return the error messages for all the
+        # invalid items. Each message starts with the (zero based) row of the invalid item. Returns an empty list if
+        # all the items are valid.
+        #
+        return [
+            f"Row {row}: {Cargo.validation_error(names[row], weights_in_kg[row], lengths_in_m[row], widths_in_m[row], heights_in_m[row])}"
+            for row in Cargo.invalid_rows(names, weights_in_kg, lengths_in_m, widths_in_m, heights_in_m)
+        ]
+
+    @staticmethod
+    def invalid_rows(
+            names: Sequence[str],
+            weights_in_kg: Sequence[float],
+            lengths_in_m: Sequence[float],
+            widths_in_m: Sequence[float],
+            heights_in_m: Sequence[float]) -> List[int]:
+        #
+        # Return the (zero based) rows of the invalid items in a batch of cargo items, see validate_many.
+        #
+        count = len(names)
+        if not len(weights_in_kg) == len(lengths_in_m) == len(widths_in_m) == len(heights_in_m) == count:
+            raise ValueError(f"All columns of a cargo batch must have the same length. Expected {count} values for each column.")
+
+        # Most batches are completely valid, so first check the limits for all the items at once. The builtin min, max
+        # and sum functions don't handle NaN values consistently, so only trust those checks if there are no NaN
+        # values in the columns.
+        maximum_weight = Cargo.CARGO_MAX_WEIGHT_IN_KG
+        maximum_volume = Cargo.CARGO_MAX_VOLUME_IN_M3
+        if count == 0:
+            return []
+
+        volumes_in_m3 = list(map(mul, map(mul, lengths_in_m, widths_in_m), heights_in_m))
+        weight_sum = sum(weights_in_kg)
+        volume_sum = sum(volumes_in_m3)
+        if (weight_sum == weight_sum and volume_sum == volume_sum
+                and all(names) and not any(map(str.isspace, names))
+                and min(weights_in_kg) > 0 and max(weights_in_kg) <= maximum_weight
+                and min(lengths_in_m) > 0 and min(widths_in_m) > 0 and min(heights_in_m) > 0
+                and max(volumes_in_m3) <= maximum_volume):
+            return []
+
+        return [
+            row
+            for row, (name, weight, length, width, height, volume) in enumerate(zip(names, weights_in_kg, lengths_in_m, widths_in_m, heights_in_m, volumes_in_m3))
+            if (name is None or name == "" or name.isspace()
+                or weight <= 0 or weight > maximum_weight
+                or length <= 0 or width <= 0 or height <= 0
+                or volume > maximum_volume)
+        ]
+
+    @staticmethod
+    def from_columns(
+            names: Sequence[str],
+            weights_in_kg: Sequence[float],
+            lengths_in_m: Sequence[float],
+            widths_in_m: Sequence[float],
+            heights_in_m: Sequence[float]) -> List['Cargo']:
+        #
+        # Create a list of cargo items from columns of values. All the items are validated at once and if any of the
+        # items is invalid a CargoValidationError is raised that lists every invalid item.
+        #
+        errors = Cargo.validate_many(names, weights_in_kg, lengths_in_m, widths_in_m, heights_in_m)
+        if errors:
+            raise CargoValidationError(errors)
+
+        return Cargo._from_valid_columns(names, weights_in_kg, lengths_in_m, widths_in_m, heights_in_m)
+
+    @staticmethod
+    def _from_valid_columns(
+            names: Iterable[str],
+            weights_in_kg: Iterable[float],
+            lengths_in_m: Iterable[float],
+            widths_in_m: Iterable[float],
+            heights_in_m: Iterable[float]) -> List['Cargo']:
+        #
+        # Create a list of cargo items from columns of values that have already been validated.
+        #
+
+        # Creating millions of objects triggers a lot of (pointless) garbage collection runs, cargo items can't be part
+        # of a reference cycle, so pause the garbage collector while the items are created.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return [
+                Cargo._create_unchecked(name, weight, length, width, height)
+                for name, weight, length, width, height in zip(names, weights_in_kg, lengths_in_m, widths_in_m, heights_in_m)
+            ]
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    @staticmethod
+    def _create_unchecked(name: str, weight_in_kg: float, length_in_m: float, width_in_m: float, height_in_m: float) -> 'Cargo':
+        #
+        # Create a cargo item without validating the values. Only use this for values that have already been validated.
+        #
+        cargo = _new_cargo(Cargo)
+        cargo.name = name
+        cargo.weight_in_kg = weight_in_kg
+        cargo.length_in_m = length_in_m
+        cargo.width_in_m = width_in_m
+        cargo.height_in_m = height_in_m
+        return cargo
 
     def __str__(self):
         return f"{self.name},{self.weight_in_kg},{self.length_in_m},{self.width_in_m},{self.height_in_m}"
@@ -47,10 +197,36 @@ class Cargo(object):
         name, weight, length, width, height = cargo_str.split(",")
         return Cargo(name, float(weight), float(length), float(width), float(height))
 
+    @staticmethod
+    def from_mapping(name: str, cargo_item_information: Mapping[str, object]) -> 'Cargo':
+        #
+        # Creates a cargo item from its information as it is stored in YAML and JSON files, e.g.
+        # '{"mass": 100, "volume": [1, 1, 1]}'.
+        #
+        return Cargo(str(name), *mapping_values(name, cargo_item_information))
+
     @staticmethod
     def from_file(cargo_file: str) -> List['Cargo']:
         #
-        # Reads the cargo items from a YAML file. The file is expect to be layed out as follows:
+        # Reads all the cargo items from a file. See iter_file for the supported file formats.
+        #
+        return list(Cargo.iter_file(cargo_file))
+
+    @staticmethod
+    def from_files(cargo_files: List[str]) -> List['Cargo']:
+        return list(Cargo.iter_files(cargo_files))
+
+    @staticmethod
+    def iter_file(cargo_file: str) -> Iterator['Cargo']:
+        #
+        # Reads the cargo items from a file one at a time, without loading the whole file into memory. Binary
+        # manifests (see cargo_loader/manifest.py) are recognized by their first bytes, the format of the other files
+        # is determined by the file extension:
+        #
+        # - '.csv': A CSV file with a header row containing the 'name', 'mass', 'length', 'width' and 'height' columns.
+        # - '.ndjson' or '.jsonl': A file with one JSON object per line, e.g.
+        #   '{"name": "Item1", "mass": 100, "volume": [1, 1, 1]}'
+        # - Any other extension: A YAML file that is expected to be layed out as follows:
         #
         # ```yaml
         # Item1:
@@ -65,23 +241,196 @@ class Cargo(object):
         if not relative.exists():
             raise ValueError(f"The file {cargo_file} does not exist. The expanded path is {relative.absolute()}.")
 
-        result: List[Cargo] = []
-        with open(relative.absolute()) as f:
-            data = yaml.load(f, Loader=SafeLoader)
+        from cargo_loader.manifest import is_manifest_file
+        if is_manifest_file(relative):
+            return _iter_manifest_file(relative.absolute())
 
-            for name, cargo_item_information in data.items():
-                weight = cargo_item_information["mass"]
-                volume_list = cargo_item_information["volume"]
+        extension = relative.suffix.lower()
+        if extension == ".csv":
+            return _iter_csv_file(relative.absolute())
 
-                cargo_item = Cargo(str(name), weight, volume_list[0], volume_list[1], volume_list[2])
-                result.append(cargo_item)
+        if extension in (".ndjson", ".jsonl"):
+            return _iter_ndjson_file(relative.absolute())
 
-        return result
+        return _iter_yaml_file(relative.absolute())
 
     @staticmethod
-    def from_files(cargo_files: List[str]) -> List['Cargo']:
-        result: List[Cargo] = []
+    def iter_files(cargo_files: Iterable[str]) -> Iterator['Cargo']:
         for file in cargo_files:
-            result.extend(Cargo.from_file(file))
+            yield from Cargo.iter_file(file)
+
+_new_cargo = object.__new__
+
+# The columns that a CSV cargo file has to contain
+CSV_COLUMNS = ("name", "mass", "length", "width", "height")
+
+def mapping_values(name: object, cargo_item_information: Mapping[str, object]) -> Tuple[float, float, float, float]:
+    #
+    # Return the weight, length, width and height of a cargo item from its information as it is stored in YAML and
+    # JSON files. Only numbers are accepted, so that e.g. a mass of "100" or true is rejected in the same way by
+    # Cargo.from_mapping and by the chunked NDJSON parser (see cargo_loader/chunked.py).
+    #
+    volume_list = cargo_item_information["volume"]
+    values = cargo_item_information["mass"], volume_list[0], volume_list[1], volume_list[2]
+    for value in values:
+        if type(value) is not float and type(value) is not int:
+            raise ValueError(f"The mass and the dimensions of cargo item {name} must be numbers. The specified mass is {values[0]!r} and the specified volume is {volume_list!r}.")
+
+    return values
+
+def csv_column_indices(path: Path, header: List[str]) -> List[int]:
+    #
+    # Return the index of each of the CSV_COLUMNS in the header row of a CSV file.
+    #
+    header = [column.strip().lower() for column in header]
+    missing = [column for column in CSV_COLUMNS if column not in header]
+    if missing:
+        raise ValueError(f"The file {path} is missing the columns {', '.join(missing)}. The file must contain the columns {', '.join(CSV_COLUMNS)}.")
+
+    return [header.index(column) for column in CSV_COLUMNS]
+
+def _iter_csv_file(path: Path) -> Iterator[Cargo]:
+    import csv
+
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+
+        name_index, weight_index, length_index, width_index, height_index = csv_column_indices(path, header)
+        for row in reader:
+            if not row:
+                continue
+
+            yield Cargo(
+                row[name_index],
+                float(row[weight_index]),
+                float(row[length_index]),
+                float(row[width_index]),
+                float(row[height_index]))
+
+def _iter_manifest_file(path: Path) -> Iterator[Cargo]:
+    from cargo_loader.manifest import open_manifest
+
+    with open_manifest(path) as manifest:
+        yield from manifest
+
+def _iter_ndjson_file(path: Path) -> Iterator[Cargo]:
+    import json
+
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+
+            cargo_item_information = json.loads(line)
+            yield Cargo.from_mapping(cargo_item_information["name"], cargo_item_information)
+
+def _iter_yaml_file(path: Path) -> Iterator[Cargo]:
+    #
+    # Reads the cargo items from a YAML file one at a time. Instead of building the whole document the YAML events
+    # are read one by one and only the nodes for a single cargo item, and the nodes with an anchor that later items
+    # can refer to with an alias, are kept at any time. If PyYAML was built with libyaml the (much faster) C parser is
+    # used.
+    #
+    # Loading the whole document would keep the last of the cargo items with the same name, but the earlier items
+    # have already been passed on by the time a later one is read, so a name that is used more than once is an error.
+    #
+    import yaml
+    from yaml.events import MappingEndEvent, MappingStartEvent, StreamEndEvent
+    from yaml.loader import SafeLoader
+
+    loader_type = getattr(yaml, "CSafeLoader", SafeLoader)
+    with open(path) as f:
+        loader = loader_type(f)
+        try:
+            loader.get_event()
+            if loader.check_event(StreamEndEvent):
+                return
+
+            loader.get_event()
+            if not loader.check_event(MappingStartEvent):
+                raise ValueError(f"The file {path} should contain a mapping from the cargo names to the cargo information.")
+
+            anchors = {}
+            names = set()
+            loader.get_event()
+            while not loader.check_event(MappingEndEvent):
+                name_node = _compose_node(loader, anchors)
+                name = _construct(loader, name_node)
+                if name in names:
+                    raise ValueError(f"The file {path} contains more than one cargo item with the name {name} {name_node.start_mark}.")
+
+                names.add(name)
+                cargo_item_information = _construct(loader, _compose_node(loader, anchors))
+                yield Cargo.from_mapping(name, cargo_item_information)
+        finally:
+            loader.dispose()
+
+def _compose_node(loader, anchors: Dict[str, 'Node']) -> 'Node':
+    #
+    # Build the node for the next value in the YAML event stream, in the same way the PyYAML composer does. The nodes
+    # with an anchor are added to the anchors, so that the aliases that refer to them can be resolved.
+    #
+    from yaml.events import AliasEvent, MappingEndEvent, MappingStartEvent, ScalarEvent, SequenceEndEvent, SequenceStartEvent
+    from yaml.nodes import MappingNode, ScalarNode, SequenceNode
+
+    event = loader.get_event()
+    if isinstance(event, AliasEvent):
+        if event.anchor not in anchors:
+            raise ValueError(f"The YAML alias {event.anchor} refers to an unknown anchor {event.start_mark}.")
+
+        return anchors[event.anchor]
+
+    if isinstance(event, ScalarEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(ScalarNode, event.value, event.implicit)
+
+        node = ScalarNode(tag, event.value, event.start_mark, event.end_mark, style=event.style)
+        if event.anchor is not None:
+            anchors[event.anchor] = node
+
+        return node
+
+    if isinstance(event, SequenceStartEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(SequenceNode, None, event.implicit)
+
+        node = SequenceNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+        if event.anchor is not None:
+            anchors[event.anchor] = node
+
+        while not loader.check_event(SequenceEndEvent):
+            node.value.append(_compose_node(loader, anchors))
+
+        node.end_mark = loader.get_event().end_mark
+        return node
+
+    if isinstance(event, MappingStartEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(MappingNode, None, event.implicit)
+
+        node = MappingNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+        if event.anchor is not None:
+            anchors[event.anchor] = node
+
+        while not loader.check_event(MappingEndEvent):
+            key = _compose_node(loader, anchors)
+            value = _compose_node(loader, anchors)
+            node.value.append((key, value))
+
+        node.end_mark = loader.get_event().end_mark
+        return node
+
+    raise ValueError(f"Unexpected YAML event {event} {event.start_mark}.")
+
+def _construct(loader, node: 'Node'):
+    value = loader.construct_object(node, deep=True)
 
-        return result
+    # Forget the constructed objects so that the memory use doesn't grow with the size of the file
+    loader.constructed_objects.clear()
+    return value
@@ -0,0 +1,286 @@
+import mmap
+from array import array
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from cargo_loader.cargo import Cargo, CargoValidationError, csv_column_indices, mapping_values
+
+#
+# Parses a single large CSV or NDJSON cargo file on multiple processes.
+#
+# Both formats store one cargo item per line, so the file can be split into chunks of about 'chunk_size' bytes that
+# end at a line break. Each chunk is parsed and validated by a worker process, which memory maps the file and only
+# reads its own byte range, and returns the values of the items as columns. The columns of the chunks are merged in
+# the order of the chunks, so the items are in the same order as when the file is read by Cargo.from_file.
+#
+# Instead of stopping at the first invalid item, every item that can't be read or that exceeds the CARGO_MAX_* limits
+# is reported in a single CargoValidationError. Each message starts with the (one based) line of the item in the
+# file. The workers count the lines of their own chunk and the line numbers are corrected once the number of lines in
+# the chunks before them is known.
+#
+# CSV fields that contain a line break (between quotes) can't be split on line breaks, so a file with such a field is
+# reported as invalid instead of being parsed incorrectly.
+#
+
+# The formats that can be split into chunks, by file extension
+CHUNKED_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+# The columns of the cargo items in a chunk: the names, weights, lengths, widths and heights
+Columns = Tuple[List[str], array, array, array, array]
+
+class ChunkResult(object):
+    #
+    # The result of parsing a chunk of a file: the columns of the valid items, the number of lines in the chunk and
+    # the errors as (line in the chunk, message) pairs.
+    #
+
+    def __init__(self, columns: Columns, line_count: int, errors: List[Tuple[int, str]]):
+        self.columns = columns
+        self.line_count = line_count
+        self.errors = errors
+
+def supports_chunked_parsing(cargo_file: str) -> bool:
+    from cargo_loader.manifest import is_manifest_file
+
+    path = Path(cargo_file)
+    return path.suffix.lower() in CHUNKED_FORMATS and path.exists() and not is_manifest_file(path)
+
+def split_records(data: bytes, start: int, chunk_size: int) -> List[Tuple[int, int]]:
+    #
+    # Split the data, starting at offset 'start', into byte ranges of about 'chunk_size' bytes that end right after a
+    # line break (or at the end of the data).
+    #
+    if chunk_size < 1:
+        raise ValueError(f"The chunk size should be at least 1 byte, but it is {chunk_size}.")
+
+    ranges = []
+    size = len(data)
+    while start < size:
+        end = data.find(b"\n", min(start + chunk_size, size) - 1)
+        end = size if end < 0 else end + 1
+        ranges.append((start, end))
+        start = end
+
+    return ranges
+
+def _empty_columns() -> Columns:
+    return [], array("d"), array("d"), array("d"), array("d")
+
+def _parse_csv_rows(text: str, column_indices: Sequence[int]) -> Tuple[Columns, Sequence[int], List[Tuple[int, str]]]:
+    #
+    # Parse the rows of a CSV chunk and return the columns, the line of each item and the errors.
+    #
+    import csv
+    import io
+
+    name_index, weight_index, length_index, width_index, height_index = column_indices
+    column_count = max(column_indices) + 1
+    reader = csv.reader(io.StringIO(text, newline=""))
+
+    # Most chunks are valid, so first try to convert whole columns at once. That only works if every row is on its
+    # own line, which is the case when the reader read as many lines as there are rows.
+    try:
+        rows = list(reader)
+    except csv.Error:
+        rows = None
+
+    if (rows and reader.line_num == len(rows) and min(map(len, rows)) >= column_count
+            # A quoted field that isn't closed at the end of the chunk ends with the line break of the chunk
+            and not rows[-1][-1].endswith("\n")):
+        try:
+            columns = (
+                [row[name_index] for row in rows],
+                array("d", map(float, [row[weight_index] for row in rows])),
+                array("d", map(float, [row[length_index] for row in rows])),
+                array("d", map(float, [row[width_index] for row in rows])),
+                array("d", map(float, [row[height_index] for row in rows])))
+            return columns, range(1, len(rows) + 1), []
+        except ValueError:
+            pass
+
+    # Find the rows that can't be read, one row at a time
+    columns = _empty_columns()
+    names, weights, lengths, widths, heights = columns
+    lines = array("I")
+    errors: List[Tuple[int, str]] = []
+    reader = csv.reader(io.StringIO(text, newline=""))
+    line = 0
+    try:
+        for row in reader:
+            first_line = line + 1
+            line = reader.line_num
+            if line != first_line or (row and row[-1].endswith("\n")):
+                errors.append((first_line, "The record contains a line break, which isn't supported when the file is parsed in chunks."))
+                continue
+
+            if not row:
+                continue
+
+            if len(row) < column_count:
+                errors.append((line, f"The row has {len(row)} values, but at least {column_count} values are expected."))
+                continue
+
+            try:
+                values = float(row[weight_index]), float(row[length_index]), float(row[width_index]), float(row[height_index])
+            except ValueError as error:
+                errors.append((line, f"Could not read cargo item {row[name_index]}: {error}."))
+                continue
+
+            names.append(row[name_index])
+            weights.append(values[0])
+            lengths.append(values[1])
+            widths.append(values[2])
+            heights.append(values[3])
+            lines.append(line)
+    except csv.Error as error:
+        errors.append((line + 1, f"The row can't be read: {error}."))
+
+    return columns, lines, errors
+
+def _parse_ndjson_records(text: str) -> Tuple[Columns, Sequence[int], List[Tuple[int, str]]]:
+    #
+    # Parse the records of an NDJSON chunk and return the columns, the line of each item and the errors.
+    #
+    import json
+
+    records = text.split("\n")
+    lines = [line for line, record in enumerate(records, start=1) if record and not record.isspace()]
+
+    # Most chunks are valid, so first try to parse all the records at once as a single JSON array. The arrays reject
+    # strings and null like mapping_values does, but they accept true and false, so chunks that contain them are
+    # checked one record at a time.
+    records_text = "[" + ",".join([records[line - 1] for line in lines]) + "]"
+    if "true" not in records_text and "false" not in records_text:
+        try:
+            items = json.loads(records_text)
+            columns = (
+                [str(item["name"]) for item in items],
+                array("d", [item["mass"] for item in items]),
+                array("d", [item["volume"][0] for item in items]),
+                array("d", [item["volume"][1] for item in items]),
+                array("d", [item["volume"][2] for item in items]))
+            if len(items) == len(lines):
+                return columns, lines, []
+        except (KeyError, IndexError, TypeError, ValueError):
+            pass
+
+    # Find the records that can't be read, one record at a time
+    columns = _empty_columns()
+    names, weights, lengths, widths, heights = columns
+    valid_lines = array("I")
+    errors: List[Tuple[int, str]] = []
+    for line in lines:
+        try:
+            cargo_item_information = json.loads(records[line - 1])
+            values = mapping_values(cargo_item_information["name"], cargo_item_information)
+            name = str(cargo_item_information["name"])
+        except json.JSONDecodeError as error:
+            errors.append((line, f"The line isn't valid JSON: {error.msg} at column {error.colno}."))
+            continue
+        except ValueError as error:
+            errors.append((line, str(error)))
+            continue
+        except (KeyError, IndexError, TypeError) as error:
+            errors.append((line, f"The cargo item can't be read: {error!r}."))
+            continue
+
+        names.append(name)
+        weights.append(values[0])
+        lengths.append(values[1])
+        widths.append(values[2])
+        heights.append(values[3])
+        valid_lines.append(line)
+
+    return columns, valid_lines, errors
+
+def parse_chunk(cargo_file: str, file_format: str, start: int, end: int, column_indices: Optional[Sequence[int]] = None) -> ChunkResult:
+    #
+    # Parse and validate the items in a byte range of the file. This runs in the worker processes.
+    #
+    with open(cargo_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        chunk = data[start:end]
+
+    text = chunk.decode("utf-8")
+    if file_format == "csv":
+        columns, lines, errors = _parse_csv_rows(text, column_indices)
+    else:
+        columns, lines, errors = _parse_ndjson_records(text)
+
+    names, weights, lengths, widths, heights = columns
+    for row in Cargo.invalid_rows(names, weights, lengths, widths, heights):
+        errors.append((lines[row], Cargo.validation_error(names[row], weights[row], lengths[row], widths[row], heights[row])))
+
+    # Only return the items if the whole chunk is valid, because the file is rejected otherwise
+    if errors:
+        errors.sort(key=lambda error: error[0])
+        columns = _empty_columns()
+
+    return ChunkResult(columns, chunk.count(b"\n"), errors)
+
+def read_columns_in_parallel(cargo_file: str, jobs: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Columns:
+    #
+    # Parse and validate a CSV or NDJSON file in chunks on 'jobs' worker processes (defaults to the number of
+    # processors) and return the columns of the items. If the file fits in a single chunk, or 'jobs' is 1, the chunks
+    # are parsed in this process.
+    #
+    path = Path(cargo_file)
+    if not path.exists():
+        raise ValueError(f"The file {cargo_file} does not exist. The expanded path is {path.absolute()}.")
+
+    file_format = CHUNKED_FORMATS.get(path.suffix.lower())
+    if file_format is None:
+        raise ValueError(f"The file {cargo_file} can't be parsed in chunks. Only {', '.join(CHUNKED_FORMATS)} files are supported.")
+
+    columns = _empty_columns()
+    if path.stat().st_size == 0:
+        return columns
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = 0
+        first_line = 1
+        column_indices = None
+        if file_format == "csv":
+            import csv
+
+            # The header is parsed here, so that a file with missing columns is rejected before it is split
+            header_end = data.find(b"\n")
+            start = len(data) if header_end < 0 else header_end + 1
+            column_indices = csv_column_indices(path, next(csv.reader([data[:start].decode("utf-8")])))
+            first_line = 2
+
+        ranges = split_records(data, start, chunk_size)
+
+    if jobs == 1 or len(ranges) <= 1:
+        results = [parse_chunk(str(path), file_format, start, end, column_indices) for start, end in ranges]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(parse_chunk, str(path), file_format, start, end, column_indices) for start, end in ranges]
+            results = [future.result() for future in futures]
+
+    errors = []
+    for result in results:
+        errors.extend(f"Line {first_line + line - 1}: {message}" for line, message in result.errors)
+        first_line += result.line_count
+
+    if errors:
+        raise CargoValidationError(errors)
+
+    for result in results:
+        for column, chunk_column in zip(columns, result.columns):
+            column.extend(chunk_column)
+
+    return columns
+
+def read_file_in_parallel(cargo_file: str, jobs: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Cargo]:
+    #
+    # Read the cargo items from a file, parsing CSV and NDJSON files in chunks on multiple processes. Other files are
+    # read with Cargo.from_file.
+    #
+    if not supports_chunked_parsing(cargo_file):
+        return Cargo.from_file(cargo_file)
+
+    return Cargo._from_valid_columns(*read_columns_in_parallel(cargo_file, jobs, chunk_size))
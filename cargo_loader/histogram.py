@@ -0,0 +1,256 @@
+import math
+from array import array
+from collections import Counter
+from fractions import Fraction
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from cargo_loader.assignments import LoadAssignments
+from cargo_loader.cargo import Cargo
+from cargo_loader.loader import CargoLoader
+from cargo_loader.trolley import TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG
+
+if TYPE_CHECKING:
+    from cargo_loader.batch import CargoBatch
+
+#
+# A first-fit-decreasing loader for cargo with many items of the same weight, which works on a histogram of the weights
+# instead of on the items.
+#
+# The weights are converted to integers first, so that the number of items of a weight that fit into a trolley can
+# be calculated exactly with a single division. Without a resolution every weight is scaled by the same power of two,
+# which is exact for all floating point numbers. With a resolution every weight is rounded up to a multiple of the
+# resolution, so that similar weights end up in the same class. Rounding up means that a trolley is never loaded
+# with more than its capacity, but it can use a few more trolleys than the exact calculation.
+#
+# The trolleys are stored as runs of consecutive trolleys with exactly the same contents (a pattern). The weight
+# classes are loaded from heaviest to lightest. For each class the item goes into the left most run that has enough
+# remaining capacity, and every trolley of a run gets the same number of items, so a run only has to be split when the
+# class runs out of items half way through the run. The remaining items go into new trolleys, which all get the same
+# number of items as well. Each class adds at most three runs, and the left most run that fits a class is found with
+# a _RunIndex in O(log n) time. Loading k classes takes O((k + p) log n) time, where p is the number of times a run
+# gets items of a class (the total length of the patterns), so the cost depends on the number of distinct weights
+# instead of the number of items.
+#
+# The trolley of each item can be recovered from the patterns: the items of each class are handed out in the order
+# they were provided, to the trolleys in order, which gives the same assignments as first-fit-decreasing with exact
+# arithmetic. The FirstFitDecreasingLoader adds up the weights as floating point numbers, whose sums are rounded, so
+# when the load of a trolley is very close to its capacity it can make a different choice than this loader.
+#
+
+class _Run(object):
+    #
+    # A run of 'count' consecutive trolleys, starting with trolley 'first', that all have the same remaining capacity
+    # and contain the same number of items of each weight class.
+    #
+
+    __slots__ = ("first", "count", "remaining", "pattern")
+
+    def __init__(self, first: int, count: int, remaining: int, pattern: Tuple[Tuple[int, int], ...]):
+        self.first = first
+        self.count = count
+        self.remaining = remaining
+        self.pattern = pattern
+
+class _RunIndex(object):
+    #
+    # An index over the runs that finds the left most run with at least a given remaining capacity, like the
+    # FirstFitIndex does for single trolleys.
+    #
+    # Every run is stored at its first trolley, so the runs are in order, but splitting a run adds runs in between the
+    # existing ones. The index is therefore a segment tree over all the trolleys that could be needed, where every
+    # internal node stores the largest remaining capacity of the runs below it. Only the nodes above a
+    # run are stored, in a dictionary, so the size of the index depends on the number of runs instead of the number
+    # of items.
+    #
+
+    def __init__(self, trolley_count: int):
+        size = 1
+        while size < trolley_count:
+            size *= 2
+
+        self._size = size
+        self._tree: Dict[int, int] = {}
+        self.runs: Dict[int, _Run] = {}
+
+    def add(self, run: _Run):
+        self.runs[run.first] = run
+        self.update(run)
+
+    def remove(self, run: _Run):
+        del self.runs[run.first]
+        self._set(run.first, -1)
+
+    def update(self, run: _Run):
+        self._set(run.first, run.remaining)
+
+    def _set(self, first: int, remaining: int):
+        tree = self._tree
+        node = self._size + first
+        tree[node] = remaining
+        while node > 1:
+            node //= 2
+            left = tree.get(2 * node, -1)
+            right = tree.get(2 * node + 1, -1)
+            tree[node] = left if left >= right else right
+
+    def find(self, weight: int) -> Optional[_Run]:
+        #
+        # Return the left most run whose trolleys can each fit an item of the given weight, or None if there is none.
+        #
+        tree = self._tree
+        if tree.get(1, -1) < weight:
+            return None
+
+        size = self._size
+        node = 1
+        while node < size:
+            node *= 2
+            if tree.get(node, -1) < weight:
+                node += 1
+
+        return self.runs[node - size]
+
+def _pack(units: Sequence[int], counts: Sequence[int], capacity: int) -> List[_Run]:
+    #
+    # Load the weight classes, given as integer weights sorted from heaviest to lightest together with the number of
+    # items of each class, and return the runs of trolleys in order.
+    #
+    # First-fit leaves at most one trolley that is half empty or less, otherwise the items of the later trolley would
+    # have fit into the earlier one, which limits the number of trolleys
+    total = sum(weight * count for weight, count in zip(units, counts))
+    index = _RunIndex(2 * total // capacity + 2)
+    trolley_count = 0
+    for weight_class, (weight, count) in enumerate(zip(units, counts)):
+        while count > 0:
+            run = index.find(weight)
+            if run is None:
+                break
+
+            per_trolley = run.remaining // weight
+            if count >= per_trolley * run.count:
+                # Every trolley of the run is filled with the same number of items
+                run.remaining -= per_trolley * weight
+                run.pattern += ((weight_class, per_trolley),)
+                count -= per_trolley * run.count
+                index.update(run)
+                continue
+
+            # The items run out half way through the run, so split the run into the trolleys that are filled, the
+            # trolley that gets the last few items and the trolleys that are left as they are
+            full_trolleys, last_items = divmod(count, per_trolley)
+            index.remove(run)
+            if full_trolleys > 0:
+                index.add(_Run(run.first, full_trolleys, run.remaining - per_trolley * weight, run.pattern + ((weight_class, per_trolley),)))
+            if last_items > 0:
+                index.add(_Run(run.first + full_trolleys, 1, run.remaining - last_items * weight, run.pattern + ((weight_class, last_items),)))
+            untouched = run.count - full_trolleys - (1 if last_items > 0 else 0)
+            if untouched > 0:
+                index.add(_Run(run.first + run.count - untouched, untouched, run.remaining, run.pattern))
+            count = 0
+
+        if count > 0:
+            per_trolley = capacity // weight
+            full_trolleys, last_items = divmod(count, per_trolley)
+            if full_trolleys > 0:
+                index.add(_Run(trolley_count, full_trolleys, capacity - per_trolley * weight, ((weight_class, per_trolley),)))
+                trolley_count += full_trolleys
+            if last_items > 0:
+                index.add(_Run(trolley_count, 1, capacity - last_items * weight, ((weight_class, last_items),)))
+                trolley_count += 1
+
+    return [index.runs[first] for first in sorted(index.runs)]
+
+class HistogramLoader(CargoLoader):
+    #
+    # Loads the cargo items with first-fit-decreasing on a histogram of the weights, see the description above.
+    # 'resolution' is the weight in kg that the weights are rounded up to a multiple of, or None to use the exact
+    # weights.
+    #
+
+    supports_streaming = True
+    is_order_independent = True
+
+    def __init__(self, resolution: Optional[float] = None, capacity: float = TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG):
+        if resolution is not None and not resolution > 0:
+            raise ValueError(f"The weight resolution should be larger than 0, but it is {resolution}.")
+
+        self.resolution = resolution
+        self.capacity = capacity
+
+    def settings(self) -> Dict[str, object]:
+        return {"resolution": self.resolution, "capacity": self.capacity}
+
+    def _classes(self, histogram: Mapping[float, int]) -> Tuple[List[int], List[int], Dict[int, List[float]], int]:
+        #
+        # Convert the histogram of the weights to integer weight classes. Returns the integer weights and the number
+        # of items of the classes from heaviest to lightest, the weights in each class and the integer capacity.
+        #
+        capacity = Fraction(self.capacity)
+        for weight in histogram:
+            if weight > self.capacity:
+                raise ValueError(f"Weight {weight}kg exceeds the capacity of a single trolley, which is {self.capacity}kg.")
+
+        if self.resolution is None:
+            # The denominators of floating point numbers are powers of two, so the largest one is a multiple of all
+            scale = max([Fraction(weight).denominator for weight in histogram] + [capacity.denominator])
+            classes: Dict[int, List[float]] = {}
+            for weight in histogram:
+                classes.setdefault(int(Fraction(weight) * scale), []).append(weight)
+            capacity_units = int(capacity * scale)
+        else:
+            # Use the decimal value of the resolution, e.g. 1/10 instead of the nearest float to 0.1
+            resolution = Fraction(repr(float(self.resolution)))
+            capacity_units = math.floor(capacity / resolution)
+            classes = {}
+            for weight in histogram:
+                # A weight that is rounded up to more than the capacity still fits into a trolley on its own
+                classes.setdefault(min(math.ceil(Fraction(weight) / resolution), capacity_units), []).append(weight)
+
+        units = sorted(classes, reverse=True)
+        return units, [sum(histogram[weight] for weight in classes[unit]) for unit in units], classes, capacity_units
+
+    def _count(self, histogram: Mapping[float, int]) -> int:
+        if not histogram:
+            return 0
+
+        units, counts, _, capacity_units = self._classes(histogram)
+        return sum(run.count for run in _pack(units, counts, capacity_units))
+
+    def load(self, cargo_items: Iterable[Cargo]) -> int:
+        return self._count(Counter(cargo.weight_in_kg for cargo in cargo_items))
+
+    def load_batch(self, batch: 'CargoBatch') -> int:
+        import numpy as np
+
+        weights, counts = np.unique(batch.weights_in_kg, return_counts=True)
+        return self._count(dict(zip(weights.tolist(), counts.tolist())))
+
+    def load_assignments(self, cargo_items: Sequence[Cargo]) -> LoadAssignments:
+        weights = [cargo.weight_in_kg for cargo in cargo_items]
+        histogram = Counter(weights)
+        trolley_of_item = array("I", bytes(array("I").itemsize * len(weights)))
+        if not histogram:
+            return LoadAssignments(trolley_of_item, array("d"))
+
+        units, counts, classes, capacity_units = self._classes(histogram)
+        class_of_weight = {weight: index for index, unit in enumerate(units) for weight in classes[unit]}
+
+        # The positions of the items of each class, in the order they were provided
+        positions: List[List[int]] = [[] for _ in units]
+        for position, weight in enumerate(weights):
+            positions[class_of_weight[weight]].append(position)
+
+        next_position = [0] * len(units)
+        trolley_loads = array("d")
+        for run in _pack(units, counts, capacity_units):
+            for trolley in range(run.first, run.first + run.count):
+                load = 0.0
+                for weight_class, item_count in run.pattern:
+                    start = next_position[weight_class]
+                    for position in positions[weight_class][start:start + item_count]:
+                        trolley_of_item[position] = trolley
+                        load += weights[position]
+                    next_position[weight_class] = start + item_count
+                trolley_loads.append(load)
+
+        return LoadAssignments(trolley_of_item, trolley_loads)
@@ -0,0 +1,80 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+
+from cargo_loader.cargo import Cargo
+
+#
+# Reads many cargo files at the same time, so that the time spent waiting for slow (e.g. network mounted) storage
+# overlaps, while the items are loaded into the trolleys as soon as the files are read.
+#
+# The files are read on a pool of 'concurrency' threads. The parsed files are handed to the loader through a bounded
+# queue, in the order of the files, so the loaders give exactly the same result as when the files are read one after
+# another. At most 'concurrency' files are being read and 'maximum_queued_files' parsed files are waiting for the
+# loader at any time, which limits the memory use when the loader is slower than the storage.
+#
+# If a file can't be read the error for the first such file, in the order of the files, is raised once the loader
+# reaches that file, with the same message as Cargo.from_file. The files after it that were still being read are
+# cancelled.
+#
+
+DEFAULT_CONCURRENCY = 8
+
+# Reads the cargo items from a single file, e.g. Cargo.from_file or CargoCache.read_file
+FileReader = Callable[[str], List[Cargo]]
+
+def iter_files_concurrently(
+        cargo_files: Iterable[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        maximum_queued_files: Optional[int] = None,
+        read_file: FileReader = Cargo.from_file) -> Iterator[Tuple[str, List[Cargo]]]:
+    #
+    # Read the files on a pool of threads and return each file together with its cargo items, in the order of the
+    # files. Defaults to queueing as many parsed files as there are threads.
+    #
+    if concurrency < 1:
+        raise ValueError(f"The number of files that are read at the same time should be at least 1, but it is {concurrency}.")
+
+    if maximum_queued_files is None:
+        maximum_queued_files = concurrency
+
+    if maximum_queued_files < 0:
+        raise ValueError(f"The maximum number of queued files should not be negative, but it is {maximum_queued_files}.")
+
+    cargo_files = iter(cargo_files)
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="cargo-reader") as executor:
+        queue: Deque = deque(
+            (cargo_file, executor.submit(read_file, cargo_file))
+            for cargo_file in islice(cargo_files, concurrency + maximum_queued_files))
+        try:
+            while queue:
+                cargo_file, future = queue.popleft()
+                cargo_items = future.result()
+
+                # Start reading the next file before the items are handed to the loader
+                for next_file in islice(cargo_files, 1):
+                    queue.append((next_file, executor.submit(read_file, next_file)))
+
+                yield cargo_file, cargo_items
+        finally:
+            for _, future in queue:
+                future.cancel()
+
+def iter_cargo_concurrently(
+        cargo_files: Iterable[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        maximum_queued_files: Optional[int] = None,
+        read_file: FileReader = Cargo.from_file) -> Iterator[Cargo]:
+    #
+    # Return the cargo items of all the files, in the same order as Cargo.iter_files, while reading the files on a
+    # pool of threads.
+    #
+    for _, cargo_items in iter_files_concurrently(cargo_files, concurrency, maximum_queued_files, read_file):
+        yield from cargo_items
+
+def read_files_concurrently(
+        cargo_files: Iterable[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        read_file: FileReader = Cargo.from_file) -> List[Cargo]:
+    return list(iter_cargo_concurrently(cargo_files, concurrency, read_file=read_file))
@@ -1,9 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import List
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterable, List, Sequence
 
+from cargo_loader.assignments import LoadAssignments, assignments_from_order
+
+from cargo_loader.capacity_index import AlmostWorstFitIndex, BestFitIndex, FirstFitIndex, WorstFitIndex
 from cargo_loader.cargo import Cargo
+from cargo_loader.profiling import TROLLEYS_SCANNED, active_profile, phase
 from cargo_loader.trolley import TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG
 
+if TYPE_CHECKING:
+    from cargo_loader.batch import CargoBatch
+
 class CargoLoader(ABC):
     #
     # Define the loader as an abstract class so that we can define different loader algorithms.
@@ -16,6 +24,19 @@ class CargoLoader(ABC):
     #
     # The loader is trying to 'solve' the [bin packing problem](https://en.wikipedia.org/wiki/Bin_packing_problem).
 
+    # Indicates if the loader processes the cargo items one at a time, in the order they are provided, without
+    # keeping the items in memory. Those loaders accept any iterable of cargo items, e.g. the items streamed from
+    # a file with Cargo.iter_files, which allows loading files that don't fit in memory.
+    supports_streaming = False
+
+    # Indicates if the number of trolleys only depends on the cargo items and not on the order they are provided in,
+    # e.g. because the loader sorts the items first. The results of these loaders can be cached for any order.
+    is_order_independent = False
+
+    # Indicates if loading the same cargo items always uses the same number of trolleys. Only the results of
+    # deterministic loaders are cached.
+    is_deterministic = True
+
     @abstractmethod
     def load(self, cargo_items: List[Cargo]) -> int:
         #
@@ -29,6 +50,44 @@ class CargoLoader(ABC):
         # Return an invalid number so that it is clear that the method needs to be implemented.
         return -1
 
+    def load_batch(self, batch: 'CargoBatch') -> int:
+        #
+        # Load the cargo items stored in a columnar CargoBatch and return the number of trolleys that were loaded.
+        #
+        # Loaders that have a vectorized implementation override this method. The default implementation
+        # converts the batch back to a list of cargo items.
+        #
+        return self.load(batch.to_cargo())
+
+    def load_assignments(self, cargo_items: List[Cargo]) -> LoadAssignments:
+        #
+        # Load the cargo items into one or more cargo trolleys and return the trolley of each item together with the
+        # load of each trolley. The 'load' method doesn't keep track of the trolley of each item, so that counting
+        # the trolleys stays as fast as possible.
+        #
+        raise NotImplementedError(f"The {self.__class__.__name__} doesn't support load_assignments.")
+
+    def settings(self) -> Dict[str, object]:
+        #
+        # Return the settings of the loader that change the number of trolleys it uses, e.g. the capacity of the
+        # trolleys. The settings are part of the key of the cached results.
+        #
+        return {}
+
+def _place_weights(index, cargo_items: Iterable[Cargo]) -> LoadAssignments:
+    # Place the items in the order they are provided, using one of the indices from cargo_loader.capacity_index
+    trolley_of_item = array("I", map(index.place, (cargo.weight_in_kg for cargo in cargo_items)))
+    return LoadAssignments(trolley_of_item, array("d", index.loads()))
+
+def _decreasing_assignments(index, cargo_items: Sequence[Cargo]) -> LoadAssignments:
+    # Sort the positions of the items instead of the items themselves, so the trolleys can be stored by position.
+    # The sort is stable, so the items are loaded in the same order as in the FirstFitDecreasingLoader.
+    weights = [cargo.weight_in_kg for cargo in cargo_items]
+    order = sorted(range(len(weights)), key=weights.__getitem__, reverse=True)
+
+    trolley_of_sorted_item = array("I", map(index.place, [weights[position] for position in order]))
+    return assignments_from_order(order, trolley_of_sorted_item, index.loads())
+
 class FirstFitLoader(CargoLoader):
     #
     # A simple loader algorithm that tries to load as many items as possible into a trolley.
@@ -37,12 +96,23 @@ class FirstFitLoader(CargoLoader):
     # If no trolley can fit the item a new trolley is used. This algorithm is simple and fast but doesn't always produce
     # the best results.
     #
+    # Note that this loader only ever looks at the last trolley, which strictly speaking makes it a
+    # [next-fit](https://en.wikipedia.org/wiki/Next-fit_bin_packing) algorithm. The IndexedFirstFitLoader
+    # implements the 'true' first-fit algorithm.
+    #
 
-    def load(self, cargo_items: List[Cargo]) -> int:
+    supports_streaming = True
+
+    def load(self, cargo_items: Iterable[Cargo]) -> int:
         #
         # Load the cargo items into one or more cargo trolleys and return the number of trolleys that were loaded.
         #
 
+        # Next-fit only looks at the last trolley, so one trolley is scanned for every item
+        profile = active_profile()
+        if profile is not None:
+            cargo_items = profile.counted(cargo_items, TROLLEYS_SCANNED)
+
         # Load the cargo items into trolleys
         current_trolley_weight = 0
         trolley_count = 1
@@ -57,6 +127,29 @@ class FirstFitLoader(CargoLoader):
 
         return trolley_count
 
+    def load_batch(self, batch: 'CargoBatch') -> int:
+        from cargo_loader.batch import next_fit_count
+        return next_fit_count(batch.weights_in_kg, TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG)
+
+    def load_assignments(self, cargo_items: Iterable[Cargo]) -> LoadAssignments:
+        trolley_of_item = array("I")
+        trolley_loads = array("d")
+        current_trolley_weight = 0
+        trolley = 0
+        for cargo in cargo_items:
+            if current_trolley_weight + cargo.weight_in_kg <= TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG:
+                current_trolley_weight += cargo.weight_in_kg
+            else:
+                trolley_loads.append(current_trolley_weight)
+                trolley += 1
+                current_trolley_weight = cargo.weight_in_kg
+
+            trolley_of_item.append(trolley)
+
+        # Like the 'load' method there always is at least one trolley
+        trolley_loads.append(current_trolley_weight)
+        return LoadAssignments(trolley_of_item, trolley_loads)
+
 class FirstFitDecreasingLoader(CargoLoader):
     #
     # A slightly clever loader algorithm that tries to load as many items as possible into a trolley.
@@ -66,24 +159,226 @@ class FirstFitDecreasingLoader(CargoLoader):
     # the best results.
     #
 
+    is_order_independent = True
+
     def load(self, cargo_items: List[Cargo]) -> int:
         #
         # Load the cargo items into one or more cargo trolleys and return the number of trolleys that were loaded.
         #
 
         # Sort the cargo items by weight in descending order
-        cargo_items.sort(key=lambda x: x.weight_in_kg, reverse=True)
+        with phase("sort"):
+            cargo_items.sort(key=lambda x: x.weight_in_kg, reverse=True)
 
-        # Load the cargo items into trolleys
+        # Load the cargo items into trolleys. The scanned trolleys are only counted when the run is profiled, so that
+        # the loop stays as fast as possible otherwise.
+        profile = active_profile()
         trolleys: List[int] = []
-        for cargo in cargo_items:
-            # Try to load the cargo into an existing trolley
-            for index, current_trolley_weight in enumerate(trolleys):
-                if current_trolley_weight + cargo.weight_in_kg <= TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG:
-                    trolleys[index] = current_trolley_weight + cargo.weight_in_kg
-                    break
+        with phase("scan"):
+            if profile is None:
+                for cargo in cargo_items:
+                    # Try to load the cargo into an existing trolley
+                    for index, current_trolley_weight in enumerate(trolleys):
+                        if current_trolley_weight + cargo.weight_in_kg <= TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG:
+                            trolleys[index] = current_trolley_weight + cargo.weight_in_kg
+                            break
+                    else:
+                        # If the cargo couldn't be loaded into an existing trolley create a new trolley
+                        trolleys.append(cargo.weight_in_kg)
             else:
-                # If the cargo couldn't be loaded into an existing trolley create a new trolley
-                trolleys.append(cargo.weight_in_kg)
+                scanned = 0
+                for cargo in cargo_items:
+                    for index, current_trolley_weight in enumerate(trolleys):
+                        if current_trolley_weight + cargo.weight_in_kg <= TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG:
+                            trolleys[index] = current_trolley_weight + cargo.weight_in_kg
+                            scanned += index + 1
+                            break
+                    else:
+                        trolleys.append(cargo.weight_in_kg)
+                        scanned += len(trolleys) - 1
+
+                profile.add(TROLLEYS_SCANNED, scanned)
 
         return len(trolleys)
+
+    def load_batch(self, batch: 'CargoBatch') -> int:
+        from cargo_loader.batch import first_fit_decreasing_count
+        return first_fit_decreasing_count(batch.weights_in_kg, TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG)
+
+    def load_assignments(self, cargo_items: Sequence[Cargo]) -> LoadAssignments:
+        # Unlike the 'load' method the list of the caller isn't sorted, because that would change the positions
+        return _decreasing_assignments(FirstFitIndex(TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG), cargo_items)
+
+class IndexedFirstFitLoader(CargoLoader):
+    #
+    # The 'true' first-fit loader algorithm.
+    #
+    # Every item is loaded into the left most trolley that can still fit it, not just the last trolley. Instead of
+    # scanning all the trolleys for every item the trolleys are kept in a FirstFitIndex so that finding the correct
+    # trolley takes O(log n) time.
+    #
+
+    supports_streaming = True
+
+    def load(self, cargo_items: Iterable[Cargo]) -> int:
+        #
+        # Load the cargo items into one or more cargo trolleys and return the number of trolleys that were loaded.
+        #
+
+        index = FirstFitIndex(TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG)
+        for cargo in cargo_items:
+            index.place(cargo.weight_in_kg)
+
+        return index.count
+
+    def load_assignments(self, cargo_items: Iterable[Cargo]) -> LoadAssignments:
+        return _place_weights(FirstFitIndex(TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG), cargo_items)
+
+class IndexedFirstFitDecreasingLoader(CargoLoader):
+    #
+    # The first-fit-decreasing loader algorithm backed by a FirstFitIndex.
+    #
+    # This loader produces exactly the same trolley assignments as the FirstFitDecreasingLoader, but finds the
+    # trolley for each item in O(log n) time instead of scanning all trolleys. That makes the algorithm
+    # O(n log n) overall instead of O(n * trolleys).
+    #
+
+    is_order_independent = True
+
+    def load(self, cargo_items: List[Cargo]) -> int:
+        #
+        # Load the cargo items into one or more cargo trolleys and return the number of trolleys that were loaded.
+        #
+
+        # Sort the cargo items by weight in descending order. Python sorts are stable so items with the same weight
+        # end up in the same order as they would in the FirstFitDecreasingLoader. Unlike that loader we don't sort
+        # the list of the caller in place.
+        with phase("sort"):
+            sorted_items = sorted(cargo_items, key=lambda x: x.weight_in_kg, reverse=True)
+
+        index = FirstFitIndex(TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG)
+        with phase("place"):
+            for cargo in sorted_items:
+                index.place(cargo.weight_in_kg)
+
+        return index.count
+
+    def load_batch(self, batch: 'CargoBatch') -> int:
+        from cargo_loader.batch import first_fit_decreasing_count
+        return first_fit_decreasing_count(batch.weights_in_kg, TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG)
+
+    def load_assignments(self, cargo_items: Sequence[Cargo]) -> LoadAssignments:
+        # Unlike the 'load' method the list of the caller isn't sorted, because that would change the positions
+        return _decreasing_assignments(FirstFitIndex(TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG), cargo_items)
+
+class BestFitLoader(CargoLoader):
+    #
+    # A loader algorithm that loads every item into the fullest trolley that can still fit the item.
+    #
+    # The items are loaded in the order they are provided. By putting items in the trolley with the least
+    # remaining capacity the trolleys with a lot of remaining capacity are kept available for the larger items.
+    # The trolleys are kept in a BestFitIndex, which is sorted by load, so the best trolley can be found with a
+    # binary search.
+    #
+
+    supports_streaming = True
+
+    def load(self, cargo_items: Iterable[Cargo]) -> int:
+        #
+        # Load the cargo items into one or more cargo trolleys and return the number of trolleys that were loaded.
+        #
+
+        index = BestFitIndex(TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG)
+        for cargo in cargo_items:
+            index.place(cargo.weight_in_kg)
+
+        return index.count
+
+    def load_batch(self, batch: 'CargoBatch') -> int:
+        from cargo_loader.batch import best_fit_count
+        return best_fit_count(batch.weights_in_kg, TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG)
+
+    def load_assignments(self, cargo_items: Iterable[Cargo]) -> LoadAssignments:
+        return _place_weights(BestFitIndex(TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG), cargo_items)
+
+class BestFitDecreasingLoader(CargoLoader):
+    #
+    # The best-fit loader algorithm, but with the items loaded from heaviest to lightest.
+    #
+    # Like first-fit-decreasing, loading the heavy items first leaves the light items to fill up the gaps. The trolleys
+    # are kept in a BestFitIndex, so finding the trolley for each item takes O(log n) time.
+    #
+
+    is_order_independent = True
+
+    def load(self, cargo_items: List[Cargo]) -> int:
+        #
+        # Load the cargo items into one or more cargo trolleys and return the number of trolleys that were loaded.
+        #
+
+        # Unlike the FirstFitDecreasingLoader we don't sort the list of the caller in place
+        with phase("sort"):
+            sorted_items = sorted(cargo_items, key=lambda x: x.weight_in_kg, reverse=True)
+
+        index = BestFitIndex(TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG)
+        with phase("place"):
+            for cargo in sorted_items:
+                index.place(cargo.weight_in_kg)
+
+        return index.count
+
+    def load_batch(self, batch: 'CargoBatch') -> int:
+        from cargo_loader.batch import best_fit_decreasing_count
+        return best_fit_decreasing_count(batch.weights_in_kg, TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG)
+
+    def load_assignments(self, cargo_items: Sequence[Cargo]) -> LoadAssignments:
+        return _decreasing_assignments(BestFitIndex(TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG), cargo_items)
+
+class WorstFitLoader(CargoLoader):
+    #
+    # A loader algorithm that loads every item into the emptiest trolley, or into a new trolley if the item doesn't
+    # fit into the emptiest trolley.
+    #
+    # The items are loaded in the order they are provided. Spreading the items over the trolleys keeps the loads of
+    # the trolleys balanced, at the cost of usually needing more trolleys than best-fit. The trolleys are kept in a
+    # WorstFitIndex, which is sorted by load, so the emptiest trolley is found in O(log n) time.
+    #
+
+    supports_streaming = True
+
+    def load(self, cargo_items: Iterable[Cargo]) -> int:
+        #
+        # Load the cargo items into one or more cargo trolleys and return the number of trolleys that were loaded.
+        #
+
+        index = WorstFitIndex(TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG)
+        for cargo in cargo_items:
+            index.place(cargo.weight_in_kg)
+
+        return index.count
+
+    def load_assignments(self, cargo_items: Iterable[Cargo]) -> LoadAssignments:
+        return _place_weights(WorstFitIndex(TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG), cargo_items)
+
+class AlmostWorstFitLoader(CargoLoader):
+    #
+    # Like the WorstFitLoader, but every item is loaded into the second emptiest trolley that can fit it. If the item
+    # only fits into the emptiest trolley that trolley is used. This keeps the emptiest trolley available for a
+    # heavier item and usually needs fewer trolleys than worst-fit.
+    #
+
+    supports_streaming = True
+
+    def load(self, cargo_items: Iterable[Cargo]) -> int:
+        #
+        # Load the cargo items into one or more cargo trolleys and return the number of trolleys that were loaded.
+        #
+
+        index = AlmostWorstFitIndex(TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG)
+        for cargo in cargo_items:
+            index.place(cargo.weight_in_kg)
+
+        return index.count
+
+    def load_assignments(self, cargo_items: Iterable[Cargo]) -> LoadAssignments:
+        return _place_weights(AlmostWorstFitIndex(TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG), cargo_items)
@@ -0,0 +1,293 @@
+import mmap
+import os
+import struct
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Tuple
+
+from cargo_loader.cargo import Cargo
+
+if TYPE_CHECKING:
+    from cargo_loader.batch import CargoBatch
+
+#
+# A binary cargo manifest stores the cargo items in fixed size records, so it can be memory mapped and read without
+# parsing it. The file consists of:
+#
+# - A header: the magic bytes, the format version, the size of the floating point values (4 or 8 bytes), the number of
+#   items, the number of distinct names and the length of the name data in bytes.
+# - The weights, lengths, widths and heights of the items, each as a column of floats.
+# - The position of the name of each item in the name table, as a column of 32 bit unsigned integers.
+# - The name table: the offset of each distinct name in the name data, as 64 bit unsigned integers, followed by the
+#   UTF-8 encoded names. Items with the same name share a single entry of the table.
+#
+# All the values are little endian and every section starts at a multiple of 8 bytes.
+#
+
+MANIFEST_MAGIC = b"CARGOMNF"
+MANIFEST_VERSION = 1
+
+# The sizes of the floating point values that can be stored, with their array type codes
+FLOAT_TYPE_CODES = {4: "f", 8: "d"}
+
+# The formats a manifest can be converted to, by file extension. Any other extension uses the binary format.
+TEXT_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".yaml": "yaml", ".yml": "yaml"}
+
+_HEADER = struct.Struct("<8sHHIQQQ")
+
+def _aligned(offset: int) -> int:
+    return (offset + 7) & ~7
+
+def _section_offsets(item_count: int, float_size: int, name_count: int) -> List[int]:
+    # The offsets of the weight, length, width, height, name index, name offset and name data sections
+    offsets = [_aligned(_HEADER.size)]
+    for size in (float_size, float_size, float_size, float_size, 4):
+        offsets.append(_aligned(offsets[-1] + item_count * size))
+    offsets.append(offsets[-1] + (name_count + 1) * 8)
+    return offsets
+
+def is_manifest_file(cargo_file: str) -> bool:
+    with open(cargo_file, "rb") as f:
+        return f.read(len(MANIFEST_MAGIC)) == MANIFEST_MAGIC
+
+def write_manifest(cargo_items: Iterable[Cargo], cargo_file: str, float_size: int = 8) -> int:
+    #
+    # Write the cargo items to a binary manifest and return the number of items that were written. With a float size
+    # of 4 the file is smaller, but the values are rounded to single precision.
+    #
+    if float_size not in FLOAT_TYPE_CODES:
+        raise ValueError(f"The float size should be one of {', '.join(str(size) for size in FLOAT_TYPE_CODES)}, but it is {float_size}.")
+
+    type_code = FLOAT_TYPE_CODES[float_size]
+    columns = [array(type_code), array(type_code), array(type_code), array(type_code)]
+    weights, lengths, widths, heights = columns
+    name_index = array("I")
+    name_ids: Dict[str, int] = {}
+    for cargo in cargo_items:
+        weights.append(cargo.weight_in_kg)
+        lengths.append(cargo.length_in_m)
+        widths.append(cargo.width_in_m)
+        heights.append(cargo.height_in_m)
+        name_index.append(name_ids.setdefault(cargo.name, len(name_ids)))
+
+    names = [name.encode("utf-8") for name in name_ids]
+    name_offsets = array("Q", [0])
+    for name in names:
+        name_offsets.append(name_offsets[-1] + len(name))
+
+    item_count = len(name_index)
+    offsets = _section_offsets(item_count, float_size, len(names))
+    with open(cargo_file, "wb") as f:
+        f.write(_HEADER.pack(MANIFEST_MAGIC, MANIFEST_VERSION, float_size, 0, item_count, len(names), name_offsets[-1]))
+        for offset, column in zip(offsets, (*columns, name_index, name_offsets)):
+            f.write(bytes(offset - f.tell()))
+            column.tofile(f)
+        for name in names:
+            f.write(name)
+
+    return item_count
+
+class ManifestNames(object):
+    #
+    # The names of the items in a binary manifest. The names are only decoded when they are accessed, so opening a
+    # manifest with millions of items doesn't create millions of strings.
+    #
+
+    def __init__(self, name_index, name_offsets, name_data):
+        self._name_index = name_index
+        self._name_offsets = name_offsets
+        self._name_data = name_data
+
+    def __len__(self) -> int:
+        return len(self._name_index)
+
+    def __getitem__(self, row: int) -> str:
+        return self._name(int(self._name_index[row]))
+
+    def _name(self, name_id: int) -> str:
+        return bytes(self._name_data[int(self._name_offsets[name_id]):int(self._name_offsets[name_id + 1])]).decode("utf-8")
+
+    def tolist(self) -> List[str]:
+        # Decode each distinct name once
+        table = [self._name(name_id) for name_id in range(len(self._name_offsets) - 1)]
+        return [table[name_id] for name_id in self._name_index]
+
+    def invalid_rows(self) -> List[int]:
+        #
+        # Return the rows of the items whose name is empty or only contains whitespace. Only the names that consist of
+        # whitespace and non-ASCII bytes have to be decoded for this, the other names are checked with NumPy.
+        #
+        import numpy as np
+
+        name_offsets = np.asarray(self._name_offsets, dtype=np.int64)
+        name_data = np.frombuffer(self._name_data, dtype=np.uint8)
+        lengths = np.diff(name_offsets)
+        candidates = lengths == 0
+        non_empty = np.flatnonzero(lengths > 0)
+        if len(non_empty) > 0:
+            maybe_space = np.isin(name_data, np.frombuffer(b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f", dtype=np.uint8)) | (name_data >= 0x80)
+            all_maybe_space = np.logical_and.reduceat(maybe_space, name_offsets[non_empty])
+            for name_id in non_empty[all_maybe_space].tolist():
+                candidates[name_id] = self._name(name_id).isspace()
+
+        invalid_ids = np.flatnonzero(candidates)
+        if len(invalid_ids) == 0:
+            return []
+
+        return np.flatnonzero(np.isin(np.asarray(self._name_index), invalid_ids)).tolist()
+
+class Manifest(object):
+    #
+    # A binary manifest that is opened with mmap. Opening a manifest only reads the header, the columns are read from
+    # the memory mapped file when they are used. The columns and the names can't be used after the manifest is closed.
+    #
+
+    def __init__(self, cargo_file: str):
+        self.path = cargo_file
+        size = os.path.getsize(cargo_file)
+        with open(cargo_file, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size or not header.startswith(MANIFEST_MAGIC):
+                raise ValueError(f"The file {cargo_file} is not a binary cargo manifest.")
+
+            _, version, self.float_size, _, self.item_count, self.name_count, self.name_data_length = _HEADER.unpack(header)
+            if version != MANIFEST_VERSION:
+                raise ValueError(f"The binary cargo manifest {cargo_file} has version {version}, but only version {MANIFEST_VERSION} is supported.")
+
+            if self.float_size not in FLOAT_TYPE_CODES:
+                raise ValueError(f"The binary cargo manifest {cargo_file} has an invalid float size of {self.float_size} bytes.")
+
+            self._offsets = _section_offsets(self.item_count, self.float_size, self.name_count)
+            if size < self._offsets[-1] + self.name_data_length:
+                raise ValueError(f"The binary cargo manifest {cargo_file} is truncated. Expected {self._offsets[-1] + self.name_data_length} bytes but the file has {size} bytes.")
+
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._views: List[memoryview] = []
+
+    def __enter__(self) -> 'Manifest':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.item_count
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._mmap.close()
+
+    def _view(self, section: int, type_code: str, count: int) -> memoryview:
+        size = array(type_code).itemsize
+        view = memoryview(self._mmap)
+        self._views.append(view)
+        view = view[self._offsets[section]:self._offsets[section] + count * size]
+        self._views.append(view)
+        view = view.cast(type_code)
+        self._views.append(view)
+        return view
+
+    def columns(self) -> Tuple[memoryview, memoryview, memoryview, memoryview]:
+        #
+        # Return the weights, lengths, widths and heights of the items. The columns share the memory of the file.
+        #
+        type_code = FLOAT_TYPE_CODES[self.float_size]
+        return tuple(self._view(section, type_code, self.item_count) for section in range(4))
+
+    @property
+    def names(self) -> ManifestNames:
+        return ManifestNames(
+            self._view(4, "I", self.item_count),
+            self._view(5, "Q", self.name_count + 1),
+            self._view(6, "B", self.name_data_length))
+
+    def __iter__(self) -> Iterator[Cargo]:
+        # The items are validated like the items of the other file formats, because the file may have been changed
+        names = self.names
+        for row, (weight, length, width, height) in enumerate(zip(*self.columns())):
+            yield Cargo(names[row], weight, length, width, height)
+
+    def to_batch(self) -> 'CargoBatch':
+        #
+        # Return the items as a CargoBatch whose columns are NumPy memory maps of the file, so that the vectorized
+        # loaders read the values without copying them. Single precision columns are converted to double precision.
+        # The batch can still be used after the manifest is closed.
+        #
+        import numpy as np
+
+        from cargo_loader.batch import CargoBatch
+
+        def memmap(section: int, dtype: np.dtype, count: int) -> np.ndarray:
+            if count == 0:
+                return np.empty(0, dtype=dtype)
+            return np.memmap(self.path, dtype=dtype, mode="r", offset=self._offsets[section], shape=(count,))
+
+        float_type = np.dtype(f"<f{self.float_size}")
+        names = ManifestNames(
+            memmap(4, np.dtype("<u4"), self.item_count),
+            memmap(5, np.dtype("<u8"), self.name_count + 1),
+            memmap(6, np.dtype(np.uint8), self.name_data_length))
+        return CargoBatch(names, *(memmap(section, float_type, self.item_count) for section in range(4)))
+
+def open_manifest(cargo_file: str) -> Manifest:
+    return Manifest(cargo_file)
+
+def _yaml_number(value: float) -> str:
+    # PyYAML only reads numbers with an exponent as floats if they contain a decimal point, e.g. '1.0e-05'
+    text = repr(value)
+    if "e" in text and "." not in text:
+        mantissa, exponent = text.split("e")
+        text = f"{mantissa}.0e{exponent}"
+    return text
+
+def write_text_file(cargo_items: Iterable[Cargo], cargo_file: str, text_format: str) -> int:
+    #
+    # Write the cargo items to a CSV, NDJSON or YAML file in the layout that Cargo.iter_file reads, and return the
+    # number of items that were written.
+    #
+    import json
+
+    count = 0
+    with open(cargo_file, "w", newline="" if text_format == "csv" else None) as f:
+        if text_format == "csv":
+            import csv
+
+            writer = csv.writer(f)
+            writer.writerow(("name", "mass", "length", "width", "height"))
+            for cargo in cargo_items:
+                writer.writerow((cargo.name, repr(cargo.weight_in_kg), repr(cargo.length_in_m), repr(cargo.width_in_m), repr(cargo.height_in_m)))
+                count += 1
+        elif text_format == "ndjson":
+            for cargo in cargo_items:
+                f.write(json.dumps({"name": cargo.name, "mass": cargo.weight_in_kg, "volume": [cargo.length_in_m, cargo.width_in_m, cargo.height_in_m]}) + "\n")
+                count += 1
+        elif text_format == "yaml":
+            # A JSON string is also a valid YAML string, so the names are quoted the same way. The names are the keys
+            # of a mapping, so they have to be unique.
+            names = set()
+            for cargo in cargo_items:
+                if cargo.name in names:
+                    raise ValueError(f"A YAML cargo file can't contain more than one cargo item with the name {cargo.name}. Convert to a CSV or NDJSON file instead.")
+
+                names.add(cargo.name)
+                f.write(f"{json.dumps(cargo.name)}:\n  mass: {_yaml_number(cargo.weight_in_kg)}\n"
+                        f"  volume: [{_yaml_number(cargo.length_in_m)}, {_yaml_number(cargo.width_in_m)}, {_yaml_number(cargo.height_in_m)}]\n")
+                count += 1
+        else:
+            raise ValueError(f"Unknown text format {text_format}. The available formats are: {', '.join(sorted(set(TEXT_FORMATS.values())))}.")
+
+    return count
+
+def convert_file(source_file: str, target_file: str, float_size: int = 8) -> int:
+    #
+    # Convert a cargo file to another format and return the number of items. The format of the source file is detected
+    # in the same way as by Cargo.iter_file, the format of the target file is determined by its extension: '.csv',
+    # '.ndjson', '.jsonl', '.yaml' and '.yml' are written as text and any other extension as a binary manifest.
+    #
+    extension = os.path.splitext(target_file)[1].lower()
+    if extension in TEXT_FORMATS:
+        return write_text_file(Cargo.iter_file(source_file), target_file, TEXT_FORMATS[extension])
+
+    return write_manifest(Cargo.iter_file(source_file), target_file, float_size)
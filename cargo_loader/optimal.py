@@ -0,0 +1,390 @@
+import math
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional
+
+from cargo_loader.assignments import LoadAssignments, assignments_from_order
+from cargo_loader.capacity_index import BestFitIndex, FirstFitIndex
+from cargo_loader.cargo import Cargo
+from cargo_loader.loader import CargoLoader
+from cargo_loader.trolley import TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG
+
+# Floating point sums of the weights may be off by a tiny amount. The lower bounds are reduced by this amount before
+# rounding up so that rounding errors can never produce a bound that is too high.
+_BOUND_TOLERANCE = 1e-9
+
+# The number of search nodes between checks of the time limit
+_NODES_PER_TIME_CHECK = 1024
+
+# The maximum number of search nodes that the minimum bin slack heuristic uses to fill a single trolley
+_MINIMUM_BIN_SLACK_NODES_PER_TROLLEY = 2000
+
+class OptimalLoadResult(object):
+    #
+    # Stores the outcome of an OptimalLoader run: the number of trolleys that are used, the best known lower bound on
+    # the number of trolleys, and the algorithm that found the solution. If the assignments were requested the result
+    # also contains the trolley of each item.
+    #
+
+    def __init__(self, trolley_count: int, lower_bound: int, algorithm: str, is_optimal: bool, assignments: Optional[LoadAssignments] = None):
+        self.trolley_count = trolley_count
+        self.lower_bound = lower_bound
+        self.algorithm = algorithm
+        self.is_optimal = is_optimal
+        self.assignments = assignments
+
+    @property
+    def gap(self) -> int:
+        #
+        # The number of trolleys that the solution may use more than the optimal solution.
+        #
+        return self.trolley_count - self.lower_bound
+
+    @property
+    def relative_gap(self) -> float:
+        return self.gap / self.trolley_count if self.trolley_count > 0 else 0.0
+
+    def __repr__(self):
+        return f"{self.trolley_count} trolleys, lower bound {self.lower_bound}, gap {self.gap}, found by {self.algorithm}"
+
+def l1_lower_bound(weights_in_kg: List[float], capacity: float) -> int:
+    #
+    # The simplest lower bound: the total weight divided by the capacity of a trolley, rounded up.
+    #
+    if not weights_in_kg:
+        return 0
+
+    return max(1, math.ceil(math.fsum(weights_in_kg) / capacity - _BOUND_TOLERANCE))
+
+def l2_lower_bound(weights_in_kg: List[float], capacity: float) -> int:
+    #
+    # The L2 lower bound of Martello and Toth. For a threshold 'alpha' the items are split into:
+    #
+    # - N1: items heavier than 'capacity - alpha', which can't share a trolley with any item of N2 or N3
+    # - N2: items heavier than half the capacity, each of which needs its own trolley
+    # - N3: items between 'alpha' and half the capacity
+    #
+    # The items in N3 can only use the space left in the N2 trolleys and any additional trolleys, which gives the
+    # bound |N1| + |N2| + ceil((weight(N3) - free space in N2 trolleys) / capacity). The bound is the maximum over all
+    # thresholds between 0 and half the capacity. It is always at least as good as the L1 bound.
+    #
+    if not weights_in_kg:
+        return 0
+
+    weights = sorted(weights_in_kg)
+    prefix = [0.0]
+    for weight in weights:
+        prefix.append(prefix[-1] + weight)
+
+    def weight_between(low_index: int, high_index: int) -> float:
+        return prefix[high_index] - prefix[low_index]
+
+    count = len(weights)
+    half = capacity / 2
+    half_index = bisect_right(weights, half)
+    bound = l1_lower_bound(weights, capacity)
+    for alpha in [0] + sorted(set(weights[:half_index])):
+        n1_index = bisect_right(weights, capacity - alpha)
+        n3_index = bisect_left(weights, alpha)
+
+        n1_count = count - n1_index
+        n2_count = n1_index - half_index
+        free_space_in_n2 = n2_count * capacity - weight_between(half_index, n1_index)
+        n3_weight = weight_between(n3_index, half_index)
+        extra = max(0, math.ceil((n3_weight - free_space_in_n2) / capacity - _BOUND_TOLERANCE))
+        bound = max(bound, n1_count + n2_count + extra)
+
+    return bound
+
+class _TimeLimitReached(Exception):
+    pass
+
+class OptimalLoader(CargoLoader):
+    #
+    # A loader that tries to find the smallest possible number of trolleys within a time limit.
+    #
+    # The loader works in a number of stages and stops as soon as a solution is found that uses as many trolleys as
+    # the lower bound, because that solution is optimal:
+    #
+    # 1. Calculate the L1 and L2 lower bounds (Martello and Toth).
+    # 2. Run the fast heuristics: first-fit-decreasing, best-fit-decreasing and minimum bin slack.
+    # 3. Run a branch-and-bound search that tries to load the items into one trolley less than the best solution
+    #    found so far. The search is 'anytime': every time it succeeds the best solution improves and the search
+    #    starts again with one trolley less, and if the time limit is reached the best solution found so far is used.
+    #    If the search proves that there is no solution with one trolley less the best solution is optimal.
+    #
+    # Because bin packing is NP-hard the search will not finish for large amounts of cargo, in which case the result
+    # reports the remaining gap between the solution and the lower bound.
+    #
+
+    is_order_independent = True
+
+    # The result depends on how far the search gets within the time limit
+    is_deterministic = False
+
+    def __init__(self, time_limit_in_seconds: Optional[float] = 10.0, capacity: float = TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG):
+        self.time_limit_in_seconds = time_limit_in_seconds
+        self.capacity = capacity
+
+    def settings(self) -> Dict[str, object]:
+        return {"time_limit": self.time_limit_in_seconds, "capacity": self.capacity}
+
+    def load(self, cargo_items: List[Cargo]) -> int:
+        #
+        # Load the cargo items into one or more cargo trolleys and return the number of trolleys that were loaded.
+        #
+        return self.solve(cargo_items).trolley_count
+
+    def load_assignments(self, cargo_items: List[Cargo]) -> LoadAssignments:
+        return self.solve(cargo_items, with_assignments=True).assignments
+
+    def solve(self, cargo_items: List[Cargo], with_assignments: bool = False) -> OptimalLoadResult:
+        #
+        # Load the cargo items and return the number of trolleys together with the lower bound and the algorithm
+        # that found the solution. If 'with_assignments' is set the result also contains the trolley of each item,
+        # which is slightly slower.
+        #
+        deadline = None if self.time_limit_in_seconds is None else time.perf_counter() + self.time_limit_in_seconds
+        capacity = self.capacity
+
+        if with_assignments:
+            unsorted_weights = [cargo.weight_in_kg for cargo in cargo_items]
+            order = sorted(range(len(unsorted_weights)), key=unsorted_weights.__getitem__, reverse=True)
+            weights = [unsorted_weights[position] for position in order]
+        else:
+            order = None
+            weights = sorted((cargo.weight_in_kg for cargo in cargo_items), reverse=True)
+
+        # The trolley of each of the sorted items in the best solution so far, if the assignments were requested
+        trolleys = [] if with_assignments else None
+
+        if not weights:
+            return OptimalLoadResult(0, 0, "none", True, LoadAssignments(array("I"), array("d")) if with_assignments else None)
+
+        lower_bound = l2_lower_bound(weights, capacity)
+
+        best = OptimalLoadResult(_place_all(FirstFitIndex(capacity), weights, trolleys), lower_bound, "first_fit_decreasing", False)
+        if best.trolley_count > lower_bound:
+            candidate = [] if with_assignments else None
+            count = _place_all(BestFitIndex(capacity), weights, candidate)
+            if count < best.trolley_count:
+                best = OptimalLoadResult(count, lower_bound, "best_fit_decreasing", False)
+                trolleys = candidate
+
+        if best.trolley_count > lower_bound:
+            try:
+                candidate = [0] * len(weights) if with_assignments else None
+                count = _minimum_bin_slack(weights, capacity, deadline, candidate)
+                if count < best.trolley_count:
+                    best = OptimalLoadResult(count, lower_bound, "minimum_bin_slack", False)
+                    trolleys = candidate
+            except _TimeLimitReached:
+                pass
+
+        try:
+            while best.trolley_count > best.lower_bound:
+                candidate = [] if with_assignments else None
+                if _can_load_into(weights, capacity, best.trolley_count - 1, deadline, candidate):
+                    best = OptimalLoadResult(best.trolley_count - 1, lower_bound, "branch_and_bound", False)
+                    trolleys = candidate
+                else:
+                    # There is no solution with fewer trolleys, so the current solution is optimal
+                    best.lower_bound = best.trolley_count
+        except _TimeLimitReached:
+            pass
+
+        best.is_optimal = best.trolley_count == best.lower_bound
+        if with_assignments:
+            trolley_loads = [0.0] * best.trolley_count
+            for weight, trolley in zip(weights, trolleys):
+                trolley_loads[trolley] += weight
+
+            best.assignments = assignments_from_order(order, trolleys, trolley_loads)
+
+        return best
+
+def _place_all(index, weights_in_kg: List[float], trolleys: Optional[List[int]] = None) -> int:
+    #
+    # Place the weights in the index and return the number of trolleys. If a list of trolleys is given the trolley of
+    # each weight is appended to it.
+    #
+    if trolleys is None:
+        for weight in weights_in_kg:
+            index.place(weight)
+    else:
+        trolleys.extend(map(index.place, weights_in_kg))
+
+    return index.count
+
+def _check_deadline(deadline: Optional[float]):
+    if deadline is not None and time.perf_counter() > deadline:
+        raise _TimeLimitReached()
+
+def _minimum_bin_slack(weights_in_kg: List[float], capacity: float, deadline: Optional[float], trolleys: Optional[List[int]] = None) -> int:
+    #
+    # The minimum bin slack heuristic of Gupta and Ho (in the MBS' variant of Fleszar and Hindi). Trolleys are filled
+    # one at a time. Each trolley starts with the heaviest remaining item, after which a depth first search over the
+    # remaining (distinct) weights looks for the set of items that leaves the least free space in the trolley. The
+    # search stops early when the trolley is completely full or when the node limit for the trolley is reached.
+    #
+    # If a list of trolleys is given the trolley of each (sorted) weight is stored in it.
+    #
+    distinct_weights = sorted(set(weights_in_kg), reverse=True)
+    counts = {weight: 0 for weight in distinct_weights}
+    for weight in weights_in_kg:
+        counts[weight] += 1
+
+    # The position of the next unassigned item of each distinct weight. The weights are sorted, so the items with
+    # the same weight are next to each other.
+    next_position = []
+    position = 0
+    for weight in distinct_weights:
+        next_position.append(position)
+        position += counts[weight]
+
+    remaining = [counts[weight] for weight in distinct_weights]
+    remaining_items = len(weights_in_kg)
+    trolley_count = 0
+    while remaining_items > 0:
+        _check_deadline(deadline)
+
+        first = next(index for index, count in enumerate(remaining) if count > 0)
+        remaining[first] -= 1
+        start_load = distinct_weights[first]
+
+        # Iterative depth first search over the distinct weights. Each level of the stack stores the index of the
+        # next distinct weight to try on that level together with the load of the trolley on that level. Every level
+        # after the first was created by adding the item in the same position of 'selection'.
+        best_load = start_load
+        best_selection: List[int] = []
+        selection: List[int] = []
+        stack = [first]
+        loads = [start_load]
+        nodes = 0
+        while stack and best_load != capacity and nodes < _MINIMUM_BIN_SLACK_NODES_PER_TROLLEY:
+            index = stack[-1]
+            load = loads[-1]
+            while index < len(distinct_weights) and (remaining[index] == 0 or load + distinct_weights[index] > capacity):
+                index += 1
+
+            if index == len(distinct_weights):
+                stack.pop()
+                loads.pop()
+                if selection:
+                    remaining[selection.pop()] += 1
+
+                continue
+
+            # The next sibling on this level uses the next distinct weight, items with the same weight are tried on
+            # the next level.
+            stack[-1] = index + 1
+            remaining[index] -= 1
+            selection.append(index)
+            nodes += 1
+
+            load = load + distinct_weights[index]
+            if load > best_load:
+                best_load = load
+                best_selection = list(selection)
+
+            stack.append(index)
+            loads.append(load)
+
+        # Undo the selection of the search and apply the best selection instead
+        for index in selection:
+            remaining[index] += 1
+
+        for index in best_selection:
+            remaining[index] -= 1
+
+        if trolleys is not None:
+            for index in [first] + best_selection:
+                trolleys[next_position[index]] = trolley_count
+                next_position[index] += 1
+
+        remaining_items -= 1 + len(best_selection)
+        trolley_count += 1
+
+    return trolley_count
+
+def _can_load_into(weights_in_kg: List[float], capacity: float, trolley_count: int, deadline: Optional[float], trolleys: Optional[List[int]] = None) -> bool:
+    #
+    # A branch-and-bound search that determines if the items (sorted from heaviest to lightest) can be loaded into
+    # the given number of trolleys. Each item is assigned to one of the trolleys, with the following pruning rules:
+    #
+    # - Trolleys with the same load are interchangeable, so for each item only one trolley per distinct load is tried.
+    # - Identical items are interchangeable, so an item never goes into a trolley before the trolley of the previous
+    #   identical item.
+    # - Free space in a trolley that is smaller than the lightest item can never be used. If the total amount of that
+    #   wasted space is larger than the spare capacity the branch can't lead to a solution.
+    #
+    # If a solution is found and a list of trolleys is given, the trolley of each item is stored in it.
+    #
+    count = len(weights_in_kg)
+    if trolley_count <= 0:
+        return count == 0
+
+    lightest = weights_in_kg[-1]
+    spare_capacity = trolley_count * capacity - math.fsum(weights_in_kg) + _BOUND_TOLERANCE
+    if spare_capacity < 0:
+        return False
+
+    loads = [0.0] * trolley_count
+    choices = [-1] * count
+    previous_loads = [0.0] * count
+    previous_wasted = [0.0] * count
+    next_trolley = [0] * count
+    tried_loads: List[set] = [set() for _ in range(count)]
+    wasted = 0.0
+    nodes = 0
+
+    depth = 0
+    while True:
+        if depth == count:
+            if trolleys is not None:
+                trolleys[:] = choices
+            return True
+
+        weight = weights_in_kg[depth]
+        placed = False
+        trolley = next_trolley[depth]
+        tried = tried_loads[depth]
+        while trolley < trolley_count:
+            load = loads[trolley]
+            if load not in tried and load + weight <= capacity:
+                tried.add(load)
+                new_load = load + weight
+                new_waste = capacity - new_load if capacity - new_load < lightest else 0.0
+                if wasted + new_waste <= spare_capacity:
+                    loads[trolley] = new_load
+                    previous_wasted[depth] = wasted
+                    wasted += new_waste
+                    previous_loads[depth] = load
+                    choices[depth] = trolley
+                    next_trolley[depth] = trolley + 1
+                    placed = True
+                    break
+
+            trolley += 1
+
+        nodes += 1
+        if nodes % _NODES_PER_TIME_CHECK == 0:
+            _check_deadline(deadline)
+
+        if placed:
+            depth += 1
+            if depth < count:
+                same_as_previous = weights_in_kg[depth] == weights_in_kg[depth - 1]
+                next_trolley[depth] = choices[depth - 1] if same_as_previous else 0
+                tried_loads[depth] = set()
+
+            continue
+
+        # Backtrack to the previous item and undo its placement
+        depth -= 1
+        if depth < 0:
+            return False
+
+        loads[choices[depth]] = previous_loads[depth]
+        wasted = previous_wasted[depth]
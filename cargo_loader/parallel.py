@@ -0,0 +1,116 @@
+import struct
+from array import array
+from typing import List, Optional, Sequence
+
+from cargo_loader.cargo import Cargo
+from cargo_loader.loader import CargoLoader
+
+# The header of a serialized list of cargo items: the number of items and the length of the name data in bytes
+_HEADER = struct.Struct("<QQ")
+
+class ParallelLoadResult(object):
+    #
+    # Stores the result of loading a set of cargo items in a worker process: where the items came from, the name of
+    # the loader that was used and the number of items and trolleys.
+    #
+
+    def __init__(self, source: str, loader_name: str, item_count: int, trolley_count: int):
+        self.source = source
+        self.loader_name = loader_name
+        self.item_count = item_count
+        self.trolley_count = trolley_count
+
+    def __repr__(self):
+        return f"{self.source}: {self.item_count} items in {self.trolley_count} trolleys using {self.loader_name}"
+
+def serialize_cargo(cargo_items: Sequence[Cargo]) -> bytes:
+    #
+    # Store the cargo items in a compact binary form that is much smaller, and much faster to transfer to another
+    # process, than a pickled list of Cargo objects. The data consists of a header, the weights and the three
+    # dimensions as arrays of doubles, the length of each (UTF-8 encoded) name and finally the names themselves.
+    #
+    names = [cargo.name.encode("utf-8") for cargo in cargo_items]
+    name_data = b"".join(names)
+
+    return b"".join((
+        _HEADER.pack(len(cargo_items), len(name_data)),
+        array("d", [cargo.weight_in_kg for cargo in cargo_items]).tobytes(),
+        array("d", [cargo.length_in_m for cargo in cargo_items]).tobytes(),
+        array("d", [cargo.width_in_m for cargo in cargo_items]).tobytes(),
+        array("d", [cargo.height_in_m for cargo in cargo_items]).tobytes(),
+        array("I", [len(name) for name in names]).tobytes(),
+        name_data,
+    ))
+
+def deserialize_cargo(data: bytes) -> List[Cargo]:
+    #
+    # Restore the cargo items that were stored with serialize_cargo. Raises a ValueError if the data is truncated or
+    # corrupt, e.g. when it was read from a damaged cache file.
+    #
+    if len(data) < _HEADER.size:
+        raise ValueError(f"The serialized cargo should be at least {_HEADER.size} bytes, but it is {len(data)} bytes.")
+
+    count, name_data_length = _HEADER.unpack_from(data)
+    offset = _HEADER.size
+    expected_length = offset + count * (4 * array("d").itemsize + array("I").itemsize) + name_data_length
+    if len(data) != expected_length:
+        raise ValueError(f"The serialized cargo should be {expected_length} bytes, but it is {len(data)} bytes.")
+
+    columns = []
+    for type_code in ("d", "d", "d", "d", "I"):
+        column = array(type_code)
+        column.frombytes(data[offset:offset + count * column.itemsize])
+        offset += count * column.itemsize
+        columns.append(column)
+
+    weights, lengths, widths, heights, name_lengths = columns
+    name_data = data[offset:offset + name_data_length]
+
+    names = []
+    position = 0
+    for name_length in name_lengths:
+        names.append(name_data[position:position + name_length].decode("utf-8"))
+        position += name_length
+
+    # The items were valid when they were serialized so there is no need to validate them again
+    return [
+        Cargo._create_unchecked(name, weight, length, width, height)
+        for name, weight, length, width, height in zip(names, weights, lengths, widths, heights)
+    ]
+
+def _load_file(loader: CargoLoader, cargo_file: str) -> ParallelLoadResult:
+    cargo_items = Cargo.from_file(cargo_file)
+    item_count = len(cargo_items)
+    return ParallelLoadResult(cargo_file, loader.__class__.__name__, item_count, loader.load(cargo_items))
+
+def _load_serialized(loader: CargoLoader, source: str, data: bytes) -> ParallelLoadResult:
+    cargo_items = deserialize_cargo(data)
+    item_count = len(cargo_items)
+    return ParallelLoadResult(source, loader.__class__.__name__, item_count, loader.load(cargo_items))
+
+def load_files_in_parallel(cargo_files: Sequence[str], loader: CargoLoader, jobs: Optional[int] = None) -> List[ParallelLoadResult]:
+    #
+    # Load the cargo of each file separately, with each file being read and loaded in its own worker process. Only
+    # the file name is sent to the worker and only the counts are sent back. The results are returned in the same
+    # order as the files.
+    #
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_load_file, loader, cargo_file) for cargo_file in cargo_files]
+        return [future.result() for future in futures]
+
+def load_portfolio(cargo_items: Sequence[Cargo], loaders: Sequence[CargoLoader], jobs: Optional[int] = None) -> List[ParallelLoadResult]:
+    #
+    # Load the same cargo items with each of the loaders, each in its own worker process. The results are sorted so
+    # that the result with the fewest trolleys comes first. If multiple loaders use the same number of trolleys the
+    # loader that comes first in the list of loaders is preferred.
+    #
+    data = serialize_cargo(cargo_items)
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_load_serialized, loader, "portfolio", data) for loader in loaders]
+        results = [future.result() for future in futures]
+
+    return sorted(results, key=lambda result: result.trolley_count)
@@ -0,0 +1,170 @@
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Sequence, TypeVar
+
+#
+# Opt-in instrumentation for the loaders and the command line. While a Profile is active (see 'profile') the
+# instrumented code records the wall time of its phases, e.g. reading the files, sorting the items and placing them
+# in the trolleys, and counters such as the number of trolleys that were scanned to find a trolley for each item.
+#
+# The instrumented code only checks once per call whether a profile is active. When no profile is active 'phase'
+# returns a shared context manager that does nothing, so the overhead is a few hundred nanoseconds per load instead of
+# a cost per item.
+#
+# Usage:
+#
+#   with profile() as run:
+#       loader.load(cargo_items)
+#       run.record_result(len(cargo_items), trolley_count)
+#
+#   print(run.report())
+#
+
+# The counter with the number of trolleys the loaders looked at to find a trolley for each item. Only the loaders that
+# scan the trolleys one by one (first_fit and first_fit_decreasing) record it, the other loaders find a trolley with
+# an index from cargo_loader/capacity_index.py or don't look at the trolleys at all.
+TROLLEYS_SCANNED = "trolleys_scanned"
+
+PhaseHook = Callable[[str, float], None]
+
+T = TypeVar("T")
+
+_NO_PHASE = nullcontext()
+
+_active_profile: Optional['Profile'] = None
+
+class Profile(object):
+    #
+    # The measurements of a single profiled run. The phases are stored in the order they ended, with the names of
+    # nested phases prefixed by the name of the enclosing phase, e.g. 'load/sort'. The hooks are called with the name
+    # and the wall time of every phase when it ends.
+    #
+
+    def __init__(self, hooks: Sequence[PhaseHook] = ()):
+        self.hooks = list(hooks)
+        self.phases: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.item_count: Optional[int] = None
+        self.trolley_count: Optional[int] = None
+        self.wall_time_in_seconds = 0.0
+        self.peak_memory_in_bytes: Optional[int] = None
+        self._stack: List[str] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self._stack.append(name)
+        full_name = "/".join(self._stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self._stack.pop()
+            self.phases[full_name] = self.phases.get(full_name, 0.0) + seconds
+            for hook in self.hooks:
+                hook(full_name, seconds)
+
+    def add(self, counter: str, amount: int):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def counted(self, items: Iterable[T], counter: str) -> Iterator[T]:
+        #
+        # Return the items and add one to the counter for every item that is taken.
+        #
+        count = 0
+        try:
+            for item in items:
+                count += 1
+                yield item
+        finally:
+            self.add(counter, count)
+
+    def record_result(self, item_count: int, trolley_count: int):
+        self.item_count = item_count
+        self.trolley_count = trolley_count
+
+    def report(self) -> Dict[str, object]:
+        #
+        # Return the measurements as a dictionary that can be written as JSON.
+        #
+        item_count = self.item_count
+        phases = []
+        for name, seconds in self.phases.items():
+            phase = {"name": name, "seconds": seconds}
+            if item_count is not None:
+                phase["items_per_second"] = item_count / seconds if seconds > 0 else None
+            phases.append(phase)
+
+        report = {
+            "items": item_count,
+            "trolleys": self.trolley_count,
+            "wall_time_in_seconds": self.wall_time_in_seconds,
+            "items_per_second": item_count / self.wall_time_in_seconds if item_count is not None and self.wall_time_in_seconds > 0 else None,
+            "phases": phases,
+            "counters": dict(self.counters),
+            "peak_memory_in_bytes": self.peak_memory_in_bytes,
+        }
+
+        if item_count and TROLLEYS_SCANNED in self.counters:
+            report["trolleys_scanned_per_item"] = self.counters[TROLLEYS_SCANNED] / item_count
+        elif item_count:
+            report["trolleys_scanned_per_item"] = None
+            report["notes"] = ["The algorithm doesn't scan the trolleys one by one, so the trolleys scanned per item aren't counted."]
+
+        return report
+
+def active_profile() -> Optional[Profile]:
+    return _active_profile
+
+def record_result(item_count: int, trolley_count: int):
+    profile = _active_profile
+    if profile is not None:
+        profile.record_result(item_count, trolley_count)
+
+def phase(name: str) -> ContextManager[None]:
+    #
+    # Measure a phase of the active profile, if there is one.
+    #
+    profile = _active_profile
+    return _NO_PHASE if profile is None else profile.phase(name)
+
+@contextmanager
+def profile(measure_memory: bool = False, stats_file: Optional[str] = None, hooks: Sequence[PhaseHook] = ()) -> Iterator[Profile]:
+    #
+    # Activate a new profile for the duration of the context. If 'measure_memory' is set the peak memory is measured
+    # with tracemalloc, which makes allocating objects a lot slower. If a 'stats_file' is given the run is also
+    # profiled with cProfile and the statistics are written to the file, so they can be read with pstats.
+    #
+    global _active_profile
+
+    if _active_profile is not None:
+        raise ValueError("A profile is already active.")
+
+    run = Profile(hooks)
+    profiler = None
+    if stats_file is not None:
+        import cProfile
+        profiler = cProfile.Profile()
+
+    if measure_memory:
+        import tracemalloc
+        tracemalloc.start()
+
+    _active_profile = run
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield run
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        run.wall_time_in_seconds = time.perf_counter() - start
+        _active_profile = None
+
+        if measure_memory:
+            run.peak_memory_in_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        if profiler is not None:
+            profiler.dump_stats(stats_file)
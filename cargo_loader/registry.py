@@ -0,0 +1,109 @@
+import importlib
+from typing import TYPE_CHECKING, Callable, Dict, List, Mapping, Optional
+
+from cargo_loader.trolley import TROLLEY_MAXIMUM_CARGO_VOLUME_IN_M3, Trolley
+
+if TYPE_CHECKING:
+    from cargo_loader.loader import CargoLoader
+
+#
+# The registry of the loader algorithms that can be selected by name, e.g. with the --algorithm argument of main.py,
+# the 'algorithm' of a request to the packing server or the --portfolio argument.
+#
+# By default the portfolio only runs the loaders that are registered with 'portfolio=True', so that it only compares
+# loaders that solve the same problem within a short time. The vector loaders also limit the volume of a trolley and
+# the optimal loader searches until its time limit, so they only run in the portfolio when they are selected.
+# A loader is registered with the name of the module and class that implement it instead of the class itself, so that
+# the modules of the algorithms that are not used aren't imported (see bench/startup.py). Loaders that need settings
+# are registered with a factory, which is called with the class and the options, e.g. the parsed command line
+# arguments. Loaders without a factory are created without arguments.
+#
+# Usage:
+#
+#   register_loader("my_fit", "my_package.loaders", "MyFitLoader")
+#   loader = create_loader("my_fit", {})
+#
+
+# The names of the options that are used by the factories of the built-in loaders. These are the same as the names
+# of the command line arguments.
+OPTION_TIME_LIMIT = "time_limit"
+OPTION_TROLLEY_VOLUME = "trolley_volume"
+OPTION_WEIGHT_RESOLUTION = "weight_resolution"
+
+# The name of the loader that is used when no algorithm is selected
+DEFAULT_LOADER = "first_fit"
+
+LoaderFactory = Callable[[type, Mapping[str, object]], 'CargoLoader']
+
+class LoaderRegistration(object):
+    #
+    # A loader that can be selected by name. The class is only imported when it is first needed.
+    #
+
+    def __init__(self, name: str, module: str, class_name: str, factory: Optional[LoaderFactory] = None, portfolio: bool = True):
+        self.name = name
+        self.module = module
+        self.class_name = class_name
+        self.factory = factory
+        self.portfolio = portfolio
+
+    def loader_type(self) -> type:
+        return getattr(importlib.import_module(self.module), self.class_name)
+
+    def create(self, options: Mapping[str, object]) -> 'CargoLoader':
+        loader_type = self.loader_type()
+        return loader_type() if self.factory is None else self.factory(loader_type, options)
+
+_registrations: Dict[str, LoaderRegistration] = {}
+
+def register_loader(name: str, module: str, class_name: str, factory: Optional[LoaderFactory] = None, portfolio: bool = True):
+    #
+    # Register a loader under the given name. The loaders are listed in the order they were registered, and
+    # registering a name again replaces the loader with that name.
+    #
+    _registrations[name] = LoaderRegistration(name, module, class_name, factory, portfolio)
+
+def loader_names() -> List[str]:
+    return list(_registrations)
+
+def portfolio_loader_names() -> List[str]:
+    return [name for name, registration in _registrations.items() if registration.portfolio]
+
+def loader_registration(name: str) -> LoaderRegistration:
+    registration = _registrations.get(name)
+    if registration is None:
+        raise ValueError(f"Unknown algorithm {name}. The available algorithms are: {', '.join(_registrations)}.")
+
+    return registration
+
+def create_loader(name: str, options: Mapping[str, object]) -> 'CargoLoader':
+    return loader_registration(name).create(options)
+
+def _create_optimal_loader(loader_type: type, options: Mapping[str, object]) -> 'CargoLoader':
+    return loader_type(options.get(OPTION_TIME_LIMIT, 10.0))
+
+def _create_vector_loader(loader_type: type, options: Mapping[str, object]) -> 'CargoLoader':
+    volume = options.get(OPTION_TROLLEY_VOLUME)
+    if volume is None:
+        volume = TROLLEY_MAXIMUM_CARGO_VOLUME_IN_M3
+    elif not volume > 0:
+        raise ValueError(f"The trolley volume should be larger than 0m3, but it is {volume}m3.")
+
+    return loader_type(Trolley(maximum_volume_in_m3=volume))
+
+def _create_histogram_loader(loader_type: type, options: Mapping[str, object]) -> 'CargoLoader':
+    return loader_type(options.get(OPTION_WEIGHT_RESOLUTION))
+
+register_loader("first_fit", "cargo_loader.loader", "FirstFitLoader")
+register_loader("first_fit_decreasing", "cargo_loader.loader", "FirstFitDecreasingLoader")
+register_loader("indexed_first_fit", "cargo_loader.loader", "IndexedFirstFitLoader")
+register_loader("indexed_first_fit_decreasing", "cargo_loader.loader", "IndexedFirstFitDecreasingLoader")
+register_loader("best_fit", "cargo_loader.loader", "BestFitLoader")
+register_loader("best_fit_decreasing", "cargo_loader.loader", "BestFitDecreasingLoader")
+register_loader("worst_fit", "cargo_loader.loader", "WorstFitLoader")
+register_loader("almost_worst_fit", "cargo_loader.loader", "AlmostWorstFitLoader")
+register_loader("optimal", "cargo_loader.optimal", "OptimalLoader", _create_optimal_loader, portfolio=False)
+register_loader("vector_first_fit", "cargo_loader.vector", "VectorFirstFitLoader", _create_vector_loader, portfolio=False)
+register_loader("vector_first_fit_decreasing", "cargo_loader.vector", "VectorFirstFitDecreasingLoader", _create_vector_loader, portfolio=False)
+register_loader("vector_dot_product", "cargo_loader.vector", "VectorDotProductLoader", _create_vector_loader, portfolio=False)
+register_loader("histogram", "cargo_loader.histogram", "HistogramLoader", _create_histogram_loader)
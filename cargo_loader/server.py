@@ -0,0 +1,221 @@
+import json
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from cargo_loader.cargo import Cargo
+from cargo_loader.loader import CargoLoader
+from cargo_loader.parallel import ParallelLoadResult, deserialize_cargo, serialize_cargo
+from cargo_loader.registry import DEFAULT_LOADER
+
+#
+# A long running HTTP/JSON server that loads cargo manifests. The server keeps a pool of worker processes running so
+# that, unlike 'python main.py', no time is spent starting Python and importing the modules for each request.
+#
+# The server has the following endpoints:
+#
+# - GET /health: Returns '{"status": "ok"}'.
+# - GET /algorithms: Returns the names of the algorithms that can be selected.
+# - POST /load: Loads a batch of manifests. The request body looks as follows:
+#
+# ```json
+# {
+#   "algorithm": "first_fit_decreasing",
+#   "time_limit": 10.0,
+#   "manifests": [
+#     {"name": "flight1", "cargo": [{"name": "Item1", "mass": 100, "volume": [1, 1, 1]}]},
+#     {"name": "flight2", "algorithm": "best_fit", "cargo": [{"name": "Item2", "mass": 50, "volume": [1, 1, 1]}]}
+#   ]
+# }
+# ```
+#
+# The 'algorithm' and 'time_limit' are optional and can also be given per manifest. The response contains one result
+# per manifest, in the same order as the manifests:
+#
+# ```json
+# {"results": [{"name": "flight1", "loader": "FirstFitDecreasingLoader", "item_count": 1, "trolley_count": 1}, ...]}
+# ```
+#
+# Invalid requests are answered with status 400 and '{"error": "..."}', and requests for which a loader or a worker
+# process failed with status 500. If the server is already handling the maximum number of load requests it answers
+# with status 503 straight away, instead of queueing the request, so that the clients can back off.
+#
+
+# A function that creates the loader for an algorithm name and a time limit in seconds
+ServerLoaderFactory = Callable[[str, float], CargoLoader]
+
+DEFAULT_TIME_LIMIT_IN_SECONDS = 10.0
+
+# The largest request body that is accepted
+MAXIMUM_REQUEST_SIZE_IN_BYTES = 64 * 1024 * 1024
+
+class RequestError(ValueError):
+    #
+    # Raised when a request can't be handled. The error contains the HTTP status that is sent back to the client.
+    #
+
+    def __init__(self, status: HTTPStatus, message: str):
+        self.status = status
+        super().__init__(message)
+
+def _load_manifest(loader: CargoLoader, name: str, data: bytes) -> ParallelLoadResult:
+    cargo_items = deserialize_cargo(data)
+    item_count = len(cargo_items)
+    return ParallelLoadResult(name, loader.__class__.__name__, item_count, loader.load(cargo_items))
+
+class PackingServer(ThreadingHTTPServer):
+    #
+    # Each connection is handled on its own thread, while the loading itself is done by the worker processes. At most
+    # 'maximum_pending_requests' load requests are handled at the same time, any other load requests are rejected.
+    #
+
+    daemon_threads = True
+
+    def __init__(
+            self,
+            address: Tuple[str, int],
+            loader_factory: ServerLoaderFactory,
+            algorithms: Sequence[str],
+            jobs: Optional[int] = None,
+            maximum_pending_requests: Optional[int] = None,
+            verbose: bool = True):
+        super().__init__(address, PackingRequestHandler)
+
+        jobs = jobs or os.cpu_count() or 1
+        if maximum_pending_requests is None:
+            maximum_pending_requests = 2 * jobs
+
+        if maximum_pending_requests < 1:
+            raise ValueError(f"The maximum number of pending requests should be at least 1, but it is {maximum_pending_requests}.")
+
+        self.loader_factory = loader_factory
+        self.algorithms = list(algorithms)
+        self.verbose = verbose
+        self.executor = ProcessPoolExecutor(max_workers=jobs)
+        self._pending_requests = threading.BoundedSemaphore(maximum_pending_requests)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown()
+
+    def load_manifests(self, request: Mapping[str, object]) -> List[Dict[str, object]]:
+        #
+        # Load all the manifests of a request on the worker processes. Raises a RequestError if the server is busy, if
+        # the request is invalid or if loading a manifest failed.
+        #
+        if not self._pending_requests.acquire(blocking=False):
+            raise RequestError(HTTPStatus.SERVICE_UNAVAILABLE, "The server is busy, please try again later.")
+
+        try:
+            futures = [
+                self.executor.submit(_load_manifest, loader, name, serialize_cargo(cargo_items))
+                for name, loader, cargo_items in self._parse_manifests(request)
+            ]
+            try:
+                results = [future.result() for future in futures]
+            except Exception as e:
+                # A loader raised an exception or a worker process died (BrokenProcessPool)
+                raise RequestError(HTTPStatus.INTERNAL_SERVER_ERROR, f"Loading the manifests failed: {e!r}")
+
+            return [
+                {"name": result.source, "loader": result.loader_name, "item_count": result.item_count, "trolley_count": result.trolley_count}
+                for result in results
+            ]
+        finally:
+            self._pending_requests.release()
+
+    def _parse_manifests(self, request: Mapping[str, object]) -> List[Tuple[str, CargoLoader, List[Cargo]]]:
+        # All the manifests are parsed before any of them is loaded, so that an invalid request is rejected as a whole
+        if not isinstance(request, dict) or not isinstance(request.get("manifests"), list):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "The request should be a JSON object with a list of 'manifests'.")
+
+        manifests = []
+        for index, manifest in enumerate(request["manifests"]):
+            if not isinstance(manifest, dict) or not isinstance(manifest.get("cargo"), list):
+                raise RequestError(HTTPStatus.BAD_REQUEST, f"Manifest {index} should be a JSON object with a list of 'cargo'.")
+
+            name = str(manifest.get("name", index))
+            algorithm = manifest.get("algorithm", request.get("algorithm", DEFAULT_LOADER))
+            if algorithm not in self.algorithms:
+                raise RequestError(HTTPStatus.BAD_REQUEST, f"Manifest {name}: Unknown algorithm {algorithm}. The available algorithms are: {', '.join(self.algorithms)}.")
+
+            time_limit = manifest.get("time_limit", request.get("time_limit", DEFAULT_TIME_LIMIT_IN_SECONDS))
+            if isinstance(time_limit, bool) or not isinstance(time_limit, (int, float)) or not math.isfinite(time_limit) or time_limit < 0:
+                raise RequestError(HTTPStatus.BAD_REQUEST, f"Manifest {name}: The time limit should be a number of seconds that is not negative, but it is {time_limit!r}.")
+
+            try:
+                cargo_items = [Cargo.from_mapping(item["name"], item) for item in manifest["cargo"]]
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                raise RequestError(HTTPStatus.BAD_REQUEST, f"Manifest {name}: Invalid cargo item: {e}")
+
+            try:
+                loader = self.loader_factory(algorithm, float(time_limit))
+            except (TypeError, ValueError) as e:
+                raise RequestError(HTTPStatus.BAD_REQUEST, f"Manifest {name}: Invalid settings for algorithm {algorithm}: {e}")
+
+            manifests.append((name, loader, cargo_items))
+
+        return manifests
+
+class PackingRequestHandler(BaseHTTPRequestHandler):
+    server: PackingServer
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        elif self.path == "/algorithms":
+            self._send_json(HTTPStatus.OK, {"algorithms": self.server.algorithms})
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {self.path}."})
+
+    def do_POST(self):
+        if self.path != "/load":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {self.path}."})
+            return
+
+        try:
+            results = self.server.load_manifests(self._read_json())
+        except RequestError as e:
+            self._send_json(e.status, {"error": str(e)})
+            return
+
+        self._send_json(HTTPStatus.OK, {"results": results})
+
+    def _read_json(self) -> object:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+
+        if length < 0:
+            # The length of the body is unknown, so the connection can't be used for another request
+            self.close_connection = True
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"The Content-Length should be a number of bytes that is not negative, but it is {self.headers.get('Content-Length')!r}.")
+
+        if length > MAXIMUM_REQUEST_SIZE_IN_BYTES:
+            # The body isn't read, so the connection can't be used for another request
+            self.close_connection = True
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"The request is larger than {MAXIMUM_REQUEST_SIZE_IN_BYTES} bytes.")
+
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"The request is not valid JSON: {e}")
+
+    def _send_json(self, status: HTTPStatus, body: Mapping[str, object]):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
@@ -0,0 +1,160 @@
+import heapq
+from typing import Dict, Iterable, List
+
+from cargo_loader.capacity_index import FirstFitIndex
+from cargo_loader.cargo import Cargo
+from cargo_loader.trolley import TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG
+
+# The default maximum number of items that are moved when trying to empty a trolley after an item was removed
+DEFAULT_MAXIMUM_REPAIR_MOVES = 16
+
+class PackingSession(object):
+    #
+    # Keeps the contents of the trolleys so that cargo items can be added and removed one at a time, e.g. while a
+    # flight is being loaded, without loading all the items again.
+    #
+    # The trolleys are kept in a FirstFitIndex, so each item is added to the left most trolley that fits it in
+    # O(log n) time. Trolleys that become empty are closed by giving them a full load in the index, so they are
+    # skipped by the search, and they are reused before a new trolley is opened.
+    #
+    # Removing items leaves gaps in the trolleys. After each removal a bounded repair step tries to empty the trolley
+    # the item was removed from, by moving its remaining items (heaviest first) into the other trolleys. The repair
+    # only moves up to 'maximum_repair_moves' items and is undone if the trolley can't be emptied completely. The
+    # 'repack' method loads all the items again with first-fit-decreasing.
+    #
+
+    def __init__(
+            self,
+            cargo_items: Iterable[Cargo] = (),
+            maximum_repair_moves: int = DEFAULT_MAXIMUM_REPAIR_MOVES,
+            capacity: float = TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG):
+        if maximum_repair_moves < 0:
+            raise ValueError(f"The maximum number of repair moves should not be negative, but it is {maximum_repair_moves}.")
+
+        self.maximum_repair_moves = maximum_repair_moves
+        self.capacity = capacity
+        self._reset()
+
+        # Adding the heaviest items first gives the first-fit-decreasing result
+        for cargo in sorted(cargo_items, key=lambda x: x.weight_in_kg, reverse=True):
+            self.add(cargo)
+
+    def _reset(self):
+        self._index = FirstFitIndex(self.capacity)
+        self._trolleys: List[Dict[str, Cargo]] = []
+        self._trolley_of: Dict[str, int] = {}
+        self._empty_trolleys: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._trolley_of)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._trolley_of
+
+    def count(self) -> int:
+        #
+        # Return the number of trolleys that contain at least one cargo item.
+        #
+        return self._index.count - len(self._empty_trolleys)
+
+    def trolleys(self) -> List[List[Cargo]]:
+        #
+        # Return the contents of the trolleys that contain at least one cargo item.
+        #
+        return [list(contents.values()) for contents in self._trolleys if contents]
+
+    def trolley_of(self, name: str) -> int:
+        if name not in self._trolley_of:
+            raise ValueError(f"There is no cargo item named {name} in the session.")
+
+        return self._trolley_of[name]
+
+    def add(self, cargo: Cargo) -> int:
+        #
+        # Add the cargo item to the left most trolley that fits it and return the index of that trolley.
+        #
+        if cargo.name in self._trolley_of:
+            raise ValueError(f"There already is a cargo item named {cargo.name} in the session.")
+
+        index = self._index.find(cargo.weight_in_kg)
+        if index < 0:
+            raise ValueError(f"Weight {cargo.weight_in_kg}kg exceeds the capacity of a single trolley, which is {self.capacity}kg.")
+
+        if index >= self._index.count and self._empty_trolleys:
+            # Reuse an empty trolley instead of opening a new one
+            index = heapq.heappop(self._empty_trolleys)
+            self._index.set_load(index, cargo.weight_in_kg)
+        else:
+            self._index.set_load(index, self._index.load_of(index) + cargo.weight_in_kg)
+            if index == len(self._trolleys):
+                self._trolleys.append({})
+
+        self._trolleys[index][cargo.name] = cargo
+        self._trolley_of[cargo.name] = index
+        return index
+
+    def remove(self, name: str) -> Cargo:
+        #
+        # Remove the cargo item with the given name, try to empty its trolley and return the removed item.
+        #
+        if name not in self._trolley_of:
+            raise ValueError(f"There is no cargo item named {name} in the session.")
+
+        index = self._trolley_of.pop(name)
+        contents = self._trolleys[index]
+        cargo = contents.pop(name)
+
+        if not contents:
+            self._close(index)
+        else:
+            # Add up the remaining weights instead of subtracting the removed weight, so that the floating point
+            # errors don't build up over many updates
+            self._index.set_load(index, sum(item.weight_in_kg for item in contents.values()))
+            self._repair(index)
+
+        return cargo
+
+    def repack(self) -> int:
+        #
+        # Load all the cargo items again with first-fit-decreasing and return the new number of trolleys.
+        #
+        cargo_items = [cargo for contents in self._trolleys for cargo in contents.values()]
+        self._reset()
+        for cargo in sorted(cargo_items, key=lambda x: x.weight_in_kg, reverse=True):
+            self.add(cargo)
+
+        return self.count()
+
+    def _close(self, index: int):
+        # A full load means that the search in the index never selects the trolley
+        self._index.set_load(index, self.capacity)
+        heapq.heappush(self._empty_trolleys, index)
+
+    def _repair(self, index: int):
+        contents = self._trolleys[index]
+        if len(contents) > self.maximum_repair_moves:
+            return
+
+        # Close the trolley so that its items are only moved to other trolleys
+        load = self._index.load_of(index)
+        self._index.set_load(index, self.capacity)
+
+        moves = []
+        for cargo in sorted(contents.values(), key=lambda x: x.weight_in_kg, reverse=True):
+            target = self._index.find(cargo.weight_in_kg)
+            if target < 0 or target >= self._index.count:
+                # The item doesn't fit into any of the other trolleys, so undo the moves
+                for target, previous_load, _ in reversed(moves):
+                    self._index.set_load(target, previous_load)
+                self._index.set_load(index, load)
+                return
+
+            moves.append((target, self._index.load_of(target), cargo))
+            self._index.set_load(target, self._index.load_of(target) + cargo.weight_in_kg)
+
+        for target, _, cargo in moves:
+            self._trolleys[target][cargo.name] = cargo
+            self._trolley_of[cargo.name] = target
+
+        contents.clear()
+        heapq.heappush(self._empty_trolleys, index)
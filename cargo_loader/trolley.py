@@ -1,3 +1,62 @@
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from cargo_loader.cargo import Cargo
 
 TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG = 2000
+TROLLEY_MAXIMUM_CARGO_VOLUME_IN_M3 = 10.0
+
+class Trolley(object):
+    #
+    # The capacity of a trolley: the maximum total weight and volume of the cargo and, optionally, the maximum length,
+    # width and height of a single cargo item. Items are not rotated, so each dimension of an item is compared with
+    # the limit for that dimension.
+    #
+
+    def __init__(
+            self,
+            maximum_weight_in_kg: float = TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG,
+            maximum_volume_in_m3: float = TROLLEY_MAXIMUM_CARGO_VOLUME_IN_M3,
+            maximum_length_in_m: Optional[float] = None,
+            maximum_width_in_m: Optional[float] = None,
+            maximum_height_in_m: Optional[float] = None):
+        for name, value in (("weight", maximum_weight_in_kg), ("volume", maximum_volume_in_m3)):
+            if not value > 0:
+                raise ValueError(f"The maximum {name} of a trolley should be larger than 0, but it is {value}.")
+
+        for name, value in (("length", maximum_length_in_m), ("width", maximum_width_in_m), ("height", maximum_height_in_m)):
+            if value is not None and not value > 0:
+                raise ValueError(f"The maximum {name} of a trolley should be larger than 0, but it is {value}.")
+
+        self.maximum_weight_in_kg = maximum_weight_in_kg
+        self.maximum_volume_in_m3 = maximum_volume_in_m3
+        self.maximum_length_in_m = maximum_length_in_m
+        self.maximum_width_in_m = maximum_width_in_m
+        self.maximum_height_in_m = maximum_height_in_m
+
+    def __repr__(self):
+        return (f"Trolley({self.maximum_weight_in_kg}kg, {self.maximum_volume_in_m3}m3, "
+                f"{self.maximum_length_in_m}x{self.maximum_width_in_m}x{self.maximum_height_in_m}m)")
+
+    def item_error(self, cargo: 'Cargo') -> Optional[str]:
+        #
+        # Return the reason why the cargo item doesn't fit into an empty trolley, or None if it fits.
+        #
+        if cargo.weight_in_kg > self.maximum_weight_in_kg:
+            return f"Weight {cargo.weight_in_kg}kg of cargo item {cargo.name} exceeds the capacity of a single trolley, which is {self.maximum_weight_in_kg}kg."
+
+        volume_in_m3 = cargo.length_in_m * cargo.width_in_m * cargo.height_in_m
+        if volume_in_m3 > self.maximum_volume_in_m3:
+            return f"Volume {volume_in_m3}m3 of cargo item {cargo.name} exceeds the capacity of a single trolley, which is {self.maximum_volume_in_m3}m3."
+
+        for name, value, maximum in (
+                ("Length", cargo.length_in_m, self.maximum_length_in_m),
+                ("Width", cargo.width_in_m, self.maximum_width_in_m),
+                ("Height", cargo.height_in_m, self.maximum_height_in_m)):
+            if maximum is not None and value > maximum:
+                return f"{name} {value}m of cargo item {cargo.name} exceeds the maximum {name.lower()} of {maximum}m."
+
+        return None
 
+# The trolley that is used when no trolley is specified
+DEFAULT_TROLLEY = Trolley()
@@ -0,0 +1,341 @@
+import math
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from cargo_loader.assignments import LoadAssignments, assignments_from_order
+from cargo_loader.capacity_index import VectorFirstFitIndex
+from cargo_loader.cargo import Cargo
+from cargo_loader.loader import CargoLoader
+from cargo_loader.trolley import DEFAULT_TROLLEY, Trolley
+
+#
+# Loaders for trolleys that have both a weight and a volume capacity. This is a two dimensional vector bin packing
+# problem: an item fits into a trolley if both its weight and its volume fit.
+#
+
+# The maximum number of items in a leaf of an _ItemTree
+_LEAF_SIZE = 8
+
+def _item_vector(trolley: Trolley, cargo: Cargo) -> Tuple[float, float]:
+    # Return the weight and volume of the item after checking that it fits into an empty trolley
+    error = trolley.item_error(cargo)
+    if error is not None:
+        raise ValueError(error)
+
+    return cargo.weight_in_kg, cargo.length_in_m * cargo.width_in_m * cargo.height_in_m
+
+def _l2_norm_sizes(vectors: List[Tuple[float, float]], trolley: Trolley) -> List[float]:
+    # The length of the item vector, with the weight and volume relative to the capacity of the trolley
+    weight_capacity = trolley.maximum_weight_in_kg
+    volume_capacity = trolley.maximum_volume_in_m3
+    return [math.hypot(weight / weight_capacity, volume / volume_capacity) for weight, volume in vectors]
+
+def _dot_product_sizes(vectors: List[Tuple[float, float]], trolley: Trolley) -> List[float]:
+    # The dot product of the item vector with the total demand vector (both relative to the capacity of the trolley),
+    # so the dimension that is most in demand counts the most
+    weight_capacity = trolley.maximum_weight_in_kg
+    volume_capacity = trolley.maximum_volume_in_m3
+    weight_demand = math.fsum(weight for weight, _ in vectors) / weight_capacity
+    volume_demand = math.fsum(volume for _, volume in vectors) / volume_capacity
+    return [weight / weight_capacity * weight_demand + volume / volume_capacity * volume_demand for weight, volume in vectors]
+
+def _maximum_sizes(vectors: List[Tuple[float, float]], trolley: Trolley) -> List[float]:
+    # The largest dimension of the item vector, relative to the capacity of the trolley
+    weight_capacity = trolley.maximum_weight_in_kg
+    volume_capacity = trolley.maximum_volume_in_m3
+    return [max(weight / weight_capacity, volume / volume_capacity) for weight, volume in vectors]
+
+# The ways in which the VectorFirstFitDecreasingLoader can order the items
+PRIORITIES: Dict[str, Callable[[List[Tuple[float, float]], Trolley], List[float]]] = {
+    "dot_product": _dot_product_sizes,
+    "l2_norm": _l2_norm_sizes,
+    "maximum": _maximum_sizes,
+}
+
+class VectorFirstFitLoader(CargoLoader):
+    #
+    # The first-fit loader algorithm for trolleys with a weight and a volume capacity. Each item is loaded into the
+    # left most trolley that can fit both its weight and its volume. The trolleys are kept in a VectorFirstFitIndex.
+    #
+
+    supports_streaming = True
+
+    def __init__(self, trolley: Trolley = DEFAULT_TROLLEY):
+        self.trolley = trolley
+
+    def settings(self) -> Dict[str, object]:
+        return {"trolley": repr(self.trolley)}
+
+    def load(self, cargo_items: Iterable[Cargo]) -> int:
+        #
+        # Load the cargo items into one or more cargo trolleys and return the number of trolleys that were loaded.
+        #
+        trolley = self.trolley
+        index = VectorFirstFitIndex(trolley.maximum_weight_in_kg, trolley.maximum_volume_in_m3)
+        for cargo in cargo_items:
+            index.place(*_item_vector(trolley, cargo))
+
+        return index.count
+
+    def load_assignments(self, cargo_items: Iterable[Cargo]) -> LoadAssignments:
+        trolley = self.trolley
+        index = VectorFirstFitIndex(trolley.maximum_weight_in_kg, trolley.maximum_volume_in_m3)
+        trolley_of_item = array("I", (index.place(*_item_vector(trolley, cargo)) for cargo in cargo_items))
+        return LoadAssignments(trolley_of_item, array("d", (weight for weight, _ in index.loads())))
+
+class VectorFirstFitDecreasingLoader(CargoLoader):
+    #
+    # The first-fit-decreasing loader algorithm for trolleys with a weight and a volume capacity.
+    #
+    # Items with two dimensions can't simply be sorted by size, so the items are sorted by a priority that combines
+    # the weight and the volume of each item (relative to the capacity of the trolley):
+    #
+    # - 'dot_product': The dot product with the total demand for weight and volume, which makes the dimension that is
+    #   most in demand count the most.
+    # - 'l2_norm': The length of the vector of weight and volume.
+    # - 'maximum': The largest of the weight and the volume.
+    #
+    # The items are then loaded with the VectorFirstFitIndex, see there for the time it takes to find a trolley.
+    # Items with the same priority are ordered by their weight and volume, so the number of trolleys doesn't depend on
+    # the order of the items.
+    #
+    # Note that when the weight and the volume of the items are unrelated, sorting the items tends to put items that
+    # are large in the same dimension together, and the VectorDotProductLoader usually needs fewer trolleys.
+    #
+
+    is_order_independent = True
+
+    def __init__(self, trolley: Trolley = DEFAULT_TROLLEY, priority: str = "dot_product"):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority}. The available priorities are: {', '.join(PRIORITIES)}.")
+
+        self.trolley = trolley
+        self.priority = priority
+
+    def settings(self) -> Dict[str, object]:
+        return {"trolley": repr(self.trolley), "priority": self.priority}
+
+    def load(self, cargo_items: Sequence[Cargo]) -> int:
+        #
+        # Load the cargo items into one or more cargo trolleys and return the number of trolleys that were loaded.
+        #
+        return self.load_assignments(cargo_items).trolley_count
+
+    def load_assignments(self, cargo_items: Sequence[Cargo]) -> LoadAssignments:
+        trolley = self.trolley
+        vectors = [_item_vector(trolley, cargo) for cargo in cargo_items]
+        sizes = PRIORITIES[self.priority](vectors, trolley)
+        order = sorted(range(len(vectors)), key=lambda position: (sizes[position], vectors[position]), reverse=True)
+
+        index = VectorFirstFitIndex(trolley.maximum_weight_in_kg, trolley.maximum_volume_in_m3)
+        trolley_of_sorted_item = array("I", (index.place(*vectors[position]) for position in order))
+        return assignments_from_order(order, trolley_of_sorted_item, (weight for weight, _ in index.loads()))
+
+class _ItemTree(object):
+    #
+    # A k-d tree over the weight and volume of the items that haven't been loaded yet. It finds the item with the
+    # largest score 'weight * weight_factor + volume * volume_factor' among the items that fit into a trolley.
+    #
+    # Every node stores the smallest and largest weight and volume of the remaining items below it. A node is skipped
+    # if even its lightest or smallest item doesn't fit, or if the score of its largest weight and volume can't beat
+    # the best item found so far. Removing an item only updates the nodes on the path from its leaf to the root.
+    #
+
+    def __init__(self, weights: Sequence[float], volumes: Sequence[float]):
+        self._weights = weights
+        self._volumes = volumes
+        self._removed = [False] * len(weights)
+        self._leaf_of_item = [0] * len(weights)
+
+        self._parent: List[int] = []
+        self._children: List[Optional[Tuple[int, int]]] = []
+        self._items: List[Optional[List[int]]] = []
+        self._minimum_weight: List[float] = []
+        self._minimum_volume: List[float] = []
+        self._maximum_weight: List[float] = []
+        self._maximum_volume: List[float] = []
+
+        if weights:
+            self._build(list(range(len(weights))), 0, -1)
+
+    def _build(self, items: List[int], depth: int, parent: int) -> int:
+        node = len(self._parent)
+        self._parent.append(parent)
+        self._children.append(None)
+        self._items.append(None)
+        self._minimum_weight.append(0.0)
+        self._minimum_volume.append(0.0)
+        self._maximum_weight.append(0.0)
+        self._maximum_volume.append(0.0)
+
+        if len(items) <= _LEAF_SIZE:
+            self._items[node] = items
+            for item in items:
+                self._leaf_of_item[item] = node
+            self._update_leaf(node)
+        else:
+            # Split the items at the median weight or volume, alternating between the two on each level
+            values = self._weights if depth % 2 == 0 else self._volumes
+            items.sort(key=values.__getitem__)
+            middle = len(items) // 2
+            left = self._build(items[:middle], depth + 1, node)
+            right = self._build(items[middle:], depth + 1, node)
+            self._children[node] = (left, right)
+            self._update_node(node)
+
+        return node
+
+    def _update_leaf(self, node: int):
+        items = [item for item in self._items[node] if not self._removed[item]]
+        self._items[node] = items
+        if items:
+            weights = [self._weights[item] for item in items]
+            volumes = [self._volumes[item] for item in items]
+            self._minimum_weight[node] = min(weights)
+            self._minimum_volume[node] = min(volumes)
+            self._maximum_weight[node] = max(weights)
+            self._maximum_volume[node] = max(volumes)
+        else:
+            self._minimum_weight[node] = math.inf
+            self._minimum_volume[node] = math.inf
+            self._maximum_weight[node] = -math.inf
+            self._maximum_volume[node] = -math.inf
+
+    def _update_node(self, node: int):
+        left, right = self._children[node]
+        self._minimum_weight[node] = min(self._minimum_weight[left], self._minimum_weight[right])
+        self._minimum_volume[node] = min(self._minimum_volume[left], self._minimum_volume[right])
+        self._maximum_weight[node] = max(self._maximum_weight[left], self._maximum_weight[right])
+        self._maximum_volume[node] = max(self._maximum_volume[left], self._maximum_volume[right])
+
+    def remove(self, item: int):
+        self._removed[item] = True
+        node = self._leaf_of_item[item]
+        self._update_leaf(node)
+        node = self._parent[node]
+        while node >= 0:
+            self._update_node(node)
+            node = self._parent[node]
+
+    def find_best(
+            self,
+            weight_load: float,
+            volume_load: float,
+            weight_capacity: float,
+            volume_capacity: float,
+            weight_factor: float,
+            volume_factor: float) -> int:
+        #
+        # Return the item with the largest score that fits into a trolley with the given load, or -1 if no item fits.
+        #
+        if not self._parent:
+            return -1
+
+        weights = self._weights
+        volumes = self._volumes
+        minimum_weight = self._minimum_weight
+        minimum_volume = self._minimum_volume
+        maximum_weight = self._maximum_weight
+        maximum_volume = self._maximum_volume
+
+        best_item = -1
+        best_score = -math.inf
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if weight_load + minimum_weight[node] > weight_capacity or volume_load + minimum_volume[node] > volume_capacity:
+                continue
+
+            if maximum_weight[node] * weight_factor + maximum_volume[node] * volume_factor <= best_score:
+                continue
+
+            children = self._children[node]
+            if children is None:
+                for item in self._items[node]:
+                    weight = weights[item]
+                    volume = volumes[item]
+                    if weight_load + weight <= weight_capacity and volume_load + volume <= volume_capacity:
+                        score = weight * weight_factor + volume * volume_factor
+                        if score > best_score:
+                            best_score = score
+                            best_item = item
+                continue
+
+            # Search the child with the highest possible score first, so the other child is more likely to be skipped
+            left, right = children
+            left_bound = maximum_weight[left] * weight_factor + maximum_volume[left] * volume_factor
+            right_bound = maximum_weight[right] * weight_factor + maximum_volume[right] * volume_factor
+            if left_bound >= right_bound:
+                stack.append(right)
+                stack.append(left)
+            else:
+                stack.append(left)
+                stack.append(right)
+
+        return best_item
+
+class VectorDotProductLoader(CargoLoader):
+    #
+    # The 'dot product' heuristic of Panigrahy et al. for trolleys with a weight and a volume capacity.
+    #
+    # Instead of loading the items one at a time the trolleys are filled one at a time. Each step adds the item with
+    # the largest dot product between its weight and volume and the remaining weight and volume of the trolley (all
+    # relative to the capacity of the trolley), until no remaining item fits. This pairs items that are heavy but
+    # small with items that are light but large, which the first-fit-decreasing loaders can't do because they sort
+    # the items up front. The best item is found with a k-d tree over the remaining items. Like other searches for the
+    # items within a range of a k-d tree, a step visits about O(sqrt(n)) nodes, so loading n items takes about
+    # O(n sqrt(n)) time.
+    #
+    # Items with the same dot product are chosen depending on their position in the tree, so the number of trolleys
+    # can depend on the order of the items.
+    #
+
+    def __init__(self, trolley: Trolley = DEFAULT_TROLLEY):
+        self.trolley = trolley
+
+    def settings(self) -> Dict[str, object]:
+        return {"trolley": repr(self.trolley)}
+
+    def load(self, cargo_items: Sequence[Cargo]) -> int:
+        #
+        # Load the cargo items into one or more cargo trolleys and return the number of trolleys that were loaded.
+        #
+        return self.load_assignments(cargo_items).trolley_count
+
+    def load_assignments(self, cargo_items: Sequence[Cargo]) -> LoadAssignments:
+        trolley = self.trolley
+        weight_capacity = trolley.maximum_weight_in_kg
+        volume_capacity = trolley.maximum_volume_in_m3
+
+        vectors = [_item_vector(trolley, cargo) for cargo in cargo_items]
+        weights = [weight for weight, _ in vectors]
+        volumes = [volume for _, volume in vectors]
+        tree = _ItemTree(weights, volumes)
+
+        trolley_of_item = array("I", bytes(array("I").itemsize * len(vectors)))
+        trolley_loads = array("d")
+        remaining = len(vectors)
+        while remaining > 0:
+            weight_load = 0
+            volume_load = 0
+            while True:
+                # The dot product with the remaining capacity, with both relative to the capacity of the trolley
+                item = tree.find_best(
+                    weight_load,
+                    volume_load,
+                    weight_capacity,
+                    volume_capacity,
+                    (weight_capacity - weight_load) / (weight_capacity * weight_capacity),
+                    (volume_capacity - volume_load) / (volume_capacity * volume_capacity))
+                if item < 0:
+                    break
+
+                tree.remove(item)
+                trolley_of_item[item] = len(trolley_loads)
+                weight_load += weights[item]
+                volume_load += volumes[item]
+                remaining -= 1
+
+            trolley_loads.append(weight_load)
+
+        return LoadAssignments(trolley_of_item, trolley_loads)
@@ -1,41 +1,182 @@
 import argparse
+import sys
+from functools import partial
 
-from typing import List, Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Mapping, Optional
 
-from cargo_loader.cargo import Cargo
-from cargo_loader.loader import CargoLoader, FirstFitDecreasingLoader, FirstFitLoader
+from cargo_loader.assignments import OUTPUT_FORMATS, write_assignments
+from cargo_loader.cargo import Cargo, CargoValidationError
+from cargo_loader.loader import CargoLoader
+from cargo_loader.profiling import phase, profile, record_result
+from cargo_loader.registry import DEFAULT_LOADER, create_loader as create_registered_loader, loader_names, portfolio_loader_names
+from cargo_loader.trolley import TROLLEY_MAXIMUM_CARGO_VOLUME_IN_M3
+
+if TYPE_CHECKING:
+    from cargo_loader.batch import CargoBatch
+    from cargo_loader.cache import CargoCache
+    from cargo_loader.profiling import Profile
+
+# The modules that are only needed by some of the commands and algorithms (the optimal and vector loaders, the
+# cache, the parallel loading and the server) are imported when they are used, so that loading a few items given with --cargo
+# starts quickly. See bench/startup.py.
 
 # Command line argument names
 ARG_FILE_LONG = "file"
 ARG_CARGO_LONG = "cargo"
 ARG_ALGORITHM_LONG = "algorithm"
+ARG_TIME_LIMIT_LONG = "time_limit"
+ARG_TROLLEY_VOLUME_LONG = "trolley_volume"
+ARG_WEIGHT_RESOLUTION_LONG = "weight_resolution"
+ARG_PER_FILE_LONG = "per_file"
+ARG_PORTFOLIO_LONG = "portfolio"
+ARG_JOBS_LONG = "jobs"
+ARG_READ_CONCURRENCY_LONG = "read_concurrency"
+ARG_PARSE_JOBS_LONG = "parse_jobs"
+ARG_CACHE_DIR_LONG = "cache_dir"
+ARG_NO_CACHE_LONG = "no_cache"
+ARG_OUTPUT_LONG = "output"
+ARG_OUTPUT_FILE_LONG = "output_file"
+ARG_PROFILE_LONG = "profile"
+ARG_PROFILE_MEMORY_LONG = "profile_memory"
+ARG_PROFILE_STATS_LONG = "profile_stats"
+ARG_HOST_LONG = "host"
+ARG_PORT_LONG = "port"
+ARG_MAX_PENDING_LONG = "max_pending"
+ARG_SOURCE_LONG = "source"
+ARG_TARGET_LONG = "target"
+ARG_FLOAT_SIZE_LONG = "float_size"
+
+# The default number of files that are read at the same time, see cargo_loader/ingest.py. Loaders that support
+# streaming read one file at a time by default, because each file that is read at the same time is parsed completely.
+DEFAULT_READ_CONCURRENCY = 8
+DEFAULT_STREAMING_READ_CONCURRENCY = 1
 
-def parse_cargo_items(arg_dict: Mapping[str, object]) -> List[Cargo]:
+# The name of the command that starts the packing server
+SERVE_COMMAND = "serve"
 
-    cargo_items: List[Cargo] = []
+# The name of the command that converts cargo files between the file formats
+CONVERT_COMMAND = "convert"
+
+def iter_cargo_items(arg_dict: Mapping[str, object], streaming: bool = False) -> Iterator[Cargo]:
     if ARG_CARGO_LONG in arg_dict and arg_dict[ARG_CARGO_LONG] is not None:
         for item in arg_dict[ARG_CARGO_LONG]:
-            cargo = Cargo.from_string(item)
-            cargo_items.append(cargo)
+            yield Cargo.from_string(item)
 
     if ARG_FILE_LONG in arg_dict and arg_dict[ARG_FILE_LONG] is not None:
-        cargo_items.extend(Cargo.from_files(arg_dict[ARG_FILE_LONG]))
+        cargo_files = arg_dict[ARG_FILE_LONG]
+        concurrency = read_concurrency(arg_dict, streaming)
+        parse_file = file_parser(arg_dict)
+        if len(cargo_files) > 1 and concurrency > 1:
+            from cargo_loader.ingest import iter_cargo_concurrently
+            yield from iter_cargo_concurrently(cargo_files, concurrency, read_file=parse_file)
+        elif parse_file is Cargo.from_file:
+            yield from Cargo.iter_files(cargo_files)
+        else:
+            for cargo_file in cargo_files:
+                yield from parse_file(cargo_file)
+
+def read_concurrency(arg_dict: Mapping[str, object], streaming: bool = False) -> int:
+    concurrency = arg_dict.get(ARG_READ_CONCURRENCY_LONG)
+    if concurrency is None:
+        return DEFAULT_STREAMING_READ_CONCURRENCY if streaming else DEFAULT_READ_CONCURRENCY
 
+    return concurrency
+
+def file_parser(arg_dict: Mapping[str, object]) -> Callable[[str], List[Cargo]]:
+    # Large CSV and NDJSON files can be parsed in chunks on multiple processes, see cargo_loader/chunked.py
+    jobs = arg_dict.get(ARG_PARSE_JOBS_LONG)
+    if jobs is None or jobs <= 1:
+        return Cargo.from_file
+
+    from cargo_loader.chunked import read_file_in_parallel
+    return partial(read_file_in_parallel, jobs=jobs)
+
+def parse_cargo_items(arg_dict: Mapping[str, object], cache: Optional['CargoCache'] = None) -> List[Cargo]:
+    if cache is None:
+        return list(iter_cargo_items(arg_dict))
+
+    # Read the files through the cache, so that files that haven't changed don't have to be parsed again
+    cargo_items = [Cargo.from_string(item) for item in arg_dict.get(ARG_CARGO_LONG) or []]
+    cargo_files = arg_dict.get(ARG_FILE_LONG) or []
+    concurrency = read_concurrency(arg_dict)
+    parse_file = file_parser(arg_dict)
+    if len(cargo_files) > 1 and concurrency > 1:
+        from cargo_loader.ingest import read_files_concurrently
+        cargo_items.extend(read_files_concurrently(cargo_files, concurrency, read_file=partial(cache.read_file, parse_file=parse_file)))
+    else:
+        cargo_items.extend(cache.read_files(cargo_files, parse_file))
     return cargo_items
 
+class CountingIterator(object):
+    #
+    # Counts the items that are taken from an iterator so that the number of cargo items is known after they have been
+    # streamed into a loader.
+    #
+
+    def __init__(self, items: Iterable[Cargo]):
+        self.count = 0
+        self._items = iter(items)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> Cargo:
+        item = next(self._items)
+        self.count += 1
+        return item
+
 def read_arguments() -> Mapping[str, any]:
     # Define the command line arguments so that we can parse them
-    # There are three possible arguments:
+    # There are eighteen possible arguments:
     #
     #  - -a, --algorithm: The name of the algorithm that should be used for the to sort the cargo items
-    #                     into trollys. Current options are: 'first_fit', 'first_fit_decreasing'
+    #                     into trollys. Current options are the algorithms in cargo_loader/registry.py: 'first_fit',
+    #                     'first_fit_decreasing', 'indexed_first_fit', 'indexed_first_fit_decreasing', 'best_fit',
+    #                     'best_fit_decreasing', 'worst_fit', 'almost_worst_fit', 'optimal', 'vector_first_fit',
+    #                     'vector_first_fit_decreasing', 'vector_dot_product' and 'histogram'
     #  - -f, --file: The file path for the input file which contains the list of cargo items. It
-    #                is expected that the file contains all the cargo items specified in YAML format.
-    #                For an example see the example_cargo_small.yaml file in the samples directory.
+    #                is expected that the file contains all the cargo items specified in YAML, CSV or
+    #                NDJSON format, or as a binary manifest (see the 'convert' command). For an example see
+    #                the example_cargo_small.yaml file in the samples directory.
     #  - -c, --cargo: The information of a cargo item given as a string. The format is 'name weight length width height'.
     #                 This argument can be specified multiple times.
+    #  - --time-limit: The maximum number of seconds that the 'optimal' algorithm may spend searching for a better
+    #                  solution.
+    #  - --trolley-volume: The maximum volume of the cargo in a trolley in m3, which is only used by the 'vector_*'
+    #                      algorithms.
+    #  - --weight-resolution: Round the weights up to a multiple of the given weight in kg, which is only used by the
+    #                         'histogram' algorithm. Defaults to the exact weights.
+    #  - --per-file: Load the cargo of each file separately, each in its own worker process, instead of loading the
+    #                cargo of all the files together.
+    #  - --portfolio: Load the cargo with the given algorithms, each in its own worker process, and report the
+    #                 algorithm that uses the fewest trolleys. Without algorithms all the algorithms that only limit
+    #                 the weight are used, except for 'optimal' (see cargo_loader/registry.py).
+    #  - -j, --jobs: The maximum number of worker processes used by --per-file and --portfolio. Defaults to the
+    #                number of processors.
+    #  - --read-concurrency: The number of files that are read at the same time when multiple files are given. Each
+    #                        file that is read at the same time is parsed completely, so the algorithms that stream
+    #                        the items read one file at a time by default. The other algorithms read 8 files at a time.
+    #  - --parse-jobs: The number of worker processes that parse a large CSV or NDJSON file in chunks. All the invalid
+    #                  items of the file are then reported, with their line numbers. Defaults to 1, which parses the
+    #                  file in this process.
+    #  - --cache-dir: The directory in which the results and the parsed files are cached between runs, e.g.
+    #                 ~/.cache/cargo_loader. Without it they are only cached in memory during the run.
+    #  - --no-cache: Don't use the cache. Loaders that support streaming never use it, because they read the items
+    #                straight from the files, which is needed for files that don't fit in memory.
+    #  - --output: Write the trolley of each cargo item in the given format: 'json', 'csv' or 'npy' (a NumPy array with
+    #              the trolley of each item, in the order of the items).
+    #  - --output-file: The file the trolley of each cargo item is written to. Defaults to the standard output, in
+    #                   which case the other messages are written to the standard error.
+    #  - --profile: Write a JSON report with the wall time of each phase of the run, the number of items per second
+    #               and the number of trolleys scanned per item to the given file, or to the standard error if no
+    #               file is given. See cargo_loader/profiling.py.
+    #  - --profile-memory: Also report the peak memory use, measured with tracemalloc. This makes the run slower.
+    #  - --profile-stats: Also profile the run with cProfile and write the statistics to the given file, so they can
+    #                     be read with pstats.
     #
-    # The --file and --cargo arguments are mutually exclusive, but at least one of them is required.
+    # The --file and --cargo arguments are mutually exclusive, but at least one of them is required. The --per-file
+    # and --portfolio arguments are also mutually exclusive and --per-file requires --file.
     #
 
     parser = argparse.ArgumentParser(
@@ -46,10 +187,131 @@ def read_arguments() -> Mapping[str, any]:
         "-a",
         f"--{ARG_ALGORITHM_LONG}",
         action="store",
-        choices=['first_fit', 'first_fit_decreasing',],
-        default='first_fit',
+        choices=loader_names(),
+        default=DEFAULT_LOADER,
+        required=False,
+        help=f"The name of the algorithm that should be used for the to sort the cargo items into trollys. Current options are: {', '.join(repr(name) for name in loader_names())}")
+
+    parser.add_argument(
+        f"--{ARG_TIME_LIMIT_LONG.replace('_', '-')}",
+        action="store",
+        default=10.0,
+        required=False,
+        type=float,
+        help="The maximum number of seconds that the 'optimal' algorithm may spend searching for a better solution.")
+
+    parser.add_argument(
+        f"--{ARG_TROLLEY_VOLUME_LONG.replace('_', '-')}",
+        action="store",
+        default=TROLLEY_MAXIMUM_CARGO_VOLUME_IN_M3,
+        required=False,
+        type=float,
+        help="The maximum volume of the cargo in a trolley in m3, which is only used by the 'vector_*' algorithms.")
+
+    parser.add_argument(
+        f"--{ARG_WEIGHT_RESOLUTION_LONG.replace('_', '-')}",
+        action="store",
+        default=None,
+        required=False,
+        type=float,
+        help="Round the weights up to a multiple of the given weight in kg, which is only used by the 'histogram' algorithm. Defaults to the exact weights.")
+
+    parser.add_argument(
+        "-j",
+        f"--{ARG_JOBS_LONG}",
+        action="store",
+        default=None,
+        required=False,
+        type=int,
+        help="The maximum number of worker processes used by --per-file and --portfolio. Defaults to the number of processors.")
+
+    parser.add_argument(
+        f"--{ARG_READ_CONCURRENCY_LONG.replace('_', '-')}",
+        action="store",
+        default=None,
+        required=False,
+        type=int,
+        help=f"The number of files that are read at the same time when multiple files are given. Defaults to {DEFAULT_READ_CONCURRENCY}, or to {DEFAULT_STREAMING_READ_CONCURRENCY} for the algorithms that stream the items.")
+
+    parser.add_argument(
+        f"--{ARG_PARSE_JOBS_LONG.replace('_', '-')}",
+        action="store",
+        default=1,
+        required=False,
+        type=int,
+        help="The number of worker processes that parse a large CSV or NDJSON file in chunks.")
+
+    parser.add_argument(
+        f"--{ARG_CACHE_DIR_LONG.replace('_', '-')}",
+        action="store",
+        default=None,
+        required=False,
+        type=str,
+        help="The directory in which the results and the parsed files are cached between runs. Without it they are only cached in memory.")
+
+    parser.add_argument(
+        f"--{ARG_NO_CACHE_LONG.replace('_', '-')}",
+        action="store_true",
+        required=False,
+        help="Don't use the cache. Loaders that support streaming never use it, because they read the items straight from the files.")
+
+    parser.add_argument(
+        f"--{ARG_OUTPUT_LONG}",
+        action="store",
+        choices=OUTPUT_FORMATS,
+        default=None,
+        required=False,
+        help="Write the trolley of each cargo item in the given format.")
+
+    parser.add_argument(
+        f"--{ARG_OUTPUT_FILE_LONG.replace('_', '-')}",
+        action="store",
+        default=None,
+        required=False,
+        type=str,
+        help="The file the trolley of each cargo item is written to. Defaults to the standard output.")
+
+    parser.add_argument(
+        f"--{ARG_PROFILE_LONG}",
+        action="store",
+        nargs="?",
+        const="-",
+        default=None,
+        required=False,
+        type=str,
+        help="Write a JSON report with the time spent in each phase of the run to the given file, or to the standard error if no file is given.")
+
+    parser.add_argument(
+        f"--{ARG_PROFILE_MEMORY_LONG.replace('_', '-')}",
+        action="store_true",
+        required=False,
+        help="Also report the peak memory use in the profile, measured with tracemalloc. This makes the run slower.")
+
+    parser.add_argument(
+        f"--{ARG_PROFILE_STATS_LONG.replace('_', '-')}",
+        action="store",
+        default=None,
+        required=False,
+        type=str,
+        help="Also profile the run with cProfile and write the statistics to the given file.")
+
+    parallel_group = parser.add_mutually_exclusive_group(required=False)
+
+    parallel_group.add_argument(
+        f"--{ARG_PER_FILE_LONG.replace('_', '-')}",
+        action="store_true",
+        required=False,
+        help="Load the cargo of each file separately, each in its own worker process.")
+
+    parallel_group.add_argument(
+        f"--{ARG_PORTFOLIO_LONG}",
+        action="store",
+        nargs="*",
+        choices=loader_names(),
+        default=None,
         required=False,
-        help="The name of the algorithm that should be used for the to sort the cargo items into trollys. Current options are: 'first_fit', 'first_fit_decreasing'")
+        metavar="ALGORITHM",
+        help=f"Load the cargo with the given algorithms, each in its own worker process, and report the best result. Defaults to: {', '.join(repr(name) for name in portfolio_loader_names())}")
 
     group = parser.add_mutually_exclusive_group(required=True)
 
@@ -72,27 +334,314 @@ def read_arguments() -> Mapping[str, any]:
     )
 
     args = parser.parse_args()
+    if args.read_concurrency is not None and args.read_concurrency < 1:
+        parser.error(f"--{ARG_READ_CONCURRENCY_LONG.replace('_', '-')} should be at least 1.")
+
+    if args.parse_jobs < 1:
+        parser.error(f"--{ARG_PARSE_JOBS_LONG.replace('_', '-')} should be at least 1.")
+
+    if args.trolley_volume is not None and not args.trolley_volume > 0:
+        parser.error(f"--{ARG_TROLLEY_VOLUME_LONG.replace('_', '-')} should be larger than 0.")
+
+    if args.per_file and args.file is None:
+        parser.error(f"--{ARG_PER_FILE_LONG.replace('_', '-')} requires the --{ARG_FILE_LONG} argument.")
+
+    if args.output is not None and (args.per_file or args.portfolio is not None):
+        parser.error(f"--{ARG_OUTPUT_LONG} can't be combined with --{ARG_PER_FILE_LONG.replace('_', '-')} or --{ARG_PORTFOLIO_LONG}.")
+
+    # The other processes aren't profiled
+    if (args.profile is not None or args.profile_memory or args.profile_stats is not None) and (args.per_file or args.portfolio is not None):
+        parser.error(f"The profile options can't be combined with --{ARG_PER_FILE_LONG.replace('_', '-')} or --{ARG_PORTFOLIO_LONG}.")
+
     return vars(args)
 
+def read_serve_arguments(argv: List[str]) -> Mapping[str, any]:
+    # Define the command line arguments of the 'serve' command, which starts a server that keeps running and loads the
+    # cargo manifests that are sent to it. See cargo_loader/server.py for the API. There are four possible arguments:
+    #
+    #  - --host: The address the server listens on. Defaults to localhost.
+    #  - -p, --port: The port the server listens on.
+    #  - -j, --jobs: The number of worker processes that load the manifests. Defaults to the number of processors.
+    #  - --max-pending: The maximum number of load requests that are handled at the same time. Any other requests are
+    #                   rejected with status 503. Defaults to twice the number of worker processes.
+    #
+
+    parser = argparse.ArgumentParser(
+        prog=f"main.py {SERVE_COMMAND}",
+        description="Start a server that loads cargo manifests into trolleys.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument(f"--{ARG_HOST_LONG}", action="store", default="127.0.0.1", type=str, help="The address the server listens on.")
+    parser.add_argument("-p", f"--{ARG_PORT_LONG}", action="store", default=8080, type=int, help="The port the server listens on.")
+    parser.add_argument(
+        "-j",
+        f"--{ARG_JOBS_LONG}",
+        action="store",
+        default=None,
+        type=int,
+        help="The number of worker processes that load the manifests. Defaults to the number of processors.")
+    parser.add_argument(
+        f"--{ARG_MAX_PENDING_LONG.replace('_', '-')}",
+        action="store",
+        default=None,
+        type=int,
+        help="The maximum number of load requests that are handled at the same time. Defaults to twice the number of worker processes.")
+
+    return vars(parser.parse_args(argv))
+
+def read_convert_arguments(argv: List[str]) -> Mapping[str, any]:
+    # Define the command line arguments of the 'convert' command, which converts a cargo file to another format, e.g.
+    # a YAML file to a binary manifest that is read much faster. There are three possible arguments:
+    #
+    #  - source: The cargo file that is converted. Its format is detected in the same way as for --file.
+    #  - target: The file that is written. Files with the extension '.csv', '.ndjson', '.jsonl', '.yaml' or '.yml'
+    #            are written in that format and files with any other extension as a binary manifest.
+    #  - --float-size: The number of bytes of the floating point values in a binary manifest, 4 or 8. With 4 bytes the
+    #                  file is smaller, but the values are rounded to single precision.
+    #
+
+    parser = argparse.ArgumentParser(
+        prog=f"main.py {CONVERT_COMMAND}",
+        description="Convert a cargo file to another format, e.g. to a binary manifest that is read much faster.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument(ARG_SOURCE_LONG, type=str, help="The cargo file that is converted.")
+    parser.add_argument(ARG_TARGET_LONG, type=str, help="The file that is written. The format is determined by the extension, any unknown extension is written as a binary manifest.")
+    parser.add_argument(
+        f"--{ARG_FLOAT_SIZE_LONG.replace('_', '-')}",
+        action="store",
+        choices=[4, 8],
+        default=8,
+        type=int,
+        help="The number of bytes of the floating point values in a binary manifest.")
+
+    return vars(parser.parse_args(argv))
+
+def convert(arg_dict: Mapping[str, object]):
+    from cargo_loader.manifest import convert_file
+
+    count = convert_file(arg_dict[ARG_SOURCE_LONG], arg_dict[ARG_TARGET_LONG], arg_dict[ARG_FLOAT_SIZE_LONG])
+    print(f"Converted {count} items from {arg_dict[ARG_SOURCE_LONG]} to {arg_dict[ARG_TARGET_LONG]}")
+
+def create_loader(algorithm: str, time_limit: float) -> CargoLoader:
+    return select_loader({ARG_ALGORITHM_LONG: algorithm, ARG_TIME_LIMIT_LONG: time_limit})
+
+def serve(arg_dict: Mapping[str, object]):
+    from cargo_loader.server import PackingServer
+
+    server = PackingServer(
+        (arg_dict[ARG_HOST_LONG], arg_dict[ARG_PORT_LONG]),
+        create_loader,
+        loader_names(),
+        jobs=arg_dict.get(ARG_JOBS_LONG),
+        maximum_pending_requests=arg_dict.get(ARG_MAX_PENDING_LONG))
+
+    host, port = server.server_address[:2]
+    print(f"Serving on http://{host}:{port} ...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
 def select_loader(arg_dict: Mapping[str, object]) -> CargoLoader:
-    if ARG_ALGORITHM_LONG in arg_dict and arg_dict[ARG_ALGORITHM_LONG] is not None:
-        if arg_dict[ARG_ALGORITHM_LONG] == 'first_fit':
-            return FirstFitLoader()
-        elif arg_dict[ARG_ALGORITHM_LONG] == 'first_fit_decreasing':
-            return FirstFitDecreasingLoader()
+    # The loaders are created with the registered factories, which read their settings from the arguments
+    algorithm = arg_dict.get(ARG_ALGORITHM_LONG)
+    return create_registered_loader(DEFAULT_LOADER if algorithm is None else algorithm, arg_dict)
+
+def load_per_file(arg_dict: Mapping[str, object], loader: CargoLoader):
+    from cargo_loader.parallel import load_files_in_parallel
+
+    print(f"Loading {len(arg_dict[ARG_FILE_LONG])} files into trolleys using {loader.__class__.__name__} ...")
 
-    return FirstFitLoader()
+    results = load_files_in_parallel(arg_dict[ARG_FILE_LONG], loader, arg_dict.get(ARG_JOBS_LONG))
+    for result in results:
+        print(f"{result.source}: Loaded {result.item_count} items into {result.trolley_count} { 'trolley' if result.trolley_count == 1 else 'trolleys'}")
+
+def create_cache(arg_dict: Mapping[str, object], loader: CargoLoader) -> Optional['CargoCache']:
+    if arg_dict.get(ARG_NO_CACHE_LONG):
+        return None
+
+    # Loaders that support streaming read the items straight from the files instead of through the cache, unless all
+    # the items are needed at once anyway
+    if loader.supports_streaming and arg_dict.get(ARG_PORTFOLIO_LONG) is None and arg_dict.get(ARG_OUTPUT_LONG) is None:
+        return None
+
+    from cargo_loader.cache import CargoCache
+    return CargoCache(arg_dict.get(ARG_CACHE_DIR_LONG))
+
+def load_with_portfolio(arg_dict: Mapping[str, object], cache: Optional['CargoCache'] = None):
+    from cargo_loader.parallel import load_portfolio
+
+    cargo_items = parse_cargo_items(arg_dict, cache)
+    algorithms = arg_dict[ARG_PORTFOLIO_LONG] or portfolio_loader_names()
+    print(f"Loading {len(cargo_items)} items into trolleys using {len(algorithms)} algorithms ...")
+
+    loaders = [select_loader({**arg_dict, ARG_ALGORITHM_LONG: name}) for name in algorithms]
+    results = load_portfolio(cargo_items, loaders, arg_dict.get(ARG_JOBS_LONG))
+    for result in results:
+        print(f"{result.loader_name}: {result.trolley_count} { 'trolley' if result.trolley_count == 1 else 'trolleys'}")
+
+    best = results[0]
+    print(f"Loaded {best.item_count} items into {best.trolley_count} { 'trolley' if best.trolley_count == 1 else 'trolleys'} using {best.loader_name}")
+
+def read_manifest_batch(arg_dict: Mapping[str, object]) -> Optional['CargoBatch']:
+    #
+    # Return the cargo items as a CargoBatch whose columns are read straight from the memory mapped file if the items
+    # are given as a single binary manifest and NumPy is installed, otherwise None.
+    #
+    cargo_files = arg_dict.get(ARG_FILE_LONG) or []
+    if arg_dict.get(ARG_CARGO_LONG) or len(cargo_files) != 1 or not Path(cargo_files[0]).is_file():
+        return None
+
+    from cargo_loader.manifest import is_manifest_file, open_manifest
+    if not is_manifest_file(cargo_files[0]):
+        return None
+
+    import importlib.util
+    if importlib.util.find_spec("numpy") is None:
+        return None
+
+    with phase("read"), open_manifest(cargo_files[0]) as manifest:
+        batch = manifest.to_batch()
+
+    with phase("validate"):
+        errors = batch.validation_errors()
+    if errors:
+        raise CargoValidationError(errors)
+
+    return batch
+
+def write_output(arg_dict: Mapping[str, object], loader: CargoLoader, cache: Optional['CargoCache'] = None):
+    # The assignments may be written to the standard output, so the messages are written to the standard error
+    with phase("read"):
+        cargo_items = parse_cargo_items(arg_dict, cache)
+    print(f"Loading {len(cargo_items)} items into trolleys using {loader.__class__.__name__} ...", file=sys.stderr)
+
+    with phase("load"):
+        assignments = loader.load_assignments(cargo_items)
+    names = [cargo.name for cargo in cargo_items]
+
+    output_format = arg_dict[ARG_OUTPUT_LONG]
+    output_file = arg_dict.get(ARG_OUTPUT_FILE_LONG)
+    binary = output_format == "npy"
+    with phase("write"):
+        if output_file is None or output_file == "-":
+            write_assignments(assignments, names, output_format, sys.stdout.buffer if binary else sys.stdout)
+            sys.stdout.flush()
+        else:
+            with open(output_file, "wb" if binary else "w", **({} if binary else {"newline": ""})) as f:
+                write_assignments(assignments, names, output_format, f)
+
+    count = assignments.trolley_count
+    record_result(len(cargo_items), count)
+    print(f"Loaded {len(cargo_items)} items into {count} { 'trolley' if count == 1 else 'trolleys'}", file=sys.stderr)
 
 def main(args=None):
-    arg_dict = read_arguments()
-    cargo_items = parse_cargo_items(arg_dict)
+    if len(sys.argv) > 1 and sys.argv[1] == SERVE_COMMAND:
+        serve(read_serve_arguments(sys.argv[2:]))
+        return
+
+    if len(sys.argv) > 1 and sys.argv[1] == CONVERT_COMMAND:
+        convert(read_convert_arguments(sys.argv[2:]))
+        return
 
+    arg_dict = read_arguments()
     loader = select_loader(arg_dict)
 
-    print(f"Loading {len(cargo_items)} items into trolleys using {loader.__class__.__name__} ...")
+    if arg_dict.get(ARG_PER_FILE_LONG):
+        load_per_file(arg_dict, loader)
+        return
+
+    cache = create_cache(arg_dict, loader)
+    if arg_dict.get(ARG_PORTFOLIO_LONG) is not None:
+        load_with_portfolio(arg_dict, cache)
+        return
+
+    if arg_dict.get(ARG_PROFILE_LONG) is None and not arg_dict.get(ARG_PROFILE_MEMORY_LONG) and arg_dict.get(ARG_PROFILE_STATS_LONG) is None:
+        load_cargo(arg_dict, loader, cache)
+        return
+
+    with profile(measure_memory=arg_dict.get(ARG_PROFILE_MEMORY_LONG), stats_file=arg_dict.get(ARG_PROFILE_STATS_LONG)) as run:
+        load_cargo(arg_dict, loader, cache)
+
+    write_profile(arg_dict, loader, run)
+
+def write_profile(arg_dict: Mapping[str, object], loader: CargoLoader, run: 'Profile'):
+    import json
+
+    report = {"algorithm": loader.__class__.__name__, **run.report()}
+    profile_file = arg_dict.get(ARG_PROFILE_LONG)
+    if profile_file is None or profile_file == "-":
+        print(json.dumps(report, indent=2), file=sys.stderr)
+    else:
+        with open(profile_file, "w") as f:
+            json.dump(report, f, indent=2)
+
+def load_cargo(arg_dict: Mapping[str, object], loader: CargoLoader, cache: Optional['CargoCache'] = None):
+    if arg_dict.get(ARG_OUTPUT_LONG) is not None:
+        write_output(arg_dict, loader, cache)
+        return
+
+    # Loaders with a vectorized load_batch load a binary manifest without creating a Cargo object for each item, and
+    # without the cache, because the manifest is read faster than the cached result would be looked up
+    batch = read_manifest_batch(arg_dict) if type(loader).load_batch is not CargoLoader.load_batch else None
+    if batch is not None:
+        print(f"Loading {len(batch)} items into trolleys using {loader.__class__.__name__} ...")
+
+        with phase("load"):
+            count = loader.load_batch(batch)
+        record_result(len(batch), count)
+        print(f"Loaded {len(batch)} items into {count} { 'trolley' if count == 1 else 'trolleys'}")
+        return
+
+    # Loaders that process the items one at a time read the items straight from the files, which means that the files
+    # never have to be loaded into memory completely. They don't use the cache, which would need all the items.
+    if loader.supports_streaming:
+        # The number of items in the files is only known once they have all been read, so it is reported afterwards
+        if arg_dict.get(ARG_FILE_LONG) is None:
+            print(f"Loading {len(arg_dict.get(ARG_CARGO_LONG) or [])} items into trolleys using {loader.__class__.__name__} ...")
+        else:
+            print(f"Loading the items of {len(arg_dict[ARG_FILE_LONG])} { 'file' if len(arg_dict[ARG_FILE_LONG]) == 1 else 'files'} into trolleys using {loader.__class__.__name__} ...")
+
+        # The items are read while they are loaded, so the time spent reading the files is part of the 'load' phase
+        cargo_items = CountingIterator(iter_cargo_items(arg_dict, streaming=True))
+        with phase("load"):
+            count = loader.load(cargo_items)
+        item_count = cargo_items.count
+
+    # The cache only stores the number of trolleys, so the optimal loader, which also reports the lower bound, doesn't
+    # use it. It isn't deterministic anyway.
+    elif cache is not None and loader.is_deterministic:
+        with phase("read"):
+            cargo_items = parse_cargo_items(arg_dict, cache)
+        print(f"Loading {len(cargo_items)} items into trolleys using {loader.__class__.__name__} ...")
+
+        with phase("load"):
+            count = cache.load(loader, cargo_items)
+        item_count = len(cargo_items)
+    else:
+        with phase("read"):
+            cargo_items = parse_cargo_items(arg_dict, cache)
+        print(f"Loading {len(cargo_items)} items into trolleys using {loader.__class__.__name__} ...")
+
+        # The optimal loader also reports how far the solution is from the best possible solution
+        from cargo_loader.optimal import OptimalLoader
+        if isinstance(loader, OptimalLoader):
+            with phase("load"):
+                result = loader.solve(cargo_items)
+            record_result(len(cargo_items), result.trolley_count)
+            print(f"Loaded {len(cargo_items)} items into {result.trolley_count} { 'trolley' if result.trolley_count == 1 else 'trolleys'}")
+            print(f"Lower bound: {result.lower_bound}, optimality gap: {result.gap} ({result.relative_gap:.1%}), solution found by: {result.algorithm}{' (optimal)' if result.is_optimal else ''}")
+            return
+
+        with phase("load"):
+            count = loader.load(cargo_items)
+        item_count = len(cargo_items)
 
-    count = loader.load(cargo_items)
-    print(f"Loaded {len(cargo_items)} items into {count} { 'trolley' if count == 1 else 'trolleys'}")
+    record_result(item_count, count)
+    print(f"Loaded {item_count} items into {count} { 'trolley' if count == 1 else 'trolleys'}")
 
 if __name__ == '__main__':
     main()
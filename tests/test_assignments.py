@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+from array import array
+
+import pytest
+
+from cargo_loader.assignments import LoadAssignments, assignments_from_order, write_assignments
+
+def create_assignments():
+    return LoadAssignments(array("I", [0, 1, 0]), array("d", [150.0, 100.0]))
+
+def test_assignments_should_count_trolleys():
+    assignments = create_assignments()
+    assert len(assignments) == 3
+    assert assignments.trolley_count == 2
+
+def test_assignments_should_throw_exception_when_arrays_have_wrong_type():
+    with pytest.raises(ValueError):
+        LoadAssignments(array("i", [0]), array("d", [1.0]))
+
+def test_assignments_should_store_trolley_by_position_when_created_from_order():
+    # The items at positions 2, 0 and 1 were loaded into trolleys 0, 0 and 1
+    assignments = assignments_from_order([2, 0, 1], [0, 0, 1], [150.0, 100.0])
+    assert list(assignments.trolley_of_item) == [0, 1, 0]
+
+def test_assignments_should_share_memory_when_converted_to_numpy():
+    pytest.importorskip("numpy")
+    assignments = create_assignments()
+    trolley_of_item, trolley_loads = assignments.to_numpy()
+    assert trolley_of_item.tolist() == [0, 1, 0]
+    assert trolley_loads.tolist() == [150.0, 100.0]
+
+    assignments.trolley_of_item[0] = 5
+    assert trolley_of_item[0] == 5
+
+def test_should_write_json_when_writing_assignments():
+    stream = io.StringIO()
+    write_assignments(create_assignments(), ["Item1", "Item2", "Item3"], "json", stream)
+    assert json.loads(stream.getvalue()) == {
+        "trolley_count": 2,
+        "trolley_loads": [150.0, 100.0],
+        "items": [{"name": "Item1", "trolley": 0}, {"name": "Item2", "trolley": 1}, {"name": "Item3", "trolley": 0}],
+    }
+
+def test_should_write_csv_when_writing_assignments():
+    stream = io.StringIO()
+    write_assignments(create_assignments(), ["Item1", "Item2", "Item3"], "csv", stream)
+    assert list(csv.reader(io.StringIO(stream.getvalue()))) == [["name", "trolley"], ["Item1", "0"], ["Item2", "1"], ["Item3", "0"]]
+
+def test_should_write_npy_when_writing_assignments():
+    np = pytest.importorskip("numpy")
+    stream = io.BytesIO()
+    write_assignments(create_assignments(), ["Item1", "Item2", "Item3"], "npy", stream)
+    stream.seek(0)
+    assert np.load(stream).tolist() == [0, 1, 0]
+
+def test_should_throw_exception_when_writing_unknown_format():
+    with pytest.raises(ValueError):
+        write_assignments(create_assignments(), ["Item1", "Item2", "Item3"], "xml", io.StringIO())
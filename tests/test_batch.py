@@ -0,0 +1,126 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from cargo_loader.batch import CargoBatch, first_fit_decreasing_count, next_fit_count
+from cargo_loader.cargo import Cargo, CargoValidationError
+from cargo_loader.loader import (
+    AlmostWorstFitLoader,
+    BestFitDecreasingLoader,
+    BestFitLoader,
+    FirstFitDecreasingLoader,
+    FirstFitLoader,
+    IndexedFirstFitDecreasingLoader,
+    IndexedFirstFitLoader,
+    WorstFitLoader,
+)
+
+def create_random_cargo_items(seed: int, count: int, decimals: int = 1):
+    generator = random.Random(seed)
+    return [Cargo(f"Item{i}", round(generator.uniform(0.1, 200), decimals), 0.5, 1, 2) for i in range(count)]
+
+def create_duplicated_cargo_items(seed: int, count: int):
+    # Runs of items with the same weight, similar to the large example manifest
+    generator = random.Random(seed)
+    cargo_items = []
+    while len(cargo_items) < count:
+        weight = generator.choice([10.0, 12.5, 50.0, 99.9, 190.0, 200.0])
+        cargo_items.extend(Cargo(f"Item{len(cargo_items)}", weight, 0.5, 1, 2) for _ in range(generator.randint(1, 60)))
+
+    return cargo_items
+
+ALL_LOADERS = [
+    FirstFitLoader,
+    FirstFitDecreasingLoader,
+    IndexedFirstFitLoader,
+    IndexedFirstFitDecreasingLoader,
+    BestFitLoader,
+    BestFitDecreasingLoader,
+    WorstFitLoader,
+    AlmostWorstFitLoader,
+]
+
+def test_cargo_batch_should_store_columns_when_created_from_cargo_items():
+    cargo_items = [Cargo("Item1", 100, 0.5, 1, 2), Cargo("Item2", 50, 1, 1, 1)]
+    batch = CargoBatch.from_cargo(cargo_items)
+    assert len(batch) == 2
+    assert batch.names.tolist() == ["Item1", "Item2"]
+    assert batch.weights_in_kg.tolist() == [100.0, 50.0]
+    assert batch.lengths_in_m.tolist() == [0.5, 1.0]
+    assert batch.widths_in_m.tolist() == [1.0, 1.0]
+    assert batch.heights_in_m.tolist() == [2.0, 1.0]
+
+def test_cargo_batch_should_create_equal_cargo_items_when_converting_back():
+    cargo_items = [Cargo("Item1", 100, 0.5, 1, 2), Cargo("Item2", 50, 1, 1, 1)]
+    assert [str(cargo) for cargo in CargoBatch.from_cargo(cargo_items).to_cargo()] == ["Item1,100.0,0.5,1.0,2.0", "Item2,50.0,1.0,1.0,1.0"]
+
+def test_cargo_batch_should_throw_exception_when_columns_have_different_lengths():
+    with pytest.raises(ValueError):
+        CargoBatch(["Item1", "Item2"], [100, 50], [1], [1, 1], [1, 1])
+
+def test_cargo_batch_should_report_all_invalid_items_when_validating():
+    batch = CargoBatch(["Item1", " ", "Item3", "Item4"], [100, 50, 300, 10], [1, 1, 1, 10], [1, 1, 1, 10], [1, 1, 1, 10])
+    errors = batch.validation_errors()
+    assert len(errors) == 3
+    assert errors[0].startswith("Row 1: ")
+    assert errors[1].startswith("Row 2: ")
+    assert errors[2].startswith("Row 3: ")
+
+def test_cargo_batch_should_report_same_errors_as_cargo_when_validating():
+    columns = (["Item1", "", "Item3", "Item4"], [100.0, 50.0, -1.0, 10.0], [1.0, 1.0, 1.0, 10.0], [1.0, 1.0, 1.0, 10.0], [1.0, 1.0, 1.0, 10.0])
+    assert CargoBatch(*columns).validation_errors() == Cargo.validate_many(*columns)
+
+def test_cargo_batch_should_throw_exception_when_converting_invalid_items():
+    batch = CargoBatch(["Item1", "Item2"], [100, 300], [1, 1], [1, 1], [1, 1])
+    with pytest.raises(CargoValidationError):
+        batch.to_cargo()
+
+@pytest.mark.parametrize("loader_type", ALL_LOADERS)
+def test_loader_should_load_empty_batch_like_empty_list(loader_type):
+    assert loader_type().load_batch(CargoBatch.from_cargo([])) == loader_type().load([])
+
+@pytest.mark.parametrize("loader_type", ALL_LOADERS)
+def test_loader_should_load_batch_into_same_number_of_trolleys_as_list(loader_type):
+    for seed in range(3):
+        for cargo_items in (create_random_cargo_items(seed, 3000), create_random_cargo_items(seed, 3000, 6), create_duplicated_cargo_items(seed, 3000)):
+            batch = CargoBatch.from_cargo(cargo_items)
+            assert loader_type().load_batch(batch) == loader_type().load(list(cargo_items))
+
+
+def reference_next_fit_count(weights, capacity):
+    count = 1
+    load = 0.0
+    for weight in weights:
+        if load + weight > capacity:
+            count += 1
+            load = 0.0
+        load += weight
+
+    return count
+
+def reference_first_fit_decreasing_count(weights, capacity):
+    loads = []
+    for weight in sorted(weights, reverse=True):
+        for i, load in enumerate(loads):
+            if load + weight <= capacity:
+                loads[i] = load + weight
+                break
+        else:
+            loads.append(weight)
+
+    return len(loads)
+
+def test_next_fit_count_should_match_sequential_sums_when_loads_are_close_to_capacity():
+    # Decimal weights with a small capacity often add up to a value within rounding distance of the capacity
+    for seed in range(20):
+        generator = random.Random(seed)
+        weights = [generator.choice([0.1, 0.2, 0.3, 0.7]) for _ in range(2000)] + [round(generator.uniform(0.01, 1), 2) for _ in range(2000)]
+        assert next_fit_count(np.array(weights), 1.0) == reference_next_fit_count(weights, 1.0)
+
+def test_first_fit_decreasing_count_should_match_sequential_sums_for_distinct_weights():
+    for seed in range(20):
+        generator = random.Random(seed)
+        weights = [round(generator.uniform(0.01, 1), 2) for _ in range(500)] + [generator.uniform(0.01, 1) for _ in range(500)]
+        assert first_fit_decreasing_count(np.array(weights), 1.0) == reference_first_fit_decreasing_count(weights, 1.0)
@@ -0,0 +1,86 @@
+import pytest
+
+from bench.budget import TimeBudget, predict_seconds
+from bench.compare import compare_results
+from bench.generators import DISTRIBUTIONS, generate_cargo, generate_vector_cargo, generate_weights
+from bench.run import discover_loaders, run_benchmarks
+from bench.startup import STARTUP_BUDGET_IN_MS, imported_lazy_modules, measure_startup
+from cargo_loader.cargo import Cargo
+from cargo_loader.loader import FirstFitDecreasingLoader, FirstFitLoader
+
+@pytest.mark.parametrize("distribution", list(DISTRIBUTIONS))
+def test_generator_should_create_same_weights_when_using_same_seed(distribution):
+    assert generate_weights(distribution, 1000, 1) == generate_weights(distribution, 1000, 1)
+    assert generate_weights(distribution, 1000, 1) != generate_weights(distribution, 1000, 2)
+
+@pytest.mark.parametrize("distribution", list(DISTRIBUTIONS))
+def test_generator_should_create_valid_cargo(distribution):
+    cargo_items = generate_cargo(distribution, 1000)
+    assert len(cargo_items) == 1000
+    assert all(0 < cargo.weight_in_kg <= Cargo.CARGO_MAX_WEIGHT_IN_KG for cargo in cargo_items)
+
+@pytest.mark.parametrize("distribution", list(DISTRIBUTIONS))
+def test_generator_should_create_vector_cargo_that_fills_same_share_of_weight_and_volume(distribution):
+    cargo_items = generate_vector_cargo(distribution, 10_000)
+    weight_share = sum(cargo.weight_in_kg for cargo in cargo_items) / 2000
+    volume_share = sum(cargo.length_in_m * cargo.width_in_m * cargo.height_in_m for cargo in cargo_items) / 10
+    assert volume_share == pytest.approx(weight_share, rel=0.1)
+
+def test_generator_should_throw_exception_when_using_unknown_distribution():
+    with pytest.raises(ValueError):
+        generate_weights("unknown", 10)
+
+def test_should_discover_all_loaders():
+    loaders = discover_loaders()
+    assert loaders["FirstFitLoader"] is FirstFitLoader
+    assert loaders["FirstFitDecreasingLoader"] is FirstFitDecreasingLoader
+    assert "CargoLoader" not in loaders
+
+def test_should_report_trolleys_and_lower_bound_when_running_benchmarks():
+    results = run_benchmarks([100], ["uniform"], loader_names=["FirstFitLoader"], measure_memory=False)
+    load_results = [result for result in results if result["benchmark"] == "load"]
+    assert len(load_results) == 1
+    assert load_results[0]["trolleys"] >= load_results[0]["lower_bound"]
+    assert load_results[0]["items_per_second"] > 0
+    assert {result["name"] for result in results if result["benchmark"] == "read"} == {"from_file", "iter_file"}
+
+def test_should_run_vector_benchmark_only_for_vector_loaders():
+    results = run_benchmarks([100], ["uniform"], loader_names=["FirstFitLoader", "VectorFirstFitLoader"], measure_memory=False, maximum_file_size=0)
+    assert [(result["benchmark"], result["name"]) for result in results if result["benchmark"] != "load_batch"] == [
+        ("load", "FirstFitLoader"),
+        ("load", "VectorFirstFitLoader"),
+        ("load_vector", "VectorFirstFitLoader"),
+    ]
+
+def test_should_skip_larger_sizes_when_loader_is_predicted_to_exceed_time_budget():
+    results = run_benchmarks([100, 1000], ["uniform"], loader_names=["FirstFitLoader"], time_budget_in_seconds=0.0, measure_memory=False)
+    assert [result["size"] for result in results if result["benchmark"] == "load"] == [100]
+
+def test_predict_seconds_should_extrapolate_with_exponent_of_last_two_runs():
+    assert predict_seconds([(1000, 1.0)], 10_000) == pytest.approx(10.0)
+    assert predict_seconds([(1000, 1.0)], 10_000, minimum_exponent=2.0) == pytest.approx(100.0)
+    assert predict_seconds([(100, 0.01), (1000, 1.0)], 10_000) == pytest.approx(100.0)
+    assert predict_seconds([(100, 0.5), (1000, 1.0)], 10_000) == pytest.approx(10.0)
+    assert predict_seconds([(100, 0.001), (1000, 1.0)], 10_000) == pytest.approx(100.0)
+
+def test_time_budget_should_only_be_exceeded_by_benchmarks_that_have_run():
+    budget = TimeBudget(5.0)
+    assert budget.exceeded_by("load", 1000) is None
+    budget.record("load", 100, 1.0)
+    assert budget.exceeded_by("load", 200) is None
+    assert budget.exceeded_by("load", 1000) == pytest.approx(10.0)
+
+def test_should_report_regression_when_benchmark_is_slower_than_baseline():
+    baseline = [{"benchmark": "load", "name": "FirstFitLoader", "distribution": "uniform", "size": 100, "seconds": 1.0, "trolleys": 5}]
+    current = [{"benchmark": "load", "name": "FirstFitLoader", "distribution": "uniform", "size": 100, "seconds": 1.5, "trolleys": 6}]
+    assert len(compare_results(baseline, current, threshold=0.1)) == 2
+    assert compare_results(baseline, baseline, threshold=0.1) == []
+
+def test_should_not_import_lazy_modules_when_loading_cargo_from_command_line(tmp_path):
+    _, imports = measure_startup(repeat=1, environment={"XDG_CACHE_HOME": str(tmp_path)})
+    assert "cargo_loader.loader" in imports
+    assert imported_lazy_modules(imports) == []
+
+def test_should_import_modules_within_budget_when_loading_cargo_from_command_line(tmp_path):
+    total_in_ms, _ = measure_startup(repeat=3, environment={"XDG_CACHE_HOME": str(tmp_path)})
+    assert total_in_ms <= STARTUP_BUDGET_IN_MS
@@ -0,0 +1,188 @@
+import os
+import shutil
+
+import pytest
+
+from cargo_loader.cache import CargoCache, DirectoryCache, LRUCache, cargo_key
+from cargo_loader.cargo import Cargo
+from cargo_loader.histogram import HistogramLoader
+from cargo_loader.loader import CargoLoader, FirstFitDecreasingLoader, FirstFitLoader
+from cargo_loader.optimal import OptimalLoader
+from cargo_loader.trolley import Trolley
+from cargo_loader.vector import VectorFirstFitLoader
+
+class CountingLoader(CargoLoader):
+    is_order_independent = True
+
+    def __init__(self):
+        self.calls = 0
+
+    def load(self, cargo_items):
+        self.calls += 1
+        return len(cargo_items)
+
+def create_cargo_items(*weights):
+    return [Cargo(f"Item{index}", weight, 1.0, 1.0, 1.0) for index, weight in enumerate(weights)]
+
+#
+# Keys
+#
+
+def test_key_should_ignore_names():
+    renamed = [Cargo("Other", 100.0, 1.0, 1.0, 1.0)]
+    assert cargo_key(create_cargo_items(100.0), FirstFitLoader()) == cargo_key(renamed, FirstFitLoader())
+
+def test_key_should_ignore_order_when_loader_is_order_independent():
+    assert cargo_key(create_cargo_items(100.0, 50.0), FirstFitDecreasingLoader()) == cargo_key(create_cargo_items(50.0, 100.0), FirstFitDecreasingLoader())
+
+def test_key_should_depend_on_order_when_loader_is_order_dependent():
+    assert cargo_key(create_cargo_items(100.0, 50.0), FirstFitLoader()) != cargo_key(create_cargo_items(50.0, 100.0), FirstFitLoader())
+
+def test_key_should_depend_on_loader_and_weights():
+    cargo_items = create_cargo_items(100.0, 50.0)
+    assert cargo_key(cargo_items, FirstFitLoader()) != cargo_key(cargo_items, FirstFitDecreasingLoader())
+    assert cargo_key(cargo_items, FirstFitLoader()) != cargo_key(create_cargo_items(100.0, 50.5), FirstFitLoader())
+
+def test_key_should_depend_on_loader_settings():
+    cargo_items = create_cargo_items(100.0, 50.0)
+    assert cargo_key(cargo_items, VectorFirstFitLoader(Trolley(maximum_volume_in_m3=5))) != cargo_key(cargo_items, VectorFirstFitLoader(Trolley(maximum_volume_in_m3=6)))
+
+@pytest.mark.parametrize("loader_type", [HistogramLoader, OptimalLoader])
+def test_key_should_depend_on_loader_capacity(loader_type):
+    cargo_items = create_cargo_items(100.0, 50.0)
+    assert cargo_key(cargo_items, loader_type(None, capacity=1000)) != cargo_key(cargo_items, loader_type(None, capacity=2000))
+
+#
+# LRUCache
+#
+
+def test_lru_cache_should_remove_least_recently_used_entry_when_full():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+#
+# DirectoryCache
+#
+
+def test_directory_cache_should_return_stored_data(tmp_path):
+    cache = DirectoryCache(str(tmp_path))
+    cache.put("key", b"data")
+    assert cache.get("key") == b"data"
+    assert DirectoryCache(str(tmp_path)).get("key") == b"data"
+    assert cache.get("missing") is None
+
+def test_directory_cache_should_remove_oldest_files_when_too_large(tmp_path):
+    cache = DirectoryCache(str(tmp_path), maximum_size_in_bytes=250)
+    for index in range(3):
+        cache.put(f"key{index}", bytes(100))
+        os.utime(tmp_path / f"key{index}", ns=(index * 10**9, index * 10**9))
+
+    assert cache.get("key0") is None
+    assert cache.get("key1") is not None
+    assert cache.get("key2") is not None
+    assert cache.size_in_bytes == 200
+
+def test_directory_cache_should_count_size_once_when_entry_is_written_again(tmp_path):
+    cache = DirectoryCache(str(tmp_path), maximum_size_in_bytes=250)
+    cache.put("key0", bytes(100))
+    for _ in range(3):
+        cache.put("key1", bytes(100))
+
+    assert cache.size_in_bytes == 200
+    assert cache.get("key0") is not None
+
+#
+# CargoCache
+#
+
+def test_cargo_cache_should_load_only_once_when_loading_same_cargo():
+    cache = CargoCache()
+    loader = CountingLoader()
+    assert cache.load(loader, create_cargo_items(100.0, 50.0)) == 2
+    assert cache.load(loader, create_cargo_items(50.0, 100.0)) == 2
+    assert loader.calls == 1
+
+def test_cargo_cache_should_use_directory_when_memory_is_empty(tmp_path):
+    loader = CountingLoader()
+    assert CargoCache(str(tmp_path)).load(loader, create_cargo_items(100.0)) == 1
+    assert CargoCache(str(tmp_path)).load(loader, create_cargo_items(100.0)) == 1
+    assert loader.calls == 1
+
+def test_cargo_cache_should_load_again_when_directory_entry_is_damaged(tmp_path):
+    loader = CountingLoader()
+    cargo_items = create_cargo_items(100.0)
+    assert CargoCache(str(tmp_path)).load(loader, cargo_items) == 1
+    (tmp_path / "results" / cargo_key(cargo_items, loader)).write_bytes(b"not a number")
+
+    assert CargoCache(str(tmp_path)).load(loader, cargo_items) == 1
+    assert CargoCache(str(tmp_path)).load(loader, cargo_items) == 1
+    assert loader.calls == 2
+
+def test_cargo_cache_should_not_cache_results_of_loaders_that_are_not_deterministic():
+    assert not OptimalLoader.is_deterministic
+
+    class NonDeterministicLoader(CountingLoader):
+        is_deterministic = False
+
+    cache = CargoCache()
+    loader = NonDeterministicLoader()
+    cache.load(loader, create_cargo_items(100.0))
+    cache.load(loader, create_cargo_items(100.0))
+    assert loader.calls == 2
+
+def test_cargo_cache_should_not_change_items_when_loader_sorts_items():
+    cargo_items = create_cargo_items(50.0, 100.0)
+    CargoCache().load(FirstFitDecreasingLoader(), cargo_items)
+    assert [cargo.weight_in_kg for cargo in cargo_items] == [50.0, 100.0]
+
+def test_cargo_cache_should_read_file_again_when_file_changes(tmp_path):
+    cargo_file = tmp_path / "cargo.yaml"
+    shutil.copy(os.path.join("tests", "valid_cargo_items_1.yaml"), cargo_file)
+
+    cache = CargoCache(str(tmp_path / "cache"))
+    assert len(cache.read_file(str(cargo_file))) == 2
+    assert [str(cargo) for cargo in CargoCache(str(tmp_path / "cache")).read_file(str(cargo_file))] == [str(cargo) for cargo in Cargo.from_file(str(cargo_file))]
+
+    with open(cargo_file, "a") as f:
+        f.write("Item3:\n  mass: 10\n  volume: [1, 1, 1]\n")
+
+    assert len(cache.read_file(str(cargo_file))) == 3
+
+def test_cargo_cache_should_parse_file_again_when_directory_entry_is_truncated(tmp_path):
+    parsed = []
+
+    def parse_file(cargo_file):
+        parsed.append(cargo_file)
+        return Cargo.from_file(cargo_file)
+
+    cargo_file = os.path.join("tests", "valid_cargo_items_1.csv")
+    assert len(CargoCache(str(tmp_path)).read_file(cargo_file, parse_file)) == 2
+    entry = next((tmp_path / "files").iterdir())
+    entry.write_bytes(entry.read_bytes()[:-3])
+
+    assert len(CargoCache(str(tmp_path)).read_file(cargo_file, parse_file)) == 2
+    assert len(CargoCache(str(tmp_path)).read_file(cargo_file, parse_file)) == 2
+    assert parsed == [cargo_file, cargo_file]
+
+def test_cargo_cache_should_parse_file_with_given_parser_only_once():
+    parsed = []
+
+    def parse_file(cargo_file):
+        parsed.append(cargo_file)
+        return Cargo.from_file(cargo_file)
+
+    cache = CargoCache()
+    cargo_file = os.path.join("tests", "valid_cargo_items_1.csv")
+    assert len(cache.read_file(cargo_file, parse_file)) == len(cache.read_files([cargo_file], parse_file))
+    assert parsed == [cargo_file]
+
+def test_cargo_cache_should_throw_exception_when_file_does_not_exist():
+    with pytest.raises(ValueError):
+        CargoCache().read_file("non_existent_file.yaml")
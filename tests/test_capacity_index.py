@@ -0,0 +1,224 @@
+import pytest
+
+import random
+
+from cargo_loader.capacity_index import AlmostWorstFitIndex, BestFitIndex, FirstFitIndex, SortedEntries, VectorFirstFitIndex, WorstFitIndex
+
+def test_first_fit_index_should_open_first_trolley_for_first_item():
+    index = FirstFitIndex(2000)
+    assert index.place(100) == 0
+    assert index.count == 1
+    assert index.loads() == [100]
+
+def test_first_fit_index_should_place_item_in_left_most_trolley_that_fits():
+    index = FirstFitIndex(2000)
+    index.place(1900)
+    index.place(1800)
+    index.place(1950)
+    assert index.place(150) == 1
+    assert index.place(100) == 0
+    assert index.loads() == [2000, 1950, 1950]
+
+def test_first_fit_index_should_open_new_trolley_when_no_trolley_fits():
+    index = FirstFitIndex(2000)
+    index.place(1900)
+    assert index.place(200) == 1
+    assert index.count == 2
+
+def test_first_fit_index_should_grow_when_more_trolleys_are_needed():
+    index = FirstFitIndex(2000, initial_size=1)
+    for i in range(100):
+        assert index.place(1500) == i
+
+    assert index.count == 100
+    assert index.place(500) == 0
+
+def test_first_fit_index_should_return_smallest_load_of_trolleys_before_index():
+    index = FirstFitIndex(2000, initial_size=1)
+    for weight in [1900, 1500, 1800, 1200, 1950]:
+        index.place(weight)
+
+    assert index.minimum_load(0) == float("inf")
+    assert index.minimum_load(1) == 1900
+    assert index.minimum_load(3) == 1500
+    assert index.minimum_load(5) == 1200
+
+def test_first_fit_index_should_return_minus_one_when_weight_does_not_fit_empty_trolley():
+    index = FirstFitIndex(2000)
+    assert index.find(2500) == -1
+
+def test_first_fit_index_should_throw_exception_when_placing_weight_larger_than_capacity():
+    index = FirstFitIndex(2000)
+    with pytest.raises(ValueError):
+        index.place(2500)
+
+#
+# SortedEntries
+#
+
+def test_sorted_entries_should_keep_entries_sorted_when_adding_and_removing():
+    generator = random.Random(1)
+    values = [generator.randint(0, 10000) for _ in range(5000)]
+    entries = SortedEntries()
+    for value in values:
+        entries.add(value)
+
+    for value in values[::2]:
+        entries.remove(value)
+
+    assert list(entries) == sorted(values[1::2])
+    assert len(entries) == len(values[1::2])
+
+def test_sorted_entries_should_find_neighbouring_entries():
+    entries = SortedEntries()
+    for value in [10, 20, 20, 30]:
+        entries.add(value)
+
+    assert entries.first() == 10
+    assert entries.last() == 30
+    assert entries.first_greater(20) == 30
+    assert entries.first_greater(30) is None
+    assert entries.last_at_most(25) == 20
+    assert entries.last_at_most(5) is None
+    assert entries.last_less(20) == 10
+    assert entries.last_less(10) is None
+
+def test_sorted_entries_should_throw_exception_when_removing_unknown_entry():
+    entries = SortedEntries()
+    entries.add(10)
+    with pytest.raises(ValueError):
+        entries.remove(20)
+
+#
+# BestFitIndex
+#
+
+def test_best_fit_index_should_place_item_in_fullest_trolley_that_fits():
+    index = BestFitIndex(2000)
+    index.place(1800)
+    index.place(1900)
+    index.place(1700)
+    assert index.place(150) == 0
+    assert index.place(100) == 1
+    assert index.loads() == [1950, 2000, 1700]
+
+def test_best_fit_index_should_place_item_in_first_trolley_when_loads_are_equal():
+    index = BestFitIndex(2000)
+    index.place(1900)
+    index.place(1900)
+    assert index.place(100) == 0
+    assert index.place(100) == 1
+
+def test_best_fit_index_should_open_new_trolley_when_no_trolley_fits():
+    index = BestFitIndex(2000)
+    index.place(1900)
+    assert index.place(200) == 1
+    assert index.count == 2
+
+def test_best_fit_index_should_throw_exception_when_placing_weight_larger_than_capacity():
+    index = BestFitIndex(2000)
+    with pytest.raises(ValueError):
+        index.place(2500)
+
+#
+# WorstFitIndex
+#
+
+def test_worst_fit_index_should_place_item_in_emptiest_trolley():
+    index = WorstFitIndex(2000)
+    index.place(1800)
+    index.place(1900)
+    index.place(1700)
+    assert index.place(150) == 2
+    assert index.place(100) == 0
+    assert index.loads() == [1900, 1900, 1850]
+
+def test_worst_fit_index_should_place_item_in_first_trolley_when_loads_are_equal():
+    index = WorstFitIndex(2000)
+    index.place(1900)
+    index.place(1900)
+    assert index.place(100) == 0
+    assert index.place(50) == 1
+
+def test_worst_fit_index_should_open_new_trolley_when_emptiest_trolley_does_not_fit():
+    index = WorstFitIndex(2000)
+    index.place(1900)
+    index.place(1950)
+    assert index.place(200) == 2
+    assert index.count == 3
+
+def test_almost_worst_fit_index_should_place_item_in_second_emptiest_trolley_that_fits():
+    index = AlmostWorstFitIndex(2000)
+    index.place(1800)
+    index.place(1900)
+    index.place(1700)
+    assert index.place(100) == 0
+    assert index.loads() == [1900, 1900, 1700]
+
+    # Only the emptiest trolley fits the item
+    assert index.place(250) == 2
+    assert index.place(500) == 3
+
+def test_worst_fit_index_should_throw_exception_when_placing_weight_larger_than_capacity():
+    for index in (WorstFitIndex(2000), AlmostWorstFitIndex(2000)):
+        with pytest.raises(ValueError):
+            index.place(2500)
+
+#
+# VectorFirstFitIndex
+#
+
+def test_vector_first_fit_index_should_place_item_in_left_most_trolley_that_fits_both_dimensions():
+    index = VectorFirstFitIndex(100, 10)
+    assert index.place(90, 1) == 0
+    assert index.place(10, 9) == 0
+    assert index.place(5, 5) == 1
+
+    # The first trolley has room for the weight but not for the volume
+    assert index.find(0.5, 1) == 1
+
+def test_vector_first_fit_index_should_backtrack_when_smallest_loads_belong_to_different_trolleys():
+    index = VectorFirstFitIndex(100, 10)
+    index.set_load(0, 10, 9)
+    index.set_load(1, 90, 1)
+    index.set_load(2, 50, 5)
+    assert index.find(40, 4) == 2
+
+def test_vector_first_fit_index_should_match_linear_search():
+    generator = random.Random(4)
+    index = VectorFirstFitIndex(100, 10)
+    loads = []
+    for _ in range(2000):
+        weight = generator.uniform(1, 60)
+        volume = generator.uniform(0.1, 6)
+        expected = next((i for i, (w, v) in enumerate(loads) if w + weight <= 100 and v + volume <= 10), len(loads))
+        if expected == len(loads):
+            loads.append((0, 0))
+
+        assert index.place(weight, volume) == expected
+        loads[expected] = (loads[expected][0] + weight, loads[expected][1] + volume)
+
+    assert index.count == len(loads)
+
+def test_vector_first_fit_index_should_match_linear_search_when_both_dimensions_limit_trolleys():
+    # Many small items per trolley give nodes with more steps than the index keeps, so the search has to backtrack
+    generator = random.Random(5)
+    index = VectorFirstFitIndex(100, 10)
+    loads = []
+    for _ in range(5000):
+        weight = generator.uniform(0.1, 10)
+        volume = generator.uniform(0.01, 1)
+        expected = next((i for i, (w, v) in enumerate(loads) if w + weight <= 100 and v + volume <= 10), len(loads))
+        if expected == len(loads):
+            loads.append((0, 0))
+
+        assert index.place(weight, volume) == expected
+        loads[expected] = (loads[expected][0] + weight, loads[expected][1] + volume)
+
+    assert index.loads() == loads
+
+def test_vector_first_fit_index_should_throw_exception_when_placing_item_larger_than_capacity():
+    index = VectorFirstFitIndex(100, 10)
+    assert index.find(50, 11) == -1
+    with pytest.raises(ValueError):
+        index.place(101, 1)
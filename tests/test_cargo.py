@@ -1,7 +1,9 @@
 import os
+import types
+
 import pytest
 
-from cargo_loader.cargo import Cargo
+from cargo_loader.cargo import Cargo, CargoValidationError
 
 def test_should_create_valid_cargo_item_when_suppling_values():
     item = Cargo("Item", 100, 0.5, 1, 2)
@@ -59,6 +61,43 @@ def test_should_throw_exception_when_creating_item_with_too_much_volume():
     with pytest.raises(ValueError):
         Cargo("Item", 100, 10, 10, 10)
 
+def test_should_not_create_attribute_dictionary_when_creating_item():
+    item = Cargo("Item", 100, 0.5, 1, 2)
+    assert not hasattr(item, "__dict__")
+
+def test_should_return_no_errors_when_validating_valid_columns():
+    assert Cargo.validate_many(["Item1", "Item2"], [100, 200], [0.5, 1], [1, 1], [2, 2]) == []
+
+def test_should_return_all_errors_when_validating_invalid_columns():
+    errors = Cargo.validate_many(
+        ["Item1", "", "Item3", "Item4", "Item5", "Item6"],
+        [100, 100, 0, 300, 100, 100],
+        [0.5, 0.5, 0.5, 0.5, -1, 10],
+        [1, 1, 1, 1, 1, 10],
+        [2, 2, 2, 2, 2, 10])
+    assert errors == [
+        "Row 1: Name of cargo item cannot be empty.",
+        "Row 2: Weight of cargo item Item3 must be greater than 0. The specified weight is 0kg.",
+        "Row 3: Weight of cargo item Item4 exceeds the maximum weight of 200kg. The specified weight is 300kg.",
+        "Row 4: Dimensions of cargo item Item5 must be greater than 0. The specified dimensions are -1m x 1m x 2m.",
+        "Row 5: Volume of cargo item Item6 exceeds the maximum volume of 2.0m3. The specified volume is 1000m3.",
+    ]
+
+def test_should_throw_exception_when_validating_columns_with_different_lengths():
+    with pytest.raises(ValueError):
+        Cargo.validate_many(["Item1", "Item2"], [100], [0.5, 1], [1, 1], [2, 2])
+
+def test_should_create_valid_items_when_creating_from_columns():
+    cargo_items = Cargo.from_columns(["Item1", "Item2"], [100, 200], [0.5, 1], [1, 1], [2, 2])
+    assert [str(cargo) for cargo in cargo_items] == ["Item1,100,0.5,1,2", "Item2,200,1,1,2"]
+
+def test_should_throw_exception_with_all_errors_when_creating_invalid_items_from_columns():
+    with pytest.raises(CargoValidationError) as error:
+        Cargo.from_columns(["Item1", "Item2", "Item3"], [300, 100, -1], [0.5, 1, 1], [1, 1, 1], [2, 2, 2])
+
+    assert len(error.value.errors) == 2
+    assert isinstance(error.value, ValueError)
+
 def test_should_create_string_when_translating_item_to_string():
     cargo = Cargo("Item", 100, 0.5, 1, 2)
     assert str(cargo) == "Item,100,0.5,1,2"
@@ -119,3 +158,79 @@ def test_should_create_valid_items_when_creating_from_multiple_yaml_files():
     assert cargo_items[2].length_in_m == 2.0
     assert cargo_items[2].width_in_m == 1.0
     assert cargo_items[2].height_in_m == 0.5
+
+def assert_valid_cargo_items_1(cargo_items):
+    assert len(cargo_items) == 2
+
+    assert cargo_items[0].name == "10223"
+    assert cargo_items[0].weight_in_kg == 200.0
+    assert cargo_items[0].length_in_m == 0.5
+    assert cargo_items[0].width_in_m == 1.0
+    assert cargo_items[0].height_in_m == 2.0
+
+    assert cargo_items[1].name == "10224"
+    assert cargo_items[1].weight_in_kg == 10.0
+    assert cargo_items[1].length_in_m == 4.0
+    assert cargo_items[1].width_in_m == 1.0
+    assert cargo_items[1].height_in_m == 0.5
+
+def test_should_create_generator_when_iterating_over_yaml_file():
+    cargo_file = os.path.join("tests", "valid_cargo_items_1.yaml")
+    cargo_items = Cargo.iter_file(cargo_file)
+    assert isinstance(cargo_items, types.GeneratorType)
+    assert_valid_cargo_items_1(list(cargo_items))
+
+def test_should_create_same_items_when_iterating_over_yaml_file_as_when_loading_yaml_document():
+    import yaml
+    cargo_file = os.path.join("samples", "example_cargo_large.yaml")
+    with open(cargo_file) as f:
+        data = yaml.load(f, Loader=yaml.SafeLoader)
+
+    expected = [str(Cargo(str(name), info["mass"], *info["volume"])) for name, info in data.items()]
+    assert [str(cargo) for cargo in Cargo.iter_file(cargo_file)] == expected
+
+def test_should_resolve_aliases_when_iterating_over_yaml_file(tmp_path):
+    import yaml
+    cargo_file = tmp_path / "cargo.yaml"
+    cargo_file.write_text(
+        "Item1:\n  mass: 10\n  volume: &dimensions [0.5, 1, 2]\n"
+        "Item2: &item\n  mass: 20\n  volume: *dimensions\n"
+        "Item3:\n  <<: *item\n  mass: 30\n"
+        "Item4: *item\n")
+    data = yaml.load(cargo_file.read_text(), Loader=yaml.SafeLoader)
+
+    expected = [str(Cargo(str(name), info["mass"], *info["volume"])) for name, info in data.items()]
+    assert [str(cargo) for cargo in Cargo.iter_file(str(cargo_file))] == expected
+
+def test_should_throw_exception_when_yaml_file_contains_same_name_twice(tmp_path):
+    cargo_file = tmp_path / "cargo.yaml"
+    cargo_file.write_text("Item1:\n  mass: 10\n  volume: [1, 1, 1]\nItem1:\n  mass: 20\n  volume: [1, 1, 1]\n")
+    with pytest.raises(ValueError, match="more than one cargo item with the name Item1"):
+        Cargo.from_file(str(cargo_file))
+
+def test_should_create_valid_item_when_reading_from_csv_file():
+    cargo_file = os.path.join("tests", "valid_cargo_items_1.csv")
+    assert_valid_cargo_items_1(Cargo.from_file(cargo_file))
+
+def test_should_create_valid_item_when_reading_from_ndjson_file():
+    cargo_file = os.path.join("tests", "valid_cargo_items_1.ndjson")
+    assert_valid_cargo_items_1(Cargo.from_file(cargo_file))
+
+def test_should_throw_exception_when_reading_csv_file_with_missing_columns(tmp_path):
+    cargo_file = tmp_path / "cargo.csv"
+    cargo_file.write_text("name,mass\n10223,200.0\n")
+    with pytest.raises(ValueError):
+        Cargo.from_file(str(cargo_file))
+
+def test_should_throw_exception_when_iterating_over_non_existing_file():
+    cargo_file = os.path.join("tests", "non_existing_cargo_items.yaml")
+    with pytest.raises(ValueError):
+        Cargo.iter_file(cargo_file)
+
+def test_should_create_valid_items_when_iterating_over_files_with_different_formats():
+    cargo_files = [
+        os.path.join("tests", "valid_cargo_items_1.csv"),
+        os.path.join("tests", "valid_cargo_items_2.yaml"),
+    ]
+    cargo_items = list(Cargo.iter_files(cargo_files))
+    assert [cargo.name for cargo in cargo_items] == ["10223", "10224", "10225"]
@@ -0,0 +1,104 @@
+import pytest
+
+from cargo_loader.cargo import Cargo, CargoValidationError
+from cargo_loader.chunked import read_columns_in_parallel, read_file_in_parallel, split_records
+
+def write_csv_file(tmp_path, rows, name="cargo.csv"):
+    path = tmp_path / name
+    path.write_bytes(("name,mass,length,width,height\n" + "".join(f"{row}\n" for row in rows)).encode("utf-8"))
+    return str(path)
+
+def write_ndjson_file(tmp_path, records, name="cargo.ndjson"):
+    path = tmp_path / name
+    path.write_bytes("".join(f"{record}\n" for record in records).encode("utf-8"))
+    return str(path)
+
+def test_split_records_should_end_chunks_after_line_breaks():
+    data = b"aaaa\nbb\ncccccc\nd"
+    ranges = split_records(data, 0, 3)
+    assert ranges == [(0, 5), (5, 8), (8, 15), (15, 16)]
+    assert b"".join(data[start:end] for start, end in ranges) == data
+    assert split_records(data, 5, 100) == [(5, 16)]
+
+def test_chunked_parsing_should_return_same_items_as_reading_file(tmp_path):
+    cargo_file = write_csv_file(tmp_path, [f"Item{i},{i % 200 + 0.5},0.5,1,{i % 3 + 1}" for i in range(500)])
+    expected = [str(cargo) for cargo in Cargo.from_file(cargo_file)]
+    for chunk_size in (1, 64, 1000, 1 << 20):
+        assert [str(cargo) for cargo in read_file_in_parallel(cargo_file, jobs=1, chunk_size=chunk_size)] == expected
+
+    assert [str(cargo) for cargo in read_file_in_parallel(cargo_file, jobs=2, chunk_size=1000)] == expected
+
+def test_chunked_parsing_should_read_ndjson_files(tmp_path):
+    cargo_file = write_ndjson_file(tmp_path, [f'{{"name": "Item{i}", "mass": {i + 1}.5, "volume": [1, 0.5, 1]}}' for i in range(100)] + [""])
+    names, weights, lengths, widths, heights = read_columns_in_parallel(cargo_file, jobs=1, chunk_size=200)
+    assert names == [f"Item{i}" for i in range(100)]
+    assert list(weights) == [i + 1.5 for i in range(100)]
+
+    # The values are stored as floats, also when they are integers in the file
+    def values(cargo_items):
+        return [(cargo.name, cargo.weight_in_kg, cargo.length_in_m, cargo.width_in_m, cargo.height_in_m) for cargo in cargo_items]
+
+    assert values(read_file_in_parallel(cargo_file, jobs=1, chunk_size=200)) == values(Cargo.from_file(cargo_file))
+
+def test_chunked_parsing_should_report_all_invalid_items_with_line_numbers(tmp_path):
+    rows = [f"Item{i},100,1,1,1" for i in range(50)]
+    rows[9] = "Item9,300,1,1,1"
+    rows[20] = "Item20,abc,1,1,1"
+    rows[33] = "Item33,100"
+    rows[47] = "Item47,100,2,2,2"
+    cargo_file = write_csv_file(tmp_path, rows)
+    for chunk_size in (1, 100, 1 << 20):
+        with pytest.raises(CargoValidationError) as error:
+            read_file_in_parallel(cargo_file, jobs=1, chunk_size=chunk_size)
+
+        # The header is on the first line, so row i is on line i + 2
+        assert [message.split(":")[0] for message in error.value.errors] == ["Line 11", "Line 22", "Line 35", "Line 49"]
+        assert "exceeds the maximum weight" in error.value.errors[0]
+
+def test_chunked_parsing_should_report_invalid_json_with_line_numbers(tmp_path):
+    records = ['{"name": "Item1", "mass": 10, "volume": [1, 1, 1]}', "", "{not json", '{"name": "Item3", "volume": [1, 1, 1]}']
+    cargo_file = write_ndjson_file(tmp_path, records)
+    with pytest.raises(CargoValidationError) as error:
+        read_file_in_parallel(cargo_file, jobs=1, chunk_size=10)
+
+    assert [message.split(":")[0] for message in error.value.errors] == ["Line 3", "Line 4"]
+
+def test_chunked_parsing_should_reject_same_values_as_reading_file(tmp_path):
+    records = [
+        '{"name": "Item1", "mass": 10, "volume": [1, 1, 1]}',
+        '{"name": "Item2", "mass": "10", "volume": [1, 1, 1]}',
+        '{"name": "Item3", "mass": 10, "volume": [1, "0.5", 1]}',
+        '{"name": "Item4", "mass": true, "volume": [1, 1, 1]}',
+        '{"name": "Item5", "mass": null, "volume": [1, 1, 1]}',
+    ]
+    for record in records[1:]:
+        cargo_file = write_ndjson_file(tmp_path, [records[0], record])
+        with pytest.raises(ValueError, match="must be numbers"):
+            Cargo.from_file(cargo_file)
+
+        for chunk_size in (1, 1 << 20):
+            with pytest.raises(CargoValidationError) as error:
+                read_file_in_parallel(cargo_file, jobs=1, chunk_size=chunk_size)
+
+            assert len(error.value.errors) == 1 and error.value.errors[0].startswith("Line 2:")
+            assert "must be numbers" in error.value.errors[0]
+
+def test_chunked_parsing_should_reject_records_with_line_breaks(tmp_path):
+    cargo_file = write_csv_file(tmp_path, ["Item1,100,1,1,1", '"Item\n2",100,1,1,1', "Item3,100,1,1,1"])
+    for chunk_size in (1, 1 << 20):
+        with pytest.raises(CargoValidationError) as error:
+            read_file_in_parallel(cargo_file, jobs=1, chunk_size=chunk_size)
+
+        assert error.value.errors[0].startswith("Line 3: The record contains a line break")
+
+def test_chunked_parsing_should_throw_exception_when_columns_are_missing(tmp_path):
+    path = tmp_path / "cargo.csv"
+    path.write_text("name,mass\nItem1,100\n")
+    with pytest.raises(ValueError) as error:
+        read_file_in_parallel(str(path), jobs=1)
+
+    assert "missing the columns length, width, height" in str(error.value)
+
+def test_chunked_parsing_should_read_other_formats_with_from_file():
+    cargo_file = "tests/valid_cargo_items_1.yaml"
+    assert [str(cargo) for cargo in read_file_in_parallel(cargo_file, jobs=2)] == [str(cargo) for cargo in Cargo.from_file(cargo_file)]
@@ -0,0 +1,102 @@
+from array import array
+
+import pytest
+
+pytest.importorskip("hypothesis")
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from bench.differential import (
+    REFERENCES, check_assignments, check_instance, reference_almost_worst_fit, reference_best_fit, reference_first_fit,
+    reference_first_fit_decreasing, reference_next_fit, reference_worst_fit, run_stress)
+from cargo_loader.assignments import LoadAssignments
+from cargo_loader.registry import loader_names
+
+# Weights with one decimal, whose sums are rounded, and weights in steps of 1/8 kg, whose sums are exact
+decimal_weights = st.lists(st.integers(1, 2000).map(lambda tenths: tenths / 10), min_size=1, max_size=60)
+exact_weights = st.lists(st.integers(1, 1600).map(lambda eighths: eighths / 8), min_size=1, max_size=60)
+
+# The optimal loader is checked separately with a short time limit
+heuristic_engines = [engine for engine in loader_names() if engine != "optimal"]
+
+#
+# Reference implementations
+#
+
+def test_reference_next_fit_should_only_use_last_trolley():
+    assert list(reference_next_fit([1500, 1000, 500, 1000], 2000)) == [0, 1, 1, 2]
+
+def test_reference_first_fit_should_use_first_trolley_that_fits():
+    assert list(reference_first_fit([1500, 1000, 500, 1000], 2000)) == [0, 1, 0, 1]
+
+def test_reference_first_fit_decreasing_should_keep_trolley_of_each_item_in_input_order():
+    assert list(reference_first_fit_decreasing([500, 1500, 1000, 1000], 2000)) == [0, 0, 1, 1]
+
+def test_reference_best_fit_should_use_fullest_trolley_that_fits():
+    assert list(reference_best_fit([1000, 1500, 400], 2000)) == [0, 1, 1]
+
+def test_reference_worst_fit_should_use_emptiest_trolley():
+    assert list(reference_worst_fit([1000, 1500, 400], 2000)) == [0, 1, 0]
+
+def test_reference_almost_worst_fit_should_use_second_emptiest_trolley():
+    assert list(reference_almost_worst_fit([1000, 1500, 400], 2000)) == [0, 1, 1]
+
+def test_check_assignments_should_report_overloaded_trolley():
+    assignments = LoadAssignments(array("I", [0, 0]), array("d", [2100]))
+    failures = check_assignments([1500, 600], 1, assignments, 2000)
+    assert any("exceeds the capacity" in failure for failure in failures)
+
+def test_check_assignments_should_report_trolley_count_below_lower_bound():
+    assignments = LoadAssignments(array("I", [0, 0, 0]), array("d", [3000]))
+    failures = check_assignments([1000, 1000, 1000], 1, assignments, 2000)
+    assert any("lower bound" in failure for failure in failures)
+
+#
+# Differential tests
+#
+
+@settings(max_examples=50, deadline=None)
+@given(decimal_weights)
+def test_loaders_should_match_references_and_invariants(weights):
+    assert check_instance(weights, heuristic_engines) == []
+
+@settings(max_examples=50, deadline=None)
+@given(exact_weights)
+def test_loaders_should_match_references_when_sums_are_exact(weights):
+    assert check_instance(weights, heuristic_engines) == []
+
+@settings(max_examples=10, deadline=None)
+@given(st.lists(st.integers(1, 2000).map(lambda tenths: tenths / 10), min_size=1, max_size=12))
+def test_optimal_loader_should_satisfy_invariants(weights):
+    assert check_instance(weights, ["optimal"], {"time_limit": 0.5}) == []
+
+def test_check_instance_should_report_assignments_that_differ_from_reference(monkeypatch):
+    monkeypatch.setitem(REFERENCES, "worst_fit", reference_best_fit)
+    failures = check_instance([1000, 1500, 400], ["worst_fit"])
+    assert failures == ["worst_fit: Item 2 was assigned to a different trolley than by reference_best_fit."]
+
+def test_every_reference_should_belong_to_registered_loader():
+    assert set(REFERENCES) <= set(loader_names())
+
+#
+# Stress runner
+#
+
+def test_stress_runner_should_compare_engines_without_references_above_reference_limit():
+    results = run_stress([200, 2000], ["uniform"], ["indexed_first_fit_decreasing", "first_fit_decreasing", "histogram"], reference_limit=500)
+    assert [(result["engine"], result["size"]) for result in results] == [
+        ("indexed_first_fit_decreasing", 200), ("first_fit_decreasing", 200), ("histogram", 200),
+        ("indexed_first_fit_decreasing", 2000), ("first_fit_decreasing", 2000), ("histogram", 2000),
+    ]
+    assert all(result["failures"] == [] and result["trolleys"] >= result["lower_bound"] for result in results)
+
+def test_stress_runner_should_skip_larger_sizes_when_engine_exceeds_time_budget():
+    results = run_stress([100, 1000], ["uniform"], ["first_fit"], time_budget_in_seconds=0.0)
+    assert [result["size"] for result in results] == [100]
+
+def test_stress_runner_should_only_run_scanning_engines_up_to_scanning_limit():
+    results = run_stress([200, 2000], ["uniform"], ["first_fit_decreasing", "indexed_first_fit_decreasing"], scanning_limit=500)
+    assert [(result["engine"], result["size"]) for result in results] == [
+        ("first_fit_decreasing", 200), ("indexed_first_fit_decreasing", 200), ("indexed_first_fit_decreasing", 2000),
+    ]
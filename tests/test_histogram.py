@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from cargo_loader.cargo import Cargo
+from cargo_loader.histogram import HistogramLoader
+from cargo_loader.loader import FirstFitDecreasingLoader
+
+def create_duplicated_cargo_items(seed, count, weights):
+    generator = random.Random(seed)
+    return [Cargo(f"Item{i}", generator.choice(weights), 1, 1, 1) for i in range(count)]
+
+def check_assignments(cargo_items, assignments, capacity=2000):
+    loads = [0.0] * assignments.trolley_count
+    for cargo, index in zip(cargo_items, assignments.trolley_of_item):
+        loads[index] += cargo.weight_in_kg
+
+    assert loads == pytest.approx(list(assignments.trolley_loads))
+    assert max(loads) <= capacity + 1e-9
+
+def test_histogram_should_use_same_number_of_trolleys_as_first_fit_decreasing():
+    for seed in range(10):
+        cargo_items = create_duplicated_cargo_items(seed, 2000, [0.1, 0.3, 7.5, 12.25, 33.3, 99.9, 150, 199.9])
+        assert HistogramLoader().load(cargo_items) == FirstFitDecreasingLoader().load(list(cargo_items))
+
+def test_histogram_should_give_same_assignments_as_first_fit_decreasing_when_sums_are_exact():
+    cargo_items = create_duplicated_cargo_items(1, 500, [1.5, 40, 75.5, 120, 180])
+    expected = FirstFitDecreasingLoader().load_assignments(cargo_items)
+    assignments = HistogramLoader().load_assignments(cargo_items)
+    assert list(assignments.trolley_of_item) == list(expected.trolley_of_item)
+    check_assignments(cargo_items, assignments)
+
+def test_histogram_should_use_exact_weights_when_float_sums_are_rounded():
+    # The float 0.1 is slightly more than 0.1, so 20000 of them don't fit into a trolley, but their rounded float sum
+    # does
+    cargo_items = [Cargo(f"Item{i}", 0.1, 1, 1, 1) for i in range(20000)]
+    assert HistogramLoader().load(cargo_items) == 2
+    assert FirstFitDecreasingLoader().load(list(cargo_items)) == 1
+
+def test_histogram_should_give_same_assignments_as_first_fit_decreasing_when_weights_are_distinct():
+    # Every item is its own class, so the runs are split and searched for every class. Multiples of 1/8 are added up
+    # exactly as floating point numbers
+    generator = random.Random(4)
+    cargo_items = [Cargo(f"Item{i}", weight / 8, 1, 1, 1) for i, weight in enumerate(generator.sample(range(1, 1601), 1600))]
+    expected = FirstFitDecreasingLoader().load_assignments(cargo_items)
+    assignments = HistogramLoader().load_assignments(cargo_items)
+    assert list(assignments.trolley_of_item) == list(expected.trolley_of_item)
+    check_assignments(cargo_items, assignments)
+
+def test_histogram_should_fill_trolleys_with_closed_form_counts():
+    # 10 million items of a single weight are loaded without looking at the items one at a time
+    loader = HistogramLoader()
+    assert loader._count({7.0: 10_000_000}) == -(-10_000_000 // (2000 // 7))
+    assert loader._count({150.0: 3, 50.0: 3}) == 1
+
+def test_histogram_should_not_overload_trolleys_when_weights_are_rounded():
+    cargo_items = create_duplicated_cargo_items(2, 1000, [0.11, 0.49, 9.99, 10.01, 66.6, 133.3, 199.99])
+    for resolution in (0.1, 0.5, 1, 25):
+        loader = HistogramLoader(resolution)
+        assignments = loader.load_assignments(cargo_items)
+        check_assignments(cargo_items, assignments)
+        assert assignments.trolley_count == loader.load(cargo_items)
+        assert assignments.trolley_count >= FirstFitDecreasingLoader().load(list(cargo_items))
+
+def test_histogram_should_return_zero_trolleys_when_there_are_no_items():
+    assert HistogramLoader().load([]) == 0
+    assert HistogramLoader().load_assignments([]).trolley_count == 0
+
+def test_histogram_should_give_same_result_for_batch():
+    np = pytest.importorskip("numpy")
+    from cargo_loader.batch import CargoBatch
+
+    cargo_items = create_duplicated_cargo_items(3, 1000, [0.2, 5, 17.5, 64, 128.25])
+    batch = CargoBatch(
+        [cargo.name for cargo in cargo_items],
+        np.array([cargo.weight_in_kg for cargo in cargo_items]),
+        np.ones(len(cargo_items)),
+        np.ones(len(cargo_items)),
+        np.ones(len(cargo_items)))
+
+    for loader in (HistogramLoader(), HistogramLoader(0.5)):
+        assert loader.load_batch(batch) == loader.load(cargo_items)
+
+def test_histogram_should_throw_exception_when_resolution_is_not_positive():
+    with pytest.raises(ValueError):
+        HistogramLoader(0)
+
+    with pytest.raises(ValueError):
+        HistogramLoader(-0.5)
+
+def test_histogram_should_throw_exception_when_item_exceeds_capacity():
+    with pytest.raises(ValueError):
+        HistogramLoader(capacity=100).load([Cargo("Item1", 150, 1, 1, 1)])
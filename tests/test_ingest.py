@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+
+from cargo_loader.cargo import Cargo
+from cargo_loader.ingest import iter_cargo_concurrently, iter_files_concurrently, read_files_concurrently
+
+def write_cargo_files(tmp_path, count):
+    cargo_files = []
+    for index in range(count):
+        path = tmp_path / f"cargo_{index}.csv"
+        path.write_text("name,mass,length,width,height\n" + "".join(f"Item{index}_{i},{index + i + 1},1,1,1\n" for i in range(10)))
+        cargo_files.append(str(path))
+
+    return cargo_files
+
+def test_ingest_should_return_items_in_order_of_files(tmp_path):
+    cargo_files = write_cargo_files(tmp_path, 20)
+    expected = [str(cargo) for cargo in Cargo.from_files(cargo_files)]
+    assert [str(cargo) for cargo in read_files_concurrently(cargo_files, concurrency=4)] == expected
+    assert [cargo_file for cargo_file, _ in iter_files_concurrently(cargo_files, concurrency=3, maximum_queued_files=0)] == cargo_files
+
+def test_ingest_should_throw_same_exception_as_reading_files_one_by_one(tmp_path):
+    cargo_files = write_cargo_files(tmp_path, 5)
+    cargo_files.insert(2, str(tmp_path / "missing.yaml"))
+    with pytest.raises(ValueError) as expected:
+        Cargo.from_files(cargo_files)
+
+    cargo_items = iter_cargo_concurrently(cargo_files, concurrency=4)
+    with pytest.raises(ValueError) as error:
+        list(cargo_items)
+
+    assert str(error.value) == str(expected.value)
+
+def test_ingest_should_not_read_more_files_at_the_same_time_than_concurrency():
+    lock = threading.Lock()
+    active = [0]
+    maximum_active = [0]
+
+    def read_file(cargo_file):
+        with lock:
+            active[0] += 1
+            maximum_active[0] = max(maximum_active[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        return [Cargo(cargo_file, 1, 1, 1, 1)]
+
+    cargo_items = read_files_concurrently([f"Item{i}" for i in range(30)], concurrency=3, read_file=read_file)
+    assert [cargo.name for cargo in cargo_items] == [f"Item{i}" for i in range(30)]
+    assert 1 < maximum_active[0] <= 3
+
+def test_ingest_should_stop_reading_when_queue_is_full():
+    started = []
+
+    def read_file(cargo_file):
+        started.append(cargo_file)
+        return [Cargo(cargo_file, 1, 1, 1, 1)]
+
+    files = iter_files_concurrently([f"Item{i}" for i in range(20)], concurrency=2, maximum_queued_files=1, read_file=read_file)
+    assert next(files)[0] == "Item0"
+
+    # Two files are being read and one is queued, and one more file is started when the first file is taken
+    time.sleep(0.1)
+    assert len(started) == 4
+    files.close()
+
+def test_ingest_should_throw_exception_when_concurrency_is_less_than_one():
+    with pytest.raises(ValueError):
+        list(iter_files_concurrently(["cargo.yaml"], concurrency=0))
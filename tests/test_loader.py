@@ -1,7 +1,22 @@
 import os
+import random
 
 from cargo_loader.cargo import Cargo
-from cargo_loader.loader import FirstFitDecreasingLoader, FirstFitLoader
+from cargo_loader.loader import (
+    AlmostWorstFitLoader,
+    BestFitDecreasingLoader,
+    BestFitLoader,
+    FirstFitDecreasingLoader,
+    FirstFitLoader,
+    IndexedFirstFitDecreasingLoader,
+    IndexedFirstFitLoader,
+    WorstFitLoader,
+)
+from cargo_loader.trolley import TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG
+
+def create_random_cargo_items(seed: int, count: int):
+    generator = random.Random(seed)
+    return [Cargo(f"Item{i}", round(generator.uniform(0.1, 200), 1), 0.5, 1, 2) for i in range(count)]
 
 #
 # FirstFitLoader
@@ -117,3 +132,186 @@ def test_first_fit_decreasing_loader_should_load_multiple_items_into_multiple_tr
     ]
     loader = FirstFitDecreasingLoader()
     assert loader.load(cargo_items) == 2
+
+#
+# IndexedFirstFitLoader
+#
+
+def test_indexed_first_fit_loader_should_load_single_item_into_single_trolley():
+    cargo_items = [Cargo("Item", 100, 0.5, 1, 2)]
+    loader = IndexedFirstFitLoader()
+    assert loader.load(cargo_items) == 1
+
+def test_indexed_first_fit_loader_should_load_multiple_items_into_two_trolleys():
+    cargo_items = [Cargo("Item1", 100, 0.5, 1, 2) for _ in range(21)]
+    loader = IndexedFirstFitLoader()
+    assert loader.load(cargo_items) == 2
+
+def test_indexed_first_fit_loader_should_fill_earlier_trolleys_when_items_fit():
+    # A next-fit loader needs 3 trolleys for these items because the last item doesn't fit into the second
+    # trolley. First-fit puts the last item in the first trolley.
+    cargo_items = [
+        Cargo("Item1", 150, 0.5, 1, 2),
+        *[Cargo("Item2", 200, 0.5, 1, 2) for _ in range(9)],
+        *[Cargo("Item3", 200, 0.5, 1, 2) for _ in range(10)],
+        Cargo("Item4", 50, 0.5, 1, 2),
+    ]
+    assert FirstFitLoader().load(cargo_items) == 3
+    assert IndexedFirstFitLoader().load(cargo_items) == 2
+
+#
+# IndexedFirstFitDecreasingLoader
+#
+
+def test_indexed_first_fit_decreasing_loader_should_load_single_item_into_single_trolley():
+    cargo_items = [Cargo("Item", 100, 0.5, 1, 2)]
+    loader = IndexedFirstFitDecreasingLoader()
+    assert loader.load(cargo_items) == 1
+
+def test_indexed_first_fit_decreasing_loader_should_load_multiple_items_into_two_trolleys():
+    cargo_items = [Cargo("Item1", 100, 0.5, 1, 2) for _ in range(21)]
+    loader = IndexedFirstFitDecreasingLoader()
+    assert loader.load(cargo_items) == 2
+
+def test_indexed_first_fit_decreasing_loader_should_not_change_order_of_items():
+    cargo_items = [Cargo("Item1", 10, 0.5, 1, 2), Cargo("Item2", 100, 0.5, 1, 2)]
+    loader = IndexedFirstFitDecreasingLoader()
+    loader.load(cargo_items)
+    assert [cargo.name for cargo in cargo_items] == ["Item1", "Item2"]
+
+def test_indexed_first_fit_decreasing_loader_should_match_first_fit_decreasing_loader():
+    for seed in range(5):
+        cargo_items = create_random_cargo_items(seed, 2000)
+        assert IndexedFirstFitDecreasingLoader().load(list(cargo_items)) == FirstFitDecreasingLoader().load(list(cargo_items))
+
+#
+# BestFitLoader
+#
+
+def test_best_fit_loader_should_load_single_item_into_single_trolley():
+    cargo_items = [Cargo("Item", 100, 0.5, 1, 2)]
+    loader = BestFitLoader()
+    assert loader.load(cargo_items) == 1
+
+def test_best_fit_loader_should_load_multiple_items_into_two_trolleys():
+    cargo_items = [Cargo("Item1", 100, 0.5, 1, 2) for _ in range(21)]
+    loader = BestFitLoader()
+    assert loader.load(cargo_items) == 2
+
+def test_best_fit_loader_should_load_item_into_fullest_trolley_that_fits():
+    # First-fit puts the 50kg item into the first trolley and then has no room left for the last 190kg item. Best-fit
+    # puts the 50kg item into the second, fuller, trolley which leaves room for the 190kg item in the first trolley.
+    cargo_items = [
+        *[Cargo("Item1", 190, 0.5, 1, 2) for _ in range(9)],
+        Cargo("Item2", 100, 0.5, 1, 2),
+        *[Cargo("Item3", 195, 0.5, 1, 2) for _ in range(10)],
+        Cargo("Item4", 50, 0.5, 1, 2),
+        Cargo("Item5", 190, 0.5, 1, 2),
+    ]
+    assert IndexedFirstFitLoader().load(cargo_items) == 3
+    assert BestFitLoader().load(cargo_items) == 2
+
+#
+# BestFitDecreasingLoader
+#
+
+def test_best_fit_decreasing_loader_should_load_multiple_items_into_two_trolleys():
+    cargo_items = [Cargo("Item1", 100, 0.5, 1, 2) for _ in range(21)]
+    assert BestFitDecreasingLoader().load(cargo_items) == 2
+
+def test_best_fit_decreasing_loader_should_not_change_order_of_items():
+    cargo_items = [Cargo("Item1", 10, 0.5, 1, 2), Cargo("Item2", 100, 0.5, 1, 2)]
+    BestFitDecreasingLoader().load(cargo_items)
+    assert [cargo.name for cargo in cargo_items] == ["Item1", "Item2"]
+
+def test_best_fit_decreasing_loader_should_match_best_fit_loader_on_sorted_items():
+    for seed in range(5):
+        cargo_items = create_random_cargo_items(seed, 2000)
+        sorted_items = sorted(cargo_items, key=lambda x: x.weight_in_kg, reverse=True)
+        assert BestFitDecreasingLoader().load(cargo_items) == BestFitLoader().load(sorted_items)
+
+#
+# WorstFitLoader and AlmostWorstFitLoader
+#
+
+def create_two_trolleys_of_cargo():
+    # The first trolley is loaded with 1900kg and the second trolley with 950kg, followed by an item that fits both
+    return [Cargo(f"Item{i}", 190, 0.5, 1, 2) for i in range(15)] + [Cargo("Item15", 100, 0.5, 1, 2)]
+
+def test_worst_fit_loader_should_load_item_into_emptiest_trolley():
+    assignments = WorstFitLoader().load_assignments(create_two_trolleys_of_cargo())
+    assert list(assignments.trolley_loads) == [1900, 1050]
+
+def test_almost_worst_fit_loader_should_load_item_into_second_emptiest_trolley():
+    assignments = AlmostWorstFitLoader().load_assignments(create_two_trolleys_of_cargo())
+    assert list(assignments.trolley_loads) == [2000, 950]
+
+def test_almost_worst_fit_loader_should_load_item_into_emptiest_trolley_when_it_is_the_only_one_that_fits():
+    cargo_items = create_two_trolleys_of_cargo()
+    cargo_items[-1] = Cargo("Item15", 150, 0.5, 1, 2)
+    assignments = AlmostWorstFitLoader().load_assignments(cargo_items)
+    assert list(assignments.trolley_loads) == [1900, 1100]
+
+def test_worst_fit_loaders_should_not_use_more_trolleys_than_next_fit():
+    for seed in range(5):
+        cargo_items = create_random_cargo_items(seed, 2000)
+        for loader_type in (WorstFitLoader, AlmostWorstFitLoader):
+            assert loader_type().load(cargo_items) <= FirstFitLoader().load(cargo_items)
+
+#
+# Streaming
+#
+
+def test_streaming_loaders_should_load_items_from_generator():
+    cargo_items = create_random_cargo_items(1, 1000)
+    for loader_type in (FirstFitLoader, IndexedFirstFitLoader, BestFitLoader, WorstFitLoader, AlmostWorstFitLoader):
+        loader = loader_type()
+        assert loader.supports_streaming
+        assert loader.load(cargo for cargo in cargo_items) == loader.load(cargo_items)
+
+def test_streaming_loaders_should_load_items_from_file():
+    cargo_file = os.path.join("samples", "example_cargo_large.yaml")
+    for loader_type in (FirstFitLoader, IndexedFirstFitLoader, BestFitLoader, WorstFitLoader, AlmostWorstFitLoader):
+        loader = loader_type()
+        assert loader.load(Cargo.iter_file(cargo_file)) == loader.load(Cargo.from_file(cargo_file))
+
+#
+# Assignments
+#
+
+def check_assignments(cargo_items, assignments):
+    loads = [0.0] * assignments.trolley_count
+    for cargo, trolley in zip(cargo_items, assignments.trolley_of_item):
+        loads[trolley] += cargo.weight_in_kg
+
+    assert len(assignments) == len(cargo_items)
+    assert all(abs(load - expected) < 1e-9 for load, expected in zip(assignments.trolley_loads, loads))
+    assert all(load <= TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG for load in assignments.trolley_loads)
+
+def test_loaders_should_return_same_number_of_trolleys_when_loading_assignments():
+    for seed in range(5):
+        cargo_items = create_random_cargo_items(seed, 500)
+        for loader_type in (
+                FirstFitLoader, FirstFitDecreasingLoader, IndexedFirstFitLoader, IndexedFirstFitDecreasingLoader, BestFitLoader,
+                BestFitDecreasingLoader, WorstFitLoader, AlmostWorstFitLoader):
+            loader = loader_type()
+            assignments = loader.load_assignments(cargo_items)
+            assert assignments.trolley_count == loader.load(list(cargo_items))
+            check_assignments(cargo_items, assignments)
+
+def test_first_fit_decreasing_loader_should_not_change_order_of_items_when_loading_assignments():
+    cargo_items = [Cargo("Item1", 10, 0.5, 1, 2), Cargo("Item2", 20, 0.5, 1, 2)]
+    FirstFitDecreasingLoader().load_assignments(cargo_items)
+    assert [cargo.name for cargo in cargo_items] == ["Item1", "Item2"]
+
+def test_first_fit_loader_should_assign_items_in_order_when_loading_assignments():
+    cargo_items = [Cargo(f"Item{i}", 190, 0.5, 1, 2) for i in range(12)]
+    assignments = FirstFitLoader().load_assignments(cargo_items)
+    assert list(assignments.trolley_of_item) == [0] * 10 + [1] * 2
+    assert list(assignments.trolley_loads) == [1900, 380]
+
+def test_streaming_loaders_should_load_assignments_from_generator():
+    cargo_items = create_random_cargo_items(1, 1000)
+    for loader_type in (FirstFitLoader, IndexedFirstFitLoader, BestFitLoader, WorstFitLoader, AlmostWorstFitLoader):
+        loader = loader_type()
+        assert loader.load_assignments(cargo for cargo in cargo_items).trolley_of_item == loader.load_assignments(cargo_items).trolley_of_item
@@ -0,0 +1,81 @@
+import os
+import sys
+
+import main
+from cargo_loader.loader import FirstFitDecreasingLoader, FirstFitLoader
+from cargo_loader.registry import portfolio_loader_names
+
+def run_main(monkeypatch, tmp_path, *args):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(sys, "argv", ["main.py", *args])
+    main.main()
+
+def record_loaded_items(monkeypatch, loader_type):
+    loaded = []
+    load = loader_type.load
+
+    def record(self, cargo_items):
+        loaded.append(cargo_items)
+        return load(self, cargo_items)
+
+    monkeypatch.setattr(loader_type, "load", record)
+    return loaded
+
+def test_main_should_stream_items_when_loader_supports_streaming(monkeypatch, tmp_path, capsys):
+    loaded = record_loaded_items(monkeypatch, FirstFitLoader)
+    run_main(monkeypatch, tmp_path, "--file", os.path.join("tests", "valid_cargo_items_1.csv"))
+
+    assert len(loaded) == 1
+    assert not isinstance(loaded[0], list)
+    output = capsys.readouterr().out
+    assert "Loading the items of 1 file into trolleys using FirstFitLoader ..." in output
+    assert "Loaded 2 items into" in output
+    assert not (tmp_path / "cargo_loader").exists()
+
+def test_main_should_only_use_portfolio_loaders_when_no_algorithms_are_given(monkeypatch, tmp_path, capsys):
+    run_main(monkeypatch, tmp_path, "--file", os.path.join("tests", "valid_cargo_items_1.csv"), "--portfolio", "--jobs", "1")
+    output = capsys.readouterr().out
+    assert f"using {len(portfolio_loader_names())} algorithms" in output
+    assert "VectorFirstFitLoader" not in output and "OptimalLoader" not in output
+
+def test_main_should_use_given_algorithms_in_portfolio(monkeypatch, tmp_path, capsys):
+    run_main(monkeypatch, tmp_path, "--file", os.path.join("tests", "valid_cargo_items_1.csv"), "--portfolio", "first_fit", "optimal", "--time-limit", "1", "--jobs", "1")
+    output = capsys.readouterr().out
+    assert "using 2 algorithms" in output
+    assert "OptimalLoader: 1 trolley" in output
+
+def test_main_should_use_cache_directory_when_loader_does_not_support_streaming(monkeypatch, tmp_path, capsys):
+    loaded = record_loaded_items(monkeypatch, FirstFitDecreasingLoader)
+    cache_directory = str(tmp_path / "cache")
+    run_main(monkeypatch, tmp_path, "--file", os.path.join("tests", "valid_cargo_items_1.csv"), "--algorithm", "first_fit_decreasing", "--cache-dir", cache_directory)
+    run_main(monkeypatch, tmp_path, "--file", os.path.join("tests", "valid_cargo_items_1.csv"), "--algorithm", "first_fit_decreasing", "--cache-dir", cache_directory)
+
+    assert len(loaded) == 1
+    assert any((tmp_path / "cache" / "files").iterdir())
+
+def test_main_should_not_write_cache_to_disk_without_cache_directory(monkeypatch, tmp_path, capsys):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    run_main(monkeypatch, tmp_path, "--file", os.path.join("tests", "valid_cargo_items_1.csv"), "--algorithm", "first_fit_decreasing")
+
+    assert "Loaded 2 items into" in capsys.readouterr().out
+    assert list(tmp_path.iterdir()) == []
+
+def test_main_should_read_files_lazily_when_loader_supports_streaming(monkeypatch, tmp_path, capsys):
+    first_file = tmp_path / "first.csv"
+    second_file = tmp_path / "second.csv"
+    first_file.write_text("name,mass,length,width,height\nItem1,100,1,1,1\n")
+    load = FirstFitLoader.load
+
+    # The second file is only written once the first item has been loaded, so reading it before that would fail
+    def load_and_write_second_file(self, cargo_items):
+        def items():
+            for index, cargo in enumerate(cargo_items):
+                yield cargo
+                if index == 0:
+                    second_file.write_text("name,mass,length,width,height\nItem2,50,1,1,1\nItem3,50,1,1,1\n")
+        return load(self, items())
+
+    monkeypatch.setattr(FirstFitLoader, "load", load_and_write_second_file)
+    run_main(monkeypatch, tmp_path, "--file", str(first_file), "--file", str(second_file))
+
+    assert "Loaded 3 items into" in capsys.readouterr().out
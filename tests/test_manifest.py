@@ -0,0 +1,136 @@
+import pytest
+
+from cargo_loader.cargo import Cargo
+from cargo_loader.loader import FirstFitDecreasingLoader, FirstFitLoader
+from cargo_loader.manifest import convert_file, is_manifest_file, open_manifest, write_manifest
+
+def create_cargo_items():
+    return [
+        Cargo("Item1", 100, 0.5, 1, 2),
+        Cargo("Item2", 0.1, 0.3, 0.2, 0.1),
+        Cargo("Ünïcode", 1e-5, 1, 1, 1),
+        Cargo("Item1", 199.9, 1, 1, 1.5),
+    ]
+
+def as_tuples(cargo_items):
+    return [(cargo.name, cargo.weight_in_kg, cargo.length_in_m, cargo.width_in_m, cargo.height_in_m) for cargo in cargo_items]
+
+#
+# Binary manifest
+#
+
+def test_manifest_should_return_same_items_when_reading_written_items(tmp_path):
+    path = str(tmp_path / "cargo.bin")
+    assert write_manifest(create_cargo_items(), path) == 4
+    assert is_manifest_file(path)
+    assert as_tuples(Cargo.from_file(path)) == as_tuples(create_cargo_items())
+
+def test_manifest_should_store_each_name_once(tmp_path):
+    path = str(tmp_path / "cargo.bin")
+    write_manifest(create_cargo_items(), path)
+    with open_manifest(path) as manifest:
+        assert len(manifest) == 4
+        assert manifest.name_count == 3
+        assert manifest.names.tolist() == ["Item1", "Item2", "Ünïcode", "Item1"]
+
+def test_manifest_should_round_values_when_using_single_precision(tmp_path):
+    path = str(tmp_path / "cargo.bin")
+    write_manifest(create_cargo_items(), path, float_size=4)
+    with open_manifest(path) as manifest:
+        weights = list(manifest.columns()[0])
+
+    assert weights[0] == 100
+    assert weights[1] == pytest.approx(0.1) and weights[1] != 0.1
+
+def test_manifest_should_be_detected_when_file_has_other_extension(tmp_path):
+    path = str(tmp_path / "cargo.yaml")
+    write_manifest(create_cargo_items(), path)
+    assert as_tuples(Cargo.from_file(path)) == as_tuples(create_cargo_items())
+
+def test_manifest_should_return_no_items_when_writing_no_items(tmp_path):
+    path = str(tmp_path / "cargo.bin")
+    write_manifest([], path)
+    assert Cargo.from_file(path) == []
+
+def test_manifest_should_throw_exception_when_using_unknown_float_size(tmp_path):
+    with pytest.raises(ValueError):
+        write_manifest(create_cargo_items(), str(tmp_path / "cargo.bin"), float_size=2)
+
+def test_manifest_should_throw_exception_when_file_is_truncated(tmp_path):
+    path = tmp_path / "cargo.bin"
+    write_manifest(create_cargo_items(), str(path))
+    path.write_bytes(path.read_bytes()[:-10])
+    with pytest.raises(ValueError):
+        open_manifest(str(path))
+
+def test_manifest_should_throw_exception_when_file_is_not_a_manifest():
+    with pytest.raises(ValueError):
+        open_manifest("tests/valid_cargo_items_1.yaml")
+
+def test_manifest_should_throw_exception_when_reading_invalid_items(tmp_path):
+    path = str(tmp_path / "cargo.bin")
+    write_manifest([Cargo._create_unchecked("Item1", 300, 1, 1, 1)], path)
+    with pytest.raises(ValueError):
+        Cargo.from_file(path)
+
+#
+# Batches
+#
+
+def test_manifest_batch_should_give_same_result_as_items(tmp_path):
+    pytest.importorskip("numpy")
+    path = str(tmp_path / "cargo.bin")
+    cargo_items = [Cargo(f"Item{i}", (i * 37) % 200 + 0.5, 0.5, 1, 2) for i in range(1000)]
+    write_manifest(cargo_items, path)
+    with open_manifest(path) as manifest:
+        batch = manifest.to_batch()
+
+    # The columns are views of the memory mapped file instead of copies
+    assert not batch.weights_in_kg.flags.owndata
+    assert batch.validation_errors() == []
+    assert batch.names[999] == "Item999"
+    for loader in (FirstFitLoader(), FirstFitDecreasingLoader()):
+        assert loader.load_batch(batch) == loader.load(list(cargo_items))
+
+def test_manifest_batch_should_report_invalid_names(tmp_path):
+    pytest.importorskip("numpy")
+    path = str(tmp_path / "cargo.bin")
+    names = ["Item1", "", " ", "　", "Ünïcode", " Item2 ", ""]
+    write_manifest([Cargo._create_unchecked(name, 10, 1, 1, 1) for name in names], path)
+    with open_manifest(path) as manifest:
+        errors = manifest.to_batch().validation_errors()
+
+    assert [error.split(":")[0] for error in errors] == ["Row 1", "Row 2", "Row 3", "Row 6"]
+
+#
+# Conversion
+#
+
+@pytest.mark.parametrize("extension", [".csv", ".ndjson", ".yaml"])
+def test_convert_should_return_same_items_when_converting_back_and_forth(tmp_path, extension):
+    # The names are the keys of a YAML file, so they have to be unique
+    cargo_items = create_cargo_items()[:3]
+    binary_path = str(tmp_path / "cargo.bin")
+    text_path = str(tmp_path / f"cargo{extension}")
+    write_manifest(cargo_items, binary_path)
+
+    assert convert_file(binary_path, text_path) == 3
+    assert as_tuples(Cargo.from_file(text_path)) == as_tuples(cargo_items)
+
+    assert convert_file(text_path, str(tmp_path / "converted.bin")) == 3
+    assert as_tuples(Cargo.from_file(str(tmp_path / "converted.bin"))) == as_tuples(cargo_items)
+
+@pytest.mark.parametrize("extension", [".csv", ".ndjson"])
+def test_convert_should_keep_items_with_same_name(tmp_path, extension):
+    binary_path = str(tmp_path / "cargo.bin")
+    text_path = str(tmp_path / f"cargo{extension}")
+    write_manifest(create_cargo_items(), binary_path)
+
+    assert convert_file(binary_path, text_path) == 4
+    assert as_tuples(Cargo.from_file(text_path)) == as_tuples(create_cargo_items())
+
+def test_convert_should_throw_exception_when_yaml_file_would_contain_same_name_twice(tmp_path):
+    binary_path = str(tmp_path / "cargo.bin")
+    write_manifest(create_cargo_items(), binary_path)
+    with pytest.raises(ValueError, match="more than one cargo item with the name Item1"):
+        convert_file(binary_path, str(tmp_path / "cargo.yaml"))
@@ -0,0 +1,109 @@
+import itertools
+import random
+
+from cargo_loader.capacity_index import FirstFitIndex
+from cargo_loader.cargo import Cargo
+from cargo_loader.loader import FirstFitDecreasingLoader
+from cargo_loader.optimal import OptimalLoader, l1_lower_bound, l2_lower_bound
+
+def create_cargo_items(weights):
+    return [Cargo(f"Item{i}", weight, 0.5, 1, 2) for i, weight in enumerate(weights)]
+
+def optimal_trolley_count(weights, capacity):
+    # Try every possible assignment of items to trolleys. Only usable for a handful of items.
+    best = len(weights)
+    for assignment in itertools.product(range(len(weights)), repeat=len(weights)):
+        loads = [0] * len(weights)
+        for weight, trolley in zip(weights, assignment):
+            loads[trolley] += weight
+
+        if max(loads) <= capacity:
+            best = min(best, len(set(assignment)))
+
+    return best
+
+#
+# Lower bounds
+#
+
+def test_l1_lower_bound_should_round_total_weight_up():
+    assert l1_lower_bound([1000, 1000, 1], 2000) == 2
+    assert l1_lower_bound([1000, 1000], 2000) == 1
+    assert l1_lower_bound([], 2000) == 0
+
+def test_l2_lower_bound_should_count_items_heavier_than_half_the_capacity():
+    # Three items of 6 can't share a trolley, so L2 is 3 even though the total weight fits in 2 trolleys
+    assert l1_lower_bound([6, 6, 6], 10) == 2
+    assert l2_lower_bound([6, 6, 6], 10) == 3
+
+def test_l2_lower_bound_should_never_be_smaller_than_l1_lower_bound():
+    generator = random.Random(1)
+    for _ in range(100):
+        weights = [generator.randint(1, 100) for _ in range(generator.randint(1, 30))]
+        assert l2_lower_bound(weights, 100) >= l1_lower_bound(weights, 100)
+
+#
+# OptimalLoader
+#
+
+def test_optimal_loader_should_load_single_item_into_single_trolley():
+    cargo_items = create_cargo_items([100])
+    assert OptimalLoader().load(cargo_items) == 1
+
+def test_optimal_loader_should_load_no_items_into_no_trolleys():
+    result = OptimalLoader().solve([])
+    assert result.trolley_count == 0
+    assert result.is_optimal
+
+def test_optimal_loader_should_report_solution_of_first_fit_decreasing_when_it_meets_lower_bound():
+    cargo_items = create_cargo_items([100] * 21)
+    result = OptimalLoader().solve(cargo_items)
+    assert result.trolley_count == 2
+    assert result.lower_bound == 2
+    assert result.gap == 0
+    assert result.is_optimal
+    assert result.algorithm == "first_fit_decreasing"
+
+def test_optimal_loader_should_use_fewer_trolleys_than_first_fit_decreasing():
+    # Use a small trolley so that the problem is small enough to check
+    weights = [19, 7, 10, 5, 7, 6, 4]
+    index = FirstFitIndex(20)
+    for weight in sorted(weights, reverse=True):
+        index.place(weight)
+
+    assert index.count == 4
+
+    loader = OptimalLoader(capacity=20)
+    assert loader.load(create_cargo_items(weights)) == 3
+
+def test_optimal_loader_should_find_optimal_solution_for_small_problems():
+    generator = random.Random(5)
+    for _ in range(50):
+        capacity = generator.choice([10, 20, 30])
+        weights = [generator.randint(1, capacity) for _ in range(generator.randint(1, 6))]
+        result = OptimalLoader(capacity=capacity).solve(create_cargo_items(weights))
+        assert result.trolley_count == optimal_trolley_count(weights, capacity)
+        assert result.is_optimal
+
+def test_optimal_loader_should_stop_when_time_limit_is_reached():
+    generator = random.Random(3)
+    cargo_items = create_cargo_items([generator.choice([181.0, 171.0, 141.0, 111.0, 97.0, 67.0]) for _ in range(2530)])
+    result = OptimalLoader(time_limit_in_seconds=0.1).solve(cargo_items)
+    assert result.trolley_count <= FirstFitDecreasingLoader().load(list(cargo_items))
+    assert result.trolley_count >= result.lower_bound
+
+def test_optimal_loader_should_return_valid_assignments_for_small_problems():
+    generator = random.Random(7)
+    for _ in range(200):
+        capacity = generator.choice([10, 20, 30])
+        weights = [generator.randint(1, capacity) for _ in range(generator.randint(0, 12))]
+        result = OptimalLoader(capacity=capacity).solve(create_cargo_items(weights), with_assignments=True)
+        assignments = result.assignments
+
+        loads = [0] * result.trolley_count
+        for weight, trolley in zip(weights, assignments.trolley_of_item):
+            loads[trolley] += weight
+
+        assert len(assignments) == len(weights)
+        assert list(assignments.trolley_loads) == loads
+        assert all(0 < load <= capacity for load in loads)
@@ -0,0 +1,44 @@
+import os
+import pickle
+
+import pytest
+
+from cargo_loader.cargo import Cargo
+from cargo_loader.loader import FirstFitDecreasingLoader, FirstFitLoader
+from cargo_loader.parallel import deserialize_cargo, load_files_in_parallel, load_portfolio, serialize_cargo
+
+def test_should_create_same_items_when_deserializing_serialized_items():
+    cargo_items = [Cargo("Item1", 100.0, 0.5, 1.0, 2.0), Cargo("Itém2", 12.5, 1.0, 1.0, 1.0)]
+    restored = deserialize_cargo(serialize_cargo(cargo_items))
+    assert [str(cargo) for cargo in restored] == [str(cargo) for cargo in cargo_items]
+
+def test_should_create_no_items_when_deserializing_serialized_empty_list():
+    assert deserialize_cargo(serialize_cargo([])) == []
+
+@pytest.mark.parametrize("length", [0, 10, -1])
+def test_should_throw_exception_when_deserializing_truncated_data(length):
+    data = serialize_cargo([Cargo("Item1", 100, 1, 1, 1)])
+    with pytest.raises(ValueError):
+        deserialize_cargo(data[:length])
+
+def test_should_create_smaller_data_when_serializing_than_when_pickling():
+    cargo_items = [Cargo(f"Item{i}", 100.0, 0.5, 1.0, 2.0) for i in range(1000)]
+    assert len(serialize_cargo(cargo_items)) < len(pickle.dumps(cargo_items))
+
+def test_should_return_result_per_file_when_loading_files_in_parallel():
+    cargo_files = [
+        os.path.join("tests", "valid_cargo_items_1.yaml"),
+        os.path.join("tests", "valid_cargo_items_2.yaml"),
+        os.path.join("samples", "example_cargo_large.yaml"),
+    ]
+    results = load_files_in_parallel(cargo_files, FirstFitLoader(), jobs=2)
+    assert [result.source for result in results] == cargo_files
+    assert [result.item_count for result in results] == [2, 1, 30]
+    assert [result.trolley_count for result in results] == [1, 1, 3]
+
+def test_should_return_best_result_first_when_loading_with_portfolio():
+    cargo_items = Cargo.from_file(os.path.join("samples", "example_cargo_large.yaml"))
+    results = load_portfolio(cargo_items, [FirstFitLoader(), FirstFitDecreasingLoader()], jobs=2)
+    assert [result.loader_name for result in results] == ["FirstFitDecreasingLoader", "FirstFitLoader"]
+    assert [result.trolley_count for result in results] == [2, 3]
+    assert results[0].item_count == 30
@@ -0,0 +1,94 @@
+import json
+import pstats
+
+import pytest
+
+from cargo_loader.cargo import Cargo
+from cargo_loader.loader import FirstFitDecreasingLoader, FirstFitLoader, IndexedFirstFitDecreasingLoader
+from cargo_loader.profiling import TROLLEYS_SCANNED, active_profile, phase, profile
+
+def create_cargo_items():
+    # The light items are loaded after the heavy items, so they have to scan past the trolleys that are full
+    return [Cargo(f"Item{i}", weight, 1, 1, 1) for i, weight in enumerate([150] * 30 + [50] * 30)]
+
+def test_profile_should_record_phases_of_loader():
+    with profile() as run:
+        with phase("load"):
+            count = FirstFitDecreasingLoader().load(create_cargo_items())
+        run.record_result(60, count)
+
+    report = run.report()
+    assert [phase["name"] for phase in report["phases"]] == ["load/sort", "load/scan", "load"]
+    assert report["items"] == 60
+    assert report["trolleys"] == count
+    assert report["items_per_second"] > 0
+    json.dumps(report)
+
+def test_profile_should_count_one_scanned_trolley_per_item_when_using_next_fit():
+    with profile() as run:
+        run.record_result(60, FirstFitLoader().load(create_cargo_items()))
+
+    assert run.counters[TROLLEYS_SCANNED] == 60
+    assert run.report()["trolleys_scanned_per_item"] == 1
+
+def test_profile_should_count_scanned_trolleys_when_using_first_fit_decreasing():
+    cargo_items = create_cargo_items()
+    with profile() as run:
+        FirstFitDecreasingLoader().load(list(cargo_items))
+
+    # Scan the trolleys the same way as the loader, but count every trolley that is looked at
+    trolleys = []
+    expected = 0
+    for cargo in sorted(cargo_items, key=lambda x: x.weight_in_kg, reverse=True):
+        for index, load in enumerate(trolleys):
+            expected += 1
+            if load + cargo.weight_in_kg <= 2000:
+                trolleys[index] += cargo.weight_in_kg
+                break
+        else:
+            trolleys.append(cargo.weight_in_kg)
+
+    assert run.counters[TROLLEYS_SCANNED] == expected
+
+def test_profile_should_report_that_scanned_trolleys_are_not_counted_when_using_index():
+    with profile() as run:
+        run.record_result(60, IndexedFirstFitDecreasingLoader().load(create_cargo_items()))
+
+    report = run.report()
+    assert TROLLEYS_SCANNED not in run.counters
+    assert report["trolleys_scanned_per_item"] is None
+    assert "aren't counted" in report["notes"][0]
+
+def test_profile_should_call_hooks_when_phase_ends():
+    phases = []
+    with profile(hooks=[lambda name, seconds: phases.append(name)]):
+        IndexedFirstFitDecreasingLoader().load(create_cargo_items())
+
+    assert phases == ["sort", "place"]
+
+def test_profile_should_record_peak_memory_and_write_statistics(tmp_path):
+    stats_file = str(tmp_path / "run.stats")
+    with profile(measure_memory=True, stats_file=stats_file) as run:
+        FirstFitDecreasingLoader().load(create_cargo_items())
+
+    assert run.peak_memory_in_bytes > 0
+    assert pstats.Stats(stats_file).total_calls > 0
+
+def test_profile_should_not_record_anything_when_not_active():
+    assert active_profile() is None
+    with phase("load"):
+        FirstFitDecreasingLoader().load(create_cargo_items())
+
+    with profile() as run:
+        pass
+
+    assert run.phases == {}
+    assert run.counters == {}
+
+def test_profile_should_throw_exception_when_profile_is_already_active():
+    with profile():
+        with pytest.raises(ValueError):
+            with profile():
+                pass
+
+    assert active_profile() is None
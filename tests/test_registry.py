@@ -0,0 +1,53 @@
+import pytest
+
+from cargo_loader.cargo import Cargo
+from cargo_loader.histogram import HistogramLoader
+from cargo_loader.loader import CargoLoader, FirstFitLoader, WorstFitLoader
+from cargo_loader.optimal import OptimalLoader
+from cargo_loader.registry import DEFAULT_LOADER, create_loader, loader_names, loader_registration, portfolio_loader_names, register_loader
+from cargo_loader.vector import VectorFirstFitLoader
+
+def test_registry_should_create_every_registered_loader():
+    cargo_items = [Cargo("Item1", 100, 0.5, 1, 2), Cargo("Item2", 50, 1, 1, 1)]
+    for name in loader_names():
+        loader = create_loader(name, {"time_limit": 1.0})
+        assert isinstance(loader, CargoLoader)
+        assert loader.load(list(cargo_items)) == 1
+
+def test_registry_should_pass_options_to_loader():
+    assert create_loader("optimal", {"time_limit": 2.5}).time_limit_in_seconds == 2.5
+    assert create_loader("vector_first_fit", {"trolley_volume": 4.0}).trolley.maximum_volume_in_m3 == 4.0
+    assert create_loader("histogram", {"weight_resolution": 0.5}).resolution == 0.5
+    assert isinstance(create_loader("optimal", {}), OptimalLoader)
+    assert isinstance(create_loader("vector_first_fit", {}), VectorFirstFitLoader)
+    assert isinstance(create_loader("histogram", {}), HistogramLoader)
+
+def test_registry_should_throw_exception_when_trolley_volume_is_not_positive():
+    for volume in [0, 0.0, -1.0]:
+        with pytest.raises(ValueError, match="trolley volume"):
+            create_loader("vector_first_fit", {"trolley_volume": volume})
+
+def test_registry_should_list_loaders_in_order_they_were_registered():
+    names = loader_names()
+    assert names[0] == DEFAULT_LOADER
+    assert names.index("best_fit") < names.index("best_fit_decreasing") < names.index("worst_fit") < names.index("almost_worst_fit")
+    assert isinstance(create_loader(DEFAULT_LOADER, {}), FirstFitLoader)
+
+def test_registry_should_only_use_weight_loaders_without_time_limit_in_portfolio():
+    names = portfolio_loader_names()
+    assert names == [name for name in loader_names() if name != "optimal" and not name.startswith("vector_")]
+    assert "histogram" in names
+
+def test_registry_should_create_loader_that_is_registered_later():
+    register_loader("test_worst_fit", "cargo_loader.loader", "WorstFitLoader")
+    try:
+        assert "test_worst_fit" in loader_names()
+        assert isinstance(create_loader("test_worst_fit", {}), WorstFitLoader)
+        assert loader_registration("test_worst_fit").loader_type() is WorstFitLoader
+    finally:
+        from cargo_loader import registry
+        del registry._registrations["test_worst_fit"]
+
+def test_registry_should_throw_exception_when_algorithm_is_unknown():
+    with pytest.raises(ValueError):
+        create_loader("unknown_fit", {})
@@ -0,0 +1,137 @@
+import http.client
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from cargo_loader.loader import BestFitLoader, CargoLoader, FirstFitDecreasingLoader, FirstFitLoader
+from cargo_loader.server import PackingServer
+
+class FailingLoader(CargoLoader):
+    def load(self, cargo_items):
+        raise RuntimeError("The loader failed.")
+
+class MisconfiguredLoader(CargoLoader):
+    def __init__(self):
+        raise ValueError("The setting is invalid.")
+
+    def load(self, cargo_items):
+        return 0
+
+LOADERS = {
+    "first_fit": FirstFitLoader,
+    "first_fit_decreasing": FirstFitDecreasingLoader,
+    "best_fit": BestFitLoader,
+    "failing": FailingLoader,
+    "misconfigured": MisconfiguredLoader,
+}
+
+def create_loader(algorithm, time_limit):
+    return LOADERS[algorithm]()
+
+@pytest.fixture
+def server():
+    server = PackingServer(("127.0.0.1", 0), create_loader, list(LOADERS), jobs=1, maximum_pending_requests=1, verbose=False)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+def request(server, path, body=None):
+    host, port = server.server_address[:2]
+    data = None if body is None else (body if isinstance(body, bytes) else json.dumps(body).encode("utf-8"))
+    try:
+        with urllib.request.urlopen(urllib.request.Request(f"http://{host}:{port}{path}", data=data), timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def cargo(name, mass):
+    return {"name": name, "mass": mass, "volume": [1, 1, 1]}
+
+def test_server_should_report_health(server):
+    assert request(server, "/health") == (200, {"status": "ok"})
+
+def test_server_should_list_algorithms(server):
+    assert request(server, "/algorithms") == (200, {"algorithms": list(LOADERS)})
+
+def test_server_should_load_each_manifest_when_loading_batch(server):
+    status, body = request(server, "/load", {
+        "algorithm": "first_fit_decreasing",
+        "manifests": [
+            {"name": "flight1", "cargo": [cargo("Item1", 100), cargo("Item2", 100), cargo("Item3", 50)]},
+            {"name": "flight2", "algorithm": "first_fit", "cargo": [cargo(f"Item{i}", 190) for i in range(4, 16)]},
+        ],
+    })
+    assert status == 200
+    assert body == {"results": [
+        {"name": "flight1", "loader": "FirstFitDecreasingLoader", "item_count": 3, "trolley_count": 1},
+        {"name": "flight2", "loader": "FirstFitLoader", "item_count": 12, "trolley_count": 2},
+    ]}
+
+def test_server_should_return_bad_request_when_using_unknown_algorithm(server):
+    status, body = request(server, "/load", {"algorithm": "unknown", "manifests": [{"cargo": [cargo("Item1", 100)]}]})
+    assert status == 400
+    assert "Unknown algorithm unknown" in body["error"]
+
+def test_server_should_return_bad_request_when_cargo_is_invalid(server):
+    status, body = request(server, "/load", {"manifests": [{"name": "flight1", "cargo": [cargo("Item1", 300)]}]})
+    assert status == 400
+    assert body["error"].startswith("Manifest flight1: Invalid cargo item")
+
+@pytest.mark.parametrize("time_limit", [-1, "10", None, True])
+def test_server_should_return_bad_request_when_time_limit_is_invalid(server, time_limit):
+    status, body = request(server, "/load", {"time_limit": time_limit, "manifests": [{"name": "flight1", "cargo": [cargo("Item1", 100)]}]})
+    assert status == 400
+    assert body["error"].startswith("Manifest flight1: The time limit should be")
+
+def test_server_should_return_bad_request_when_time_limit_is_not_a_number(server):
+    status, _ = request(server, "/load", b'{"time_limit": NaN, "manifests": [{"cargo": []}]}')
+    assert status == 400
+
+def test_server_should_return_bad_request_when_loader_can_not_be_created(server):
+    status, body = request(server, "/load", {"algorithm": "misconfigured", "manifests": [{"name": "flight1", "cargo": [cargo("Item1", 100)]}]})
+    assert status == 400
+    assert "The setting is invalid." in body["error"]
+
+def test_server_should_return_internal_server_error_when_loader_fails(server):
+    status, body = request(server, "/load", {"algorithm": "failing", "manifests": [{"cargo": [cargo("Item1", 100)]}]})
+    assert status == 500
+    assert "The loader failed." in body["error"]
+    assert request(server, "/load", {"manifests": [{"cargo": [cargo("Item1", 100)]}]})[0] == 200
+
+@pytest.mark.parametrize("content_length", ["-1", "ten"])
+def test_server_should_return_bad_request_when_content_length_is_invalid(server, content_length):
+    connection = http.client.HTTPConnection(*server.server_address[:2], timeout=30)
+    try:
+        connection.putrequest("POST", "/load")
+        connection.putheader("Content-Length", content_length)
+        connection.endheaders()
+        response = connection.getresponse()
+        assert response.status == 400
+        assert "Content-Length" in json.loads(response.read())["error"]
+    finally:
+        connection.close()
+
+def test_server_should_return_bad_request_when_request_is_not_json(server):
+    status, _ = request(server, "/load", b"not json")
+    assert status == 400
+
+def test_server_should_return_not_found_when_using_unknown_path(server):
+    status, _ = request(server, "/unknown")
+    assert status == 404
+
+def test_server_should_return_service_unavailable_when_too_many_requests_are_pending(server):
+    # Take the only request slot, as if another request is being loaded
+    server._pending_requests.acquire()
+    try:
+        status, body = request(server, "/load", {"manifests": [{"cargo": [cargo("Item1", 100)]}]})
+    finally:
+        server._pending_requests.release()
+
+    assert status == 503
+    assert request(server, "/load", {"manifests": [{"cargo": [cargo("Item1", 100)]}]})[0] == 200
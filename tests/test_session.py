@@ -0,0 +1,120 @@
+import random
+
+import pytest
+
+from cargo_loader.cargo import Cargo
+from cargo_loader.loader import FirstFitDecreasingLoader
+from cargo_loader.session import PackingSession
+from cargo_loader.trolley import TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG
+
+def create_cargo(name, weight):
+    return Cargo(name, weight, 1.0, 1.0, 1.0)
+
+def check_trolleys(session):
+    for contents in session.trolleys():
+        assert sum(cargo.weight_in_kg for cargo in contents) <= TROLLEY_MAXIMUM_CARGO_WEIGHT_IN_KG
+    assert len(session.trolleys()) == session.count()
+
+def test_session_should_have_no_trolleys_when_empty():
+    session = PackingSession()
+    assert session.count() == 0
+    assert len(session) == 0
+
+def test_session_should_use_same_number_of_trolleys_as_first_fit_decreasing_when_created_with_items():
+    cargo_items = [create_cargo(f"Item{i}", random.Random(i).uniform(1, 200)) for i in range(500)]
+    session = PackingSession(cargo_items)
+    assert session.count() == FirstFitDecreasingLoader().load(list(cargo_items))
+    assert len(session) == 500
+    check_trolleys(session)
+
+def test_session_should_open_new_trolley_when_item_does_not_fit():
+    session = PackingSession()
+    for i in range(10):
+        assert session.add(create_cargo(f"Item{i}", 200)) == 0
+    assert session.add(create_cargo("Item10", 1)) == 1
+    assert session.count() == 2
+
+def test_session_should_close_trolley_when_last_item_is_removed():
+    session = PackingSession()
+    session.add(create_cargo("Item1", 200))
+    assert session.remove("Item1").name == "Item1"
+    assert session.count() == 0
+    assert "Item1" not in session
+
+def test_session_should_reuse_empty_trolley_before_opening_new_trolley():
+    session = PackingSession(maximum_repair_moves=0)
+    for i in range(20):
+        session.add(create_cargo(f"Item{i}", 200))
+    for i in range(10):
+        session.remove(f"Item{i}")
+
+    assert session.count() == 1
+    assert session.add(create_cargo("Item20", 150)) == 0
+    assert session.count() == 2
+
+def create_session_with_gap(medium_weight):
+    # The first trolley is loaded with 1900kg and the second with 150kg plus the medium item. Only trolleys with at
+    # most two items are repaired, so the first trolley is never emptied.
+    session = PackingSession(maximum_repair_moves=2)
+    for i in range(10):
+        session.add(create_cargo(f"Heavy{i}", 190))
+    session.add(create_cargo("Big", 150))
+    session.add(create_cargo("Small", 80))
+    session.add(create_cargo("Medium", medium_weight))
+    assert session.trolley_of("Small") == 0
+    assert session.trolley_of("Medium") == 1
+    return session
+
+def test_session_should_empty_trolley_when_repairing_after_removal():
+    session = create_session_with_gap(30)
+    session.remove("Small")
+    session.remove("Big")
+    assert session.count() == 1
+    assert session.trolley_of("Medium") == 0
+    check_trolleys(session)
+
+def test_session_should_keep_trolley_when_repair_is_not_possible():
+    session = create_session_with_gap(120)
+    session.remove("Small")
+    session.remove("Big")
+    assert session.count() == 2
+    assert session.trolley_of("Medium") == 1
+    check_trolleys(session)
+
+def test_session_should_throw_exception_when_adding_item_with_same_name():
+    session = PackingSession([create_cargo("Item1", 10)])
+    with pytest.raises(ValueError):
+        session.add(create_cargo("Item1", 20))
+
+def test_session_should_throw_exception_when_removing_unknown_item():
+    with pytest.raises(ValueError):
+        PackingSession().remove("Item1")
+
+def test_session_should_use_same_number_of_trolleys_as_first_fit_decreasing_when_repacking():
+    generator = random.Random(1)
+    session = PackingSession()
+    for i in range(1000):
+        session.add(create_cargo(f"Item{i}", generator.uniform(1, 200)))
+    for i in generator.sample(range(1000), 500):
+        session.remove(f"Item{i}")
+
+    remaining = [cargo for contents in session.trolleys() for cargo in contents]
+    assert session.repack() == FirstFitDecreasingLoader().load(remaining)
+    check_trolleys(session)
+
+def test_session_should_keep_all_items_when_adding_and_removing_randomly():
+    generator = random.Random(2)
+    session = PackingSession()
+    names = set()
+    for i in range(2000):
+        if names and generator.random() < 0.4:
+            name = generator.choice(sorted(names))
+            names.remove(name)
+            session.remove(name)
+        else:
+            names.add(f"Item{i}")
+            session.add(create_cargo(f"Item{i}", generator.uniform(1, 200)))
+
+    assert {cargo.name for contents in session.trolleys() for cargo in contents} == names
+    assert len(session) == len(names)
+    check_trolleys(session)
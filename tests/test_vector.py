@@ -0,0 +1,121 @@
+import itertools
+import random
+
+import pytest
+
+from cargo_loader.cargo import Cargo
+from cargo_loader.loader import FirstFitDecreasingLoader
+from cargo_loader.trolley import Trolley
+from cargo_loader.vector import PRIORITIES, VectorDotProductLoader, VectorFirstFitDecreasingLoader, VectorFirstFitLoader
+
+def create_random_cargo_items(seed, count):
+    generator = random.Random(seed)
+    return [
+        Cargo(f"Item{i}", round(generator.uniform(0.1, 200), 1), round(generator.uniform(0.1, 1.2), 2), 1, round(generator.uniform(0.1, 1.6), 2))
+        for i in range(count)
+    ]
+
+def check_assignments(cargo_items, assignments, trolley):
+    weights = [0.0] * assignments.trolley_count
+    volumes = [0.0] * assignments.trolley_count
+    for cargo, index in zip(cargo_items, assignments.trolley_of_item):
+        weights[index] += cargo.weight_in_kg
+        volumes[index] += cargo.length_in_m * cargo.width_in_m * cargo.height_in_m
+
+    assert max(weights) <= trolley.maximum_weight_in_kg + 1e-9
+    assert max(volumes) <= trolley.maximum_volume_in_m3 + 1e-9
+
+#
+# Trolley
+#
+
+def test_trolley_should_accept_item_that_fits():
+    assert Trolley().item_error(Cargo("Item1", 100, 1, 1, 1)) is None
+
+def test_trolley_should_reject_item_that_exceeds_a_limit():
+    trolley = Trolley(maximum_weight_in_kg=50, maximum_volume_in_m3=1.5, maximum_height_in_m=1.5)
+    assert "Weight" in trolley.item_error(Cargo("Item1", 60, 1, 1, 1))
+    assert "Volume" in trolley.item_error(Cargo("Item1", 10, 1, 1, 1.6))
+    assert "Height" in trolley.item_error(Cargo("Item1", 10, 0.5, 1, 1.6))
+
+def test_trolley_should_throw_exception_when_limit_is_not_positive():
+    with pytest.raises(ValueError):
+        Trolley(maximum_volume_in_m3=0)
+    with pytest.raises(ValueError):
+        Trolley(maximum_width_in_m=-1)
+
+#
+# VectorFirstFitLoader
+#
+
+def test_vector_first_fit_loader_should_open_new_trolley_when_volume_is_full():
+    # Ten items fit the weight capacity but only five of them fit the volume capacity
+    cargo_items = [Cargo(f"Item{i}", 100, 1, 1, 2) for i in range(10)]
+    assert VectorFirstFitLoader().load(cargo_items) == 2
+    assert VectorFirstFitLoader(Trolley(maximum_volume_in_m3=20)).load(cargo_items) == 1
+
+def test_vector_first_fit_loader_should_throw_exception_when_item_does_not_fit_trolley():
+    with pytest.raises(ValueError):
+        VectorFirstFitLoader(Trolley(maximum_volume_in_m3=1)).load([Cargo("Item1", 100, 1, 1, 2)])
+
+def test_vector_first_fit_loader_should_return_same_number_of_trolleys_when_loading_assignments():
+    cargo_items = create_random_cargo_items(1, 1000)
+    loader = VectorFirstFitLoader()
+    assignments = loader.load_assignments(cargo_items)
+    assert assignments.trolley_count == loader.load(cargo_items)
+    check_assignments(cargo_items, assignments, loader.trolley)
+
+#
+# VectorFirstFitDecreasingLoader
+#
+
+def test_vector_first_fit_decreasing_loader_should_respect_both_capacities():
+    cargo_items = create_random_cargo_items(2, 2000)
+    for priority in PRIORITIES:
+        loader = VectorFirstFitDecreasingLoader(priority=priority)
+        assignments = loader.load_assignments(cargo_items)
+        check_assignments(cargo_items, assignments, loader.trolley)
+        assert assignments.trolley_count == loader.load(cargo_items)
+
+def test_vector_first_fit_decreasing_loader_should_match_first_fit_decreasing_when_volume_does_not_matter():
+    cargo_items = create_random_cargo_items(3, 1000)
+    loader = VectorFirstFitDecreasingLoader(Trolley(maximum_volume_in_m3=1e9), priority="maximum")
+    assert loader.load(cargo_items) == FirstFitDecreasingLoader().load(list(cargo_items))
+
+def test_vector_first_fit_decreasing_loader_should_throw_exception_when_using_unknown_priority():
+    with pytest.raises(ValueError):
+        VectorFirstFitDecreasingLoader(priority="unknown")
+
+def test_vector_first_fit_decreasing_loader_should_use_same_number_of_trolleys_for_every_order():
+    # All the items have the same priority, so the order only depends on the weight and volume
+    cargo_items = [Cargo(f"Item{i}", weight, length, 1, 1) for i, (weight, length) in enumerate([(150, 0.5), (150, 1.0), (100, 1.0), (50, 1.5), (100, 1.0)])]
+    loader = VectorFirstFitDecreasingLoader(Trolley(maximum_weight_in_kg=300, maximum_volume_in_m3=3), "maximum")
+    assert loader.is_order_independent
+    assert len({loader.load(list(permutation)) for permutation in itertools.permutations(cargo_items)}) == 1
+
+#
+# VectorDotProductLoader
+#
+
+def test_vector_dot_product_loader_should_pair_heavy_items_with_large_items():
+    # Two heavy items or two large items never fit into the same trolley, but a heavy item and a large item do
+    cargo_items = [Cargo(f"Heavy{i}", 150, 0.1, 1, 1) for i in range(4)] + [Cargo(f"Large{i}", 10, 1, 1, 1.8) for i in range(4)]
+    trolley = Trolley(maximum_weight_in_kg=200, maximum_volume_in_m3=2)
+    assert VectorDotProductLoader(trolley).load(cargo_items) == 4
+
+def test_vector_dot_product_loader_should_respect_both_capacities():
+    cargo_items = create_random_cargo_items(4, 2000)
+    loader = VectorDotProductLoader()
+    assignments = loader.load_assignments(cargo_items)
+    check_assignments(cargo_items, assignments, loader.trolley)
+    assert assignments.trolley_count <= VectorFirstFitLoader().load(cargo_items)
+
+def test_vector_dot_product_loader_should_not_be_order_independent_when_dot_products_are_equal():
+    # The number of trolleys depends on the order, so the cache must not share results between orders
+    cargo_items = [Cargo(f"Item{i}", weight, length, 1, 1) for i, (weight, length) in enumerate([(50, 1.5), (100, 2.0), (50, 2.0), (100, 1.0), (50, 0.5), (150, 1.5)])]
+    loader = VectorDotProductLoader(Trolley(maximum_weight_in_kg=300, maximum_volume_in_m3=3))
+    assert len({loader.load(list(permutation)) for permutation in itertools.permutations(cargo_items)}) > 1
+    assert not loader.is_order_independent
+
+def test_vector_dot_product_loader_should_load_no_items_into_no_trolleys():
+    assert VectorDotProductLoader().load([]) == 0